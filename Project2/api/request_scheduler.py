@@ -0,0 +1,138 @@
+# This file defines the RequestScheduler class. It paces TMDb requests with a token bucket and lets urgent ones go first.
+
+import time
+import heapq
+import logging
+import threading
+from itertools import count
+from concurrent.futures import Future
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0  # Searches and anything the user is waiting on
+PRIORITY_ENRICHMENT = 1   # Background detail fetching
+PRIORITY_PREFETCH = 2     # Posters nobody has asked to see yet
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_ENRICHMENT: "enrichment",
+                  PRIORITY_PREFETCH: "prefetch"}
+
+
+class RequestScheduler:
+    """Token bucket rate limiter with a priority queue in front of it.
+
+    Worker threads call acquire() before every HTTP attempt. Tokens refill
+    at `rate` per second up to `burst`; when none is left callers wait, and
+    the waiting caller with the lowest priority number (then the oldest)
+    gets the next token. pause() stops handing out tokens until a
+    Retry-After has passed. coalesce() makes identical concurrent requests
+    share one network call. Safe to use from several threads.
+    """
+
+    def __init__(self, rate=40.0, burst=20):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = []  # heap of (priority, sequence)
+        self._sequence = count()
+        self._condition = threading.Condition()
+        self._inflight = {}  # key -> Future of the request being made
+        self._running = 0
+        self._granted = 0
+        self._coalesced = 0
+        self._total_wait = 0.0
+        self._recent_wait = 0.0  # Exponential moving average, seconds
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE):
+        """Block until this caller may send a request; returns the seconds it waited"""
+        start = time.monotonic()
+        with self._condition:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._waiting[0] == ticket:
+                    if now < self._paused_until:
+                        delay = self._paused_until - now
+                    elif self._tokens >= 1:
+                        break
+                    else:
+                        delay = (1 - self._tokens) / self.rate
+                    self._condition.wait(delay)
+                else:
+                    self._condition.wait()
+            heapq.heappop(self._waiting)
+            self._tokens -= 1
+            waited = time.monotonic() - start
+            self._granted += 1
+            self._total_wait += waited
+            self._recent_wait = 0.8 * self._recent_wait + 0.2 * waited
+            self._condition.notify_all()  # The next in line becomes the head
+        return waited
+
+    def pause(self, seconds):
+        """Hand out no tokens for `seconds` (the server sent Retry-After)"""
+        with self._condition:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                logging.info(f"TMDb requests paused for {seconds:.1f}s")
+
+    def coalesce(self, key, func):
+        """Return func(), or the result of an identical call already in progress.
+
+        A key of None never shares; the call is only counted as in flight.
+        """
+        with self._condition:
+            future = self._inflight.get(key) if key is not None else None
+            leader = future is None
+            if leader:
+                future = Future()
+                if key is not None:
+                    self._inflight[key] = future
+                self._running += 1
+            else:
+                self._coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._condition:
+                if key is not None:
+                    del self._inflight[key]
+                self._running -= 1
+
+    def status(self):
+        """Queue depth per priority, requests in progress and wait times, for the status bar"""
+        with self._condition:
+            now = time.monotonic()
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiting:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                queued[name] = queued.get(name, 0) + 1
+            return {
+                "queued": len(self._waiting),
+                "queued_by_priority": queued,
+                "in_flight": max(0, self._running - len(self._waiting)),
+                "granted": self._granted,
+                "coalesced": self._coalesced,
+                "recent_wait_ms": round(self._recent_wait * 1000, 1),
+                "avg_wait_ms": round(self._total_wait / self._granted * 1000, 1) if self._granted else 0.0,
+                "paused_for": round(max(0.0, self._paused_until - now), 1)
+            }
+
+    def _refill(self, now):
+        # Nothing accrues while paused, so the end of a pause is not followed by a burst
+        since = max(self._updated, self._paused_until)
+        if now > since:
+            self._tokens = min(self.burst, self._tokens + (now - since) * self.rate)
+        self._updated = max(self._updated, now)
@@ -0,0 +1,213 @@
+# This file defines the ResponseCache class. It stores TMDb responses and images on disk so repeated requests skip the network.
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+PRIVATE_PARAMS = ("api_key",)  # Never part of a cache key or stored URL
+
+
+def cache_key(url, params=None):
+    """Normalized URL (sorted query, api_key removed) identifying a response"""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in PRIVATE_PARAMS]
+    query += [(k, str(v)) for k, v in (params or {}).items() if k not in PRIVATE_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+
+
+class ResponseCache:
+    """Two-tier cache of HTTP responses: a small in-memory LRU in front of SQLite.
+
+    Entries are dicts with status, headers (content type and the ETag and
+    Last-Modified validators), body bytes and an expiry time. Expired
+    entries are kept so they can be revalidated with a conditional request
+    or served as-is when offline. The database is trimmed to `max_bytes` by
+    dropping the least recently used entries. Safe to use from several threads.
+    """
+
+    def __init__(self, db_file="data/cache/http.db", max_bytes=200 * 1024 * 1024,
+                 memory_items=256, memory_bytes=16 * 1024 * 1024):
+        self.db_file = db_file
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory_bytes = memory_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> entry
+        self._memory_size = 0
+        self._touched = {}  # key -> last use not yet written to the database
+        self._lock = threading.RLock()
+
+        self._connect()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # A lost entry is just refetched
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                expires_at REAL,
+                last_used REAL,
+                size INTEGER
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        """Return the cached entry for `key` (fresh or not), or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._touch_later(key)
+                self.hits += 1
+                return entry
+            row = self._conn.execute(
+                "SELECT status, headers, body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touch_later(key)
+            entry = {"status": row[0], "headers": json.loads(row[1]), "body": row[2], "expires_at": row[3]}
+            self._remember(key, entry)
+            self.hits += 1
+            return entry
+
+    def put(self, key, status, headers, body, ttl):
+        """Store a response for `ttl` seconds"""
+        entry = {
+            "status": status,
+            "headers": {name: headers[name] for name in ("Content-Type", "ETag", "Last-Modified")
+                        if headers.get(name)},
+            "body": body,
+            "expires_at": time.time() + ttl
+        }
+        size = len(body) + len(key)
+        with self._lock:
+            self._touched.pop(key, None)
+            self._flush_touched()
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, status, json.dumps(entry["headers"]), sqlite3.Binary(body),
+                 entry["expires_at"], time.time(), size)
+            )
+            self._total_size += size - (old[0] if old else 0)
+            if self._total_size > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+            self._remember(key, entry)
+        return entry
+
+    def touch(self, key, ttl):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._touched.pop(key, None)
+            self._conn.execute("UPDATE responses SET expires_at = ?, last_used = ? WHERE key = ?",
+                               (expires_at, time.time(), key))
+            self._conn.commit()
+            entry = self._memory.get(key)
+            if entry is not None:
+                entry["expires_at"] = expires_at
+
+    @staticmethod
+    def is_fresh(entry):
+        return entry["expires_at"] > time.time()
+
+    def stats(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": count,
+                    "bytes": self._total_size, "memory_entries": len(self._memory)}
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._memory.clear()
+            self._memory_size = 0
+            self._total_size = 0
+
+    @contextmanager
+    def released(self):
+        """Close the database during the block so its file can be replaced (e.g. by a restore).
+
+        Other threads wait for the block to end; the memory tier is dropped
+        and the database reopened afterwards.
+        """
+        with self._lock:
+            self.close()
+            try:
+                yield
+            finally:
+                self._memory.clear()
+                self._memory_size = 0
+                self._touched.clear()
+                self._connect()
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+    def _touch_later(self, key):
+        """Record a use; last_used is written in batches rather than one commit per hit"""
+        self._touched[key] = time.time()
+        if len(self._touched) >= 256:
+            self._flush_touched()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany("UPDATE responses SET last_used = ? WHERE key = ?",
+                                   [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def _remember(self, key, entry):
+        """Put an entry in the memory tier, evicting the least recently used ones"""
+        size = len(entry["body"])
+        if size > self.memory_bytes // 4:
+            return  # Large images stay on disk only
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old["body"])
+        self._memory[key] = entry
+        self._memory_size += size
+        while len(self._memory) > self.memory_items or self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted["body"])
+
+    def _evict(self):
+        """Drop least recently used rows until the cache is back under 90% of max_bytes"""
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_used")
+        doomed = []
+        for key, size in rows:
+            if self._total_size <= target:
+                break
+            doomed.append((key,))
+            self._total_size -= size
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= len(old["body"])
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        logging.debug(f"Evicted {len(doomed)} cached responses")
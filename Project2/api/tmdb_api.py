@@ -1,12 +1,14 @@
 import os
-import requests
 import logging
+from api.tmdb_client import tmdb_client
+from api.request_scheduler import PRIORITY_INTERACTIVE
 
 # Constants
 TESTING_OFFLINE = False  # Toggle this for testing
 TMDB_API_KEY = None if TESTING_OFFLINE else os.getenv("TMDB_API_KEY")
 BASE_URL = "https://api.themoviedb.org/3"
 IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w500"
+IMAGE_ROOT_URL = "https://image.tmdb.org/t/p/"
 TMDB_ATTRIBUTION = """
 Powered by TMDb
 This product uses the TMDb API but is not endorsed or certified by TMDb.
@@ -16,11 +18,30 @@ This product uses the TMDb API but is not endorsed or certified by TMDb.
 if not TMDB_API_KEY:
     logging.info("No TMDb API key found - starting in offline mode")
 
+def image_url(poster_path, size="w92"):
+    """TMDb image URL for a poster at another size; accepts a raw "/abc.jpg" path or a full URL"""
+    if not poster_path:
+        return None
+    if poster_path.startswith(IMAGE_ROOT_URL):
+        poster_path = "/" + poster_path[len(IMAGE_ROOT_URL):].split("/", 1)[1]
+    return f"{IMAGE_ROOT_URL}{size}{poster_path}"
+
 class TMDbAPI:
     @staticmethod
     def set_api_key(key):
         global TMDB_API_KEY
         TMDB_API_KEY = key
+        tmdb_client.offline = False
+
+    @staticmethod
+    def is_available():
+        """True when requests can reach TMDb (there is a key and offline mode is off)"""
+        return bool(TMDB_API_KEY) and not tmdb_client.offline
+
+    @staticmethod
+    def set_offline(enabled):
+        """In offline mode requests are answered from the response cache only"""
+        tmdb_client.offline = enabled
 
     @staticmethod
     def validate_api_key(key):
@@ -28,21 +49,23 @@ class TMDbAPI:
         url = f"{BASE_URL}/authentication/token/new"
         params = {"api_key": key}
         try:
-            response = requests.get(url, params=params)
+            response = tmdb_client.get(url, params=params, endpoint="authentication")
             return response.status_code == 200
         except:
             return False
 
     @staticmethod
-    def search_movie(query):
+    def search_movie(query, year=None, priority=PRIORITY_INTERACTIVE):
         """Search for a movie using the TMDb API and return a list of results."""
-        if not TMDB_API_KEY:
+        if not TMDB_API_KEY and not tmdb_client.offline:
             logging.debug("Search attempted without API key")
             return []  # Return an empty list if no API key is present
 
         url = f"{BASE_URL}/search/movie"
         params = {"api_key": TMDB_API_KEY, "query": query}
-        response = requests.get(url, params=params)
+        if year:
+            params["year"] = year
+        response = tmdb_client.get(url, params=params, endpoint="search/movie", priority=priority)
 
         if response.status_code != 200:
             return []  # Return empty list if API fails
@@ -54,15 +77,16 @@ class TMDbAPI:
             "id": movie.get('id'),
             "title": movie.get('title', 'Unknown Title'),
             "release_date": movie.get('release_date', 'Unknown Release Date'),
+            "overview": movie.get('overview'),
             "poster_path": f"{IMAGE_BASE_URL}{movie.get('poster_path')}" if movie.get('poster_path') else None
         } for movie in results[:5]]  # Return top 5 results as a list
 
     @staticmethod
-    def get_movie_details(movie_id):
-        """Fetch detailed information for a movie."""
+    def get_movie_details(movie_id, priority=PRIORITY_INTERACTIVE):
+        """Fetch detailed information for a movie, including cast and crew."""
         url = f"{BASE_URL}/movie/{movie_id}"
-        params = {"api_key": TMDB_API_KEY}
-        response = requests.get(url, params=params)
+        params = {"api_key": TMDB_API_KEY, "append_to_response": "credits"}
+        response = tmdb_client.get(url, params=params, endpoint="movie/{id}", priority=priority)
 
         if response.status_code != 200:
             raise ConnectionError("Failed to fetch movie details.")
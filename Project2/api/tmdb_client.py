@@ -0,0 +1,234 @@
+# This file defines the TMDbClient class. It is the shared HTTP layer used for every TMDb request.
+
+import io
+import time
+import random
+import logging
+import threading
+from bisect import bisect_left
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from api.response_cache import cache_key
+from api.request_scheduler import RequestScheduler, PRIORITY_INTERACTIVE
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)  # Upper bounds; one more bucket for slower
+DAY = 24 * 60 * 60
+CACHE_TTLS = {  # Seconds a cached response counts as fresh, per endpoint; others are never cached
+    "search/movie": DAY,
+    "movie/{id}": 7 * DAY,
+    "image": 30 * DAY
+}
+
+
+class TMDbClient:
+    """Pooled keep-alive HTTP session with timeouts, retries and latency metrics.
+
+    All TMDb API calls and image downloads go through one requests.Session
+    so connections are reused instead of opening a new TCP+TLS connection
+    per call. Requests that fail with 429/5xx or a connection error are
+    retried with exponential backoff and full jitter, honouring Retry-After.
+    Latencies are recorded per endpoint label (e.g. "search/movie").
+
+    With a ResponseCache attached, successful responses of the endpoints in
+    CACHE_TTLS are stored; fresh ones are answered without touching the
+    network and stale ones are revalidated with If-None-Match /
+    If-Modified-Since. While `offline` is set those endpoints are answered
+    from the cache only, stale or not, and misses get a synthetic 504
+    response; uncached calls such as API key validation still go out.
+
+    Every attempt that does reach the network first waits for a token from
+    the RequestScheduler, which keeps the client under TMDb's rate limit
+    and serves `priority` PRIORITY_INTERACTIVE before enrichment and
+    prefetch work. Identical requests made at the same time share one call.
+    """
+
+    def __init__(self, timeout=(3.05, 10), max_retries=3, backoff=0.5, max_backoff=8.0, pool_size=10):
+        self.timeout = timeout  # (connect, read) seconds
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.scheduler = RequestScheduler()
+        self.cache = None
+        self.offline = False
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def get(self, url, params=None, endpoint="other", stream=False, timeout=None,
+            priority=PRIORITY_INTERACTIVE):
+        """GET `url`, retrying transient failures. Returns the last response; raises if every attempt errored."""
+        ttl = CACHE_TTLS.get(endpoint) if self.cache is not None else None
+        if ttl is None:
+            # A streamed body can only be read once, so those requests are never shared
+            key = None if stream else (url, tuple(sorted((params or {}).items())))
+            return self.scheduler.coalesce(
+                key, lambda: self._fetch(url, params, endpoint, stream, timeout, priority)
+            )
+
+        key = cache_key(url, params)
+        entry = self.cache.get(key)
+        if entry is not None and (self.offline or self.cache.is_fresh(entry)):
+            self._count_cache_hit(endpoint)
+            return self._cached_response(url, entry)
+        if self.offline:
+            return self._offline_response(url)
+        return self.scheduler.coalesce(
+            key, lambda: self._refresh(key, entry, ttl, url, params, endpoint, timeout, priority)
+        )
+
+    def _refresh(self, key, entry, ttl, url, params, endpoint, timeout, priority):
+        """Fetch a missing or stale cache entry, revalidating it when it has validators"""
+        headers = {}
+        if entry is not None:
+            if entry["headers"].get("ETag"):
+                headers["If-None-Match"] = entry["headers"]["ETag"]
+            if entry["headers"].get("Last-Modified"):
+                headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        # Read the whole body even when streaming was asked for, so it can be stored
+        response = self._fetch(url, params, endpoint, False, timeout, priority, headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key, ttl)
+            self._count_cache_hit(endpoint)
+            return self._cached_response(url, entry)
+        if response.status_code == 200:
+            self.cache.put(key, 200, response.headers, response.content, ttl)
+        return response
+
+    def _fetch(self, url, params, endpoint, stream, timeout, priority, headers=None):
+        attempt = 0
+        while True:
+            self.scheduler.acquire(priority)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, stream=stream, headers=headers,
+                                            timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(endpoint, time.perf_counter() - start, error=True)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logging.warning(f"TMDb {endpoint} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                self._record(endpoint, time.perf_counter() - start,
+                             error=response.status_code >= 400)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                retry_after = self._retry_after(response)
+                delay = retry_after or self._backoff_delay(attempt)
+                logging.warning(f"TMDb {endpoint} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+                if retry_after:
+                    # The limit is per key, so every queued request has to wait it out
+                    self.scheduler.pause(retry_after)
+                    delay = 0
+            self._count_retry(endpoint)
+            time.sleep(delay)
+            attempt += 1
+
+    def metrics(self):
+        """Return {endpoint: {count, errors, retries, cache_hits, histogram, p50_ms, p95_ms}}"""
+        with self._lock:
+            result = {}
+            for endpoint, stats in self._metrics.items():
+                histogram = dict(zip([f"<={b}ms" for b in LATENCY_BUCKETS_MS] + ["slower"],
+                                     stats["histogram"]))
+                result[endpoint] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "cache_hits": stats["cache_hits"],
+                    "histogram": histogram,
+                    "p50_ms": self._percentile(stats["histogram"], stats["count"], 0.5),
+                    "p95_ms": self._percentile(stats["histogram"], stats["count"], 0.95)
+                }
+            return result
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            stats = self.cache.stats()
+            logging.info(f"Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+                         f"{stats['entries']} entries")
+            self.cache.close()
+
+    @staticmethod
+    def _cached_response(url, entry):
+        """Rebuild a requests.Response from a cache entry"""
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        # The body is already read, so iter_content() serves it from _content
+        response._content_consumed = True
+        response.raw = io.BytesIO(entry["body"])  # Something for close() to close
+        response.url = url
+        response.from_cache = True
+        return response
+
+    @staticmethod
+    def _offline_response(url):
+        response = requests.Response()
+        response.status_code = 504
+        response.reason = "Offline and not cached"
+        response._content = b""
+        response._content_consumed = True
+        response.raw = io.BytesIO(b"")
+        response.url = url
+        return response
+
+    def _backoff_delay(self, attempt):
+        # Full jitter: anywhere between 0 and the exponential cap
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _retry_after(self, response):
+        value = response.headers.get("Retry-After")
+        try:
+            return min(float(value), self.max_backoff * 4) if value else None
+        except ValueError:
+            return None  # HTTP-date form; fall back to our own backoff
+
+    def _stats(self, endpoint):
+        stats = self._metrics.get(endpoint)
+        if stats is None:
+            stats = self._metrics[endpoint] = {
+                "count": 0, "errors": 0, "retries": 0, "cache_hits": 0,
+                "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            }
+        return stats
+
+    def _record(self, endpoint, seconds, error=False):
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats["count"] += 1
+            stats["errors"] += int(error)
+            stats["histogram"][bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def _count_retry(self, endpoint):
+        with self._lock:
+            self._stats(endpoint)["retries"] += 1
+
+    def _count_cache_hit(self, endpoint):
+        with self._lock:
+            self._stats(endpoint)["cache_hits"] += 1
+
+    @staticmethod
+    def _percentile(histogram, count, fraction):
+        """Upper bound of the bucket holding the given fraction of requests (None if slower than all)"""
+        if not count:
+            return None
+        target = fraction * count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, histogram):
+            seen += n
+            if seen >= target:
+                return bound
+        return None
+
+
+# Shared by TMDbAPI, Movie and the search window
+tmdb_client = TMDbClient()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Measure ThumbnailListbox redraw time and canvas item count.
+
+Fills a listbox with synthetic movies and times loading, scrolling,
+selection and resizing, then compares against drawing every row like the
+non-virtualized listbox did. Needs a display (or Xvfb).
+
+Run from the project directory: python3 benchmarks/bench_listbox.py [count]
+"""
+
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.movie import Movie
+from gui.widgets.thumbnail_listbox import ThumbnailListbox
+
+
+def make_movie(i):
+    movie = Movie(id=i, title=f"Movie {i}", release_date="1999-03-31")
+    movie.set_details_loader(lambda m: None, {
+        "year": "1999", "genres": ["Action", "Science Fiction"], "vote_average": 8.2
+    })
+    movie.needs_details = False
+    return movie
+
+
+def timed(root, label, func):
+    start = time.perf_counter()
+    func()
+    root.update_idletasks()
+    print(f"{label:<40} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+
+def draw_all_rows(canvas, listbox, movies):
+    """What the listbox used to do on every change: one set of items per movie"""
+    canvas.delete('all')
+    for i, movie in enumerate(movies):
+        y = 5 + i * listbox.item_height
+        canvas.create_rectangle(5, y, 395, y + listbox.item_height - 5, fill="white", width=0)
+        canvas.create_text(70, y + 20, text=listbox._row_text(movie), anchor='w')
+        canvas.create_text(70, y + listbox.item_height - 20,
+                           text=' • '.join(movie.summary['genres'][:3]), anchor='w')
+
+
+def bench_listbox(count):
+    root = tk.Tk()
+    root.geometry("400x700")
+    listbox = ThumbnailListbox(root)
+    listbox.pack(fill=tk.BOTH, expand=True)
+    root.update()
+    movies = [make_movie(i) for i in range(count)]
+
+    timed(root, f"Load {count} movies", lambda: listbox.append_items(movies))
+    timed(root, "Redraw", listbox._redraw)
+    timed(root, "Scroll through whole list (100 steps)",
+          lambda: [listbox.yview_moveto(step / 100) for step in range(101)])
+    timed(root, "Select 100 rows", lambda: [listbox.selection_set(i) for i in range(100)])
+    timed(root, "Resize", lambda: (root.geometry("600x900"), root.update()))
+    print(f"{'Canvas items':<40} {len(listbox.find_all()):8d} ({listbox._slot_count} row slots)")
+
+    canvas = tk.Canvas(root)
+    timed(root, f"Drawing all {count} rows (old redraw)", lambda: draw_all_rows(canvas, listbox, movies))
+    print(f"{'Canvas items (old redraw)':<40} {len(canvas.find_all()):8d}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    bench_listbox(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
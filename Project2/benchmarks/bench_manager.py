@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Benchmarks for MovieManager bulk operations.
+
+Run from the project directory: python3 benchmarks/bench_manager.py [count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.manager import MovieManager
+from models.movie import Movie
+from models.storage import SQLiteStorage
+
+
+def bench_import(count):
+    """Quick-add `count` titles (plus a duplicate pass) and report timings"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = MovieManager(storage=SQLiteStorage(os.path.join(tmp, "movies.db")))
+
+        start = time.perf_counter()
+        checkpoint = start
+        for i in range(count):
+            manager.add_movie(Movie(title=f"Movie {i}"))
+            if (i + 1) % (count // 5 or 1) == 0:
+                now = time.perf_counter()
+                print(f"  {i + 1:>7} movies: {(now - checkpoint) * 1000:8.1f} ms for last chunk")
+                checkpoint = now
+        elapsed = time.perf_counter() - start
+        print(f"Imported {count} titles in {elapsed:.2f}s ({elapsed / count * 1e6:.1f} us/title)")
+
+        start = time.perf_counter()
+        skipped = sum(not manager.add_movie(Movie(title=f"MOVIE {i}")) for i in range(count))
+        elapsed = time.perf_counter() - start
+        print(f"Rejected {skipped} duplicates in {elapsed * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        for i in range(0, count, 10):
+            manager.mark_as_watched(manager.find_by_title(f"Movie {i}"))
+        elapsed = time.perf_counter() - start
+        print(f"Marked {len(manager.movies_watched)} movies as watched in {elapsed * 1000:.1f} ms")
+
+        manager.storage.close()
+
+
+def bench_batched_import(count):
+    """Quick-add `count` titles inside a single MovieManager.batch()"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = MovieManager(storage=SQLiteStorage(os.path.join(tmp, "movies.db")))
+
+        start = time.perf_counter()
+        with manager.batch():
+            for i in range(count):
+                manager.add_movie(Movie(title=f"Movie {i}"))
+        elapsed = time.perf_counter() - start
+        print(f"Imported {count} titles in one batch in {elapsed:.2f}s ({elapsed / count * 1e6:.1f} us/title)")
+
+        manager.storage.close()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    bench_import(count)
+    bench_batched_import(count)
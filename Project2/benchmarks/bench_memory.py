@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Measure memory per movie with tracemalloc.
+
+"before" rebuilds each movie the way the original dict-backed Movie did
+(full details dict, one dict per rating); "after" loads the same library
+through MovieManager with slotted movies and lazily loaded details.
+
+Run from the project directory: python3 benchmarks/bench_memory.py [count]
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.manager import MovieManager
+from models.storage import JSONStorage
+from bench_startup import make_movie
+
+
+class DictMovie:
+    """Layout of the original Movie class"""
+
+    def __init__(self, data):
+        self.id = data["id"]
+        self.title = data["title"]
+        self.release_date = data["release_date"]
+        self.poster_path = data["poster_path"]
+        self.details = data["details"]
+        self.user_ratings = data["user_ratings"]
+        self.needs_details = data["needs_details"]
+
+
+def measure(label, count, build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {current / count:8.0f} bytes/movie ({current / 1e6:.1f} MB)")
+    return result
+
+
+def bench_memory(count):
+    movies = [make_movie(i) for i in range(count)]
+    for movie in movies:
+        movie.user_ratings = [{"user": f"friend{n}", "rating": 7} for n in range(4)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = os.path.join(tmp, "movies.json")
+        jsonl_file = os.path.join(tmp, "movies.jsonl")
+        details_dir = os.path.join(tmp, "details")
+        JSONStorage(json_file).save_all(movies, [])
+        JSONStorage(jsonl_file, details_dir).save_all(movies, [])
+        del movies
+
+        def load_dict_movies():
+            with open(json_file) as f:
+                return [DictMovie(data) for data in json.load(f)["to_watch"]]
+
+        before = measure("before: dict-backed, inline details", count, load_dict_movies)
+        del before
+        after = measure("after: slotted, lazy details", count,
+                        lambda: MovieManager(storage=JSONStorage(jsonl_file, details_dir)))
+        del after
+
+
+if __name__ == "__main__":
+    bench_memory(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
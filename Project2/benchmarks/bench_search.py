@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Measure SearchIndex build time and per-keystroke query latency.
+
+Builds an index over synthetic movies whose titles, cast and overviews
+draw from a small word list plus a long tail of rarer words, then replays
+typing a few queries one character at a time.
+
+Run from the project directory: python3 benchmarks/bench_search.py [count]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.movie import Movie
+from models.search import SearchIndex
+
+WORDS = ("night day city dark star war love story last first lost king queen river "
+         "house dream ghost space return secret summer winter blood fire ice storm "
+         "road home island shadow light heart empire kingdom iron steel golden silent "
+         "hidden broken wild dead living lonely final crimson midnight ocean mountain").split()
+NAMES = ("anna ben carla david emma frank grace henry iris jack kate liam maria noah "
+         "olga paul rosa sam tara victor wendy xavier yuki zoe").split()
+SYLLABLES = "ka ro mi sen tal vor ep li dun an bel cor fi ga hul".split()
+RARE_WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+QUERIES = ("midnight ocean", "the lost kingdom", "anna smith", "midnigth", "golden st")
+
+
+def word(rng):
+    return rng.choice(WORDS) if rng.random() < 0.3 else rng.choice(RARE_WORDS)
+
+
+def make_movie(i, rng, texts):
+    title = " ".join(word(rng) for _ in range(rng.randint(1, 4))).title() + f" {i}"
+    movie = Movie(id=i, title=title, release_date="2001-01-01")
+    movie.set_details_loader(lambda m: None, {"year": "2001", "genres": ["Drama"]})
+    # What JSONStorage keeps in its search text sidecar
+    texts[i] = {
+        "overview": " ".join(word(rng) for _ in range(40)),
+        "people": [f"{rng.choice(NAMES)} {rng.choice(NAMES)}son" for _ in range(8)] + ["anna smith"]
+    }
+    return movie
+
+
+def bench_search(count):
+    rng = random.Random(42)
+    texts = {}
+    movies = [make_movie(i, rng, texts) for i in range(count)]
+
+    index = SearchIndex(text_source=lambda movie: texts.get(movie.id))
+    start = time.perf_counter()
+    for movie in movies:
+        index.add(movie)
+    index.index_pending()
+    print(f"Indexed {count} movies in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(index._terms)} terms)")
+
+    for query in QUERIES:
+        worst = 0.0
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            results = index.search(query[:end], limit=200)
+            worst = max(worst, time.perf_counter() - start)
+        print(f"{query!r:<20} worst keystroke {worst * 1000:6.2f} ms, {len(results)} results")
+
+    start = time.perf_counter()
+    for movie in movies[:1000]:
+        index.add(movie)
+        index.index_pending()
+    print(f"Re-indexing one movie: {(time.perf_counter() - start) * 1000:.0f} µs")
+
+
+if __name__ == "__main__":
+    bench_search(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Compare cold-start loading of the movie library.
+
+Times the original path (json.load of a movies.json with inline details)
+against streaming a movies.jsonl index with split-out details.
+
+Run from the project directory: python3 benchmarks/bench_startup.py [count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.manager import MovieManager
+from models.movie import Movie
+from models.storage import JSONStorage
+
+FIRST_SCREEN = 200  # Same as MovieTrackerApp.load_movies_progressively's chunk size
+
+
+def make_movie(i):
+    movie = Movie(
+        id=i,
+        title=f"Movie {i}",
+        release_date="1999-03-31",
+        poster_path=f"{i}_Movie_{i}.jpg",
+        details={
+            "id": i,
+            "title": f"Movie {i}",
+            "release_date": "1999-03-31",
+            "genres": [{"id": 28, "name": "Action"}, {"id": 878, "name": "Science Fiction"}],
+            "overview": "A hacker learns about the true nature of his reality. " * 8,
+            "runtime": 136,
+            "vote_average": 8.2,
+            "vote_count": 25000,
+            "production_companies": [{"id": n, "name": f"Studio {n}"} for n in range(5)],
+        }
+    )
+    movie.needs_details = False
+    movie.user_ratings = [{"user": "default", "rating": 8}]
+    return movie
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<45} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+
+def bench_startup(count):
+    movies = [make_movie(i) for i in range(count)]
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = os.path.join(tmp, "movies.json")
+        jsonl_file = os.path.join(tmp, "movies.jsonl")
+        details_dir = os.path.join(tmp, "details")
+        JSONStorage(json_file).save_all(movies[::2], movies[1::2])
+        JSONStorage(jsonl_file, details_dir).save_all(movies[::2], movies[1::2])
+        print(f"{count} movies: movies.json {os.path.getsize(json_file) / 1e6:.1f} MB, "
+              f"movies.jsonl {os.path.getsize(jsonl_file) / 1e6:.1f} MB")
+
+        timed("json.load path, full load", lambda: MovieManager(json_file))
+
+        def first_screen():
+            manager = MovieManager(storage=JSONStorage(jsonl_file, details_dir), autoload=False)
+            return list(islice(manager.iter_load_data(), FIRST_SCREEN))
+
+        timed(f"streaming path, first {FIRST_SCREEN} movies", first_screen)
+        manager = timed("streaming path, full load",
+                        lambda: MovieManager(storage=JSONStorage(jsonl_file, details_dir)))
+        timed("first details access (lazy)", lambda: manager.movies_to_watch[0].details)
+
+
+if __name__ == "__main__":
+    bench_startup(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Exercise TMDbClient against a local stub HTTP server.
+
+Compares a pooled keep-alive session with a new connection per request,
+then checks that 5xx and 429 responses are retried (honouring
+Retry-After) and prints the per-endpoint latency metrics. Finally the
+same requests are repeated through a ResponseCache: cold, warm, after
+expiry (ETag revalidation) and in offline mode. The last section checks
+the request scheduler: rate, priority order and coalescing.
+
+This only prints timings; tests/test_tmdb_client.py asserts the retry,
+Retry-After, backoff and pooling behaviour.
+
+Run from the project directory: python3 benchmarks/bench_tmdb_client.py [requests]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.tmdb_client import TMDbClient
+from api.response_cache import ResponseCache
+from api.request_scheduler import RequestScheduler, PRIORITY_INTERACTIVE, PRIORITY_PREFETCH
+
+
+class StubTMDb(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+    failures = {"/3/flaky": 2, "/3/limited": 1}
+    lock = threading.Lock()
+    not_modified = 0
+    slow_hits = 0
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/3/slow":
+            StubTMDb.slow_hits += 1
+            time.sleep(0.2)
+            self._send(200, {"results": []})
+            return
+        if path.startswith("/3/movie/"):
+            etag = '"v1"'
+            if self.headers.get("If-None-Match") == etag:
+                StubTMDb.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self._send(200, {"id": int(path.rsplit("/", 1)[1]), "title": "The Matrix"}, {"ETag": etag})
+            return
+        with self.lock:
+            remaining = self.failures.get(path, 0)
+            if remaining:
+                self.failures[path] = remaining - 1
+        if remaining and path == "/3/limited":
+            self._send(429, {"status_message": "rate limited"}, {"Retry-After": "0.2"})
+        elif remaining:
+            self._send(503, {"status_message": "unavailable"})
+        else:
+            self._send(200, {"results": [{"id": 603, "title": "The Matrix"}]})
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<45} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+
+def bench_client(count):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTMDb)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/3"
+    client = TMDbClient(backoff=0.05)
+    client.scheduler = RequestScheduler(rate=1e6, burst=1000)  # Measure the transport, not the rate limit
+
+    timed(f"{count} requests, new connection each",
+          lambda: [requests.get(f"{base}/search/movie", timeout=5) for _ in range(count)])
+    timed(f"{count} requests, pooled session",
+          lambda: [client.get(f"{base}/search/movie", endpoint="search/movie") for _ in range(count)])
+
+    response = timed("503 twice, then 200", lambda: client.get(f"{base}/flaky", endpoint="flaky"))
+    print(f"  -> {response.status_code}")
+    response = timed("429 with Retry-After: 0.2, then 200", lambda: client.get(f"{base}/limited", endpoint="limited"))
+    print(f"  -> {response.status_code}")
+
+    for endpoint, stats in client.metrics().items():
+        print(f"{endpoint}: {stats}")
+    client.close()
+
+    bench_cache(base, count)
+    bench_scheduler(base)
+    server.shutdown()
+
+
+def bench_cache(base, count):
+    print()
+    with tempfile.TemporaryDirectory() as directory:
+        client = TMDbClient()
+        client.scheduler = RequestScheduler(rate=1e6, burst=1000)
+        client.cache = ResponseCache(os.path.join(directory, "http.db"))
+        urls = [f"{base}/movie/{i}" for i in range(count)]
+
+        timed(f"{count} details, cold cache", lambda: [client.get(u, endpoint="movie/{id}") for u in urls])
+        timed(f"{count} details, memory tier", lambda: [client.get(u, endpoint="movie/{id}") for u in urls])
+        client.cache._memory.clear()
+        timed(f"{count} details, SQLite tier", lambda: [client.get(u, endpoint="movie/{id}") for u in urls])
+
+        client.cache._conn.execute("UPDATE responses SET expires_at = 0")
+        client.cache._memory.clear()
+        timed(f"{count} details, expired (304 revalidation)",
+              lambda: [client.get(u, endpoint="movie/{id}") for u in urls])
+        print(f"  -> {StubTMDb.not_modified} not modified")
+
+        client.cache._conn.execute("UPDATE responses SET expires_at = 0")
+        client.offline = True
+        responses = timed(f"{count} details, offline and stale",
+                          lambda: [client.get(u, endpoint="movie/{id}") for u in urls])
+        print(f"  -> {sum(r.status_code == 200 for r in responses)} served, "
+              f"miss -> {client.get(f'{base}/movie/999999', endpoint='movie/{id}').status_code}")
+        print(client.cache.stats())
+        client.close()
+
+
+def bench_scheduler(base):
+    print()
+    scheduler = RequestScheduler(rate=50, burst=1)
+    timed("100 tokens at 50/s, burst 1", lambda: [scheduler.acquire() for _ in range(100)])
+
+    # Prefetch jobs queue up first; interactive ones arriving later still go next
+    order = []
+    threads = [threading.Thread(target=lambda p=p: (scheduler.acquire(p), order.append(p)))
+               for p in [PRIORITY_PREFETCH] * 10]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    late = [threading.Thread(target=lambda: (scheduler.acquire(PRIORITY_INTERACTIVE),
+                                             order.append(PRIORITY_INTERACTIVE)))
+            for _ in range(3)]
+    for thread in late:
+        thread.start()
+    for thread in threads + late:
+        thread.join()
+    print(f"grant order (0 = interactive, 2 = prefetch): {order}")
+
+    client = TMDbClient()
+    threads = [threading.Thread(target=client.get, args=(f"{base}/slow",), kwargs={"endpoint": "slow"})
+               for _ in range(10)]
+    timed("10 identical concurrent requests", lambda: [t.start() for t in threads] + [t.join() for t in threads])
+    print(f"  -> {StubTMDb.slow_hits} reached the server; {client.scheduler.status()}")
+    client.close()
+
+
+if __name__ == "__main__":
+    bench_client(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
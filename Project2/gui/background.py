@@ -0,0 +1,78 @@
+# This file defines the BackgroundRunner class. It runs blocking work on a thread pool and hands results back to the Tk thread.
+
+import queue
+import logging
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundRunner:
+    """Thread pool whose results are delivered on the Tk thread.
+
+    submit() runs func(*args) on a worker; when it finishes, on_done(result)
+    or on_error(exception) is called from an after() poll on the Tk thread,
+    so callbacks may touch widgets. The poll only runs while jobs are
+    outstanding. Cancelling the returned Future drops a job that has not
+    started; callbacks of a job that already ran are still delivered, so
+    callers that need to ignore stale results should check for that.
+    """
+
+    POLL_MS = 20
+
+    def __init__(self, root, workers=4, name="background"):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._results = queue.Queue()
+        self._outstanding = 0
+        self._poll_job = None
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        self._outstanding += 1
+        future = self._executor.submit(self._run, func, args, on_done, on_error)
+        future.add_done_callback(self._on_future_done)
+        self._schedule_poll()
+        return future
+
+    def close(self):
+        """Drop queued jobs and let running ones finish in the background"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._poll_job is not None:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except tk.TclError:
+                pass  # The window is already gone
+            self._poll_job = None
+
+    def _run(self, func, args, on_done, on_error):
+        try:
+            self._results.put((on_done, func(*args)))
+        except Exception as e:
+            if on_error is None:
+                logging.error(f"Background job {getattr(func, '__name__', func)} failed: {e}")
+            self._results.put((on_error, e))
+
+    def _on_future_done(self, future):
+        if future.cancelled():
+            # Never ran, so nothing will be queued for it
+            self._results.put((None, None))
+
+    def _schedule_poll(self):
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try:
+                callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if callback is None:
+                continue
+            try:
+                callback(value)
+            except Exception as e:
+                logging.error(f"Background callback failed: {e}")
+        if self._outstanding > 0:
+            self._schedule_poll()
@@ -0,0 +1,175 @@
+# This file defines the EnrichmentJob class. It fills in TMDb details for quick-added movies in the background.
+
+import logging
+import tkinter as tk
+from collections import deque
+from functools import partial
+
+from api.tmdb_api import TMDbAPI
+from api.request_scheduler import PRIORITY_INTERACTIVE, PRIORITY_PREFETCH
+from gui.background import BackgroundRunner
+from models.enrichment import ReviewQueue, resolve_movie, fetch_match
+
+
+class EnrichmentJob:
+    """Resolve every movie with needs_details against TMDb without blocking the UI.
+
+    Titles are searched on a small worker pool (at most twice as many jobs
+    queued as there are workers, so movies added later are not stuck behind
+    thousands of others). A clear best match has its details and poster
+    fetched and replaces the quick-added movie (its poster follows through
+    the PosterManager); results are committed to
+    the MovieManager in batches on the Tk thread. Anything ambiguous or not
+    found goes to the ReviewQueue. Because needs_details and the review
+    queue are both saved, calling start() after a restart carries on where
+    the last run stopped.
+    """
+
+    BATCH_SIZE = 25
+    FLUSH_MS = 2000      # Commit a partial batch after this long without a full one
+    MAX_FAILURES = 5     # Consecutive errors (e.g. connection lost) before giving up
+
+    def __init__(self, app, workers=4, state_file="data/enrichment.json"):
+        self.app = app
+        self.movie_manager = app.movie_manager
+        self.workers = workers
+        self.review_queue = ReviewQueue(state_file)
+        self.runner = BackgroundRunner(app.root, workers=workers, name="enrichment")
+        self.matched = 0
+        self.failures = 0
+        self._queue = deque()
+        self._queued = set()  # Movies waiting, being resolved or awaiting commit
+        self._active = 0
+        self._results = []
+        self._flush_job = None
+
+    def start(self):
+        """Queue every movie that still needs details; returns how many are outstanding"""
+        if not TMDbAPI.is_available():
+            return 0
+        self.review_queue.prune(self.movie_manager)
+        self.failures = 0
+        for movie in self.movie_manager.movies_to_watch + self.movie_manager.movies_watched:
+            if movie.needs_details and movie not in self._queued and movie.title not in self.review_queue:
+                self._queue.append(movie)
+                self._queued.add(movie)
+        self._fill()
+        return len(self._queued)
+
+    def stop(self):
+        """Drop movies not started yet; results already fetched are still committed"""
+        for movie in self._queue:
+            self._queued.discard(movie)
+        self._queue.clear()
+
+    def close(self):
+        """Stop fetching and save what was already fetched (the window may be gone)"""
+        self.stop()
+        self.runner.close()
+        self.commit(update_ui=False)
+
+    def progress(self):
+        return {"remaining": len(self._queued), "matched": self.matched, "review": len(self.review_queue)}
+
+    def accept(self, movie, candidate, on_done=None):
+        """Use a candidate the user picked from the review queue"""
+        def done(new_movie):
+            self._active = max(0, self._active - 1)
+            self._results.append((movie, {"status": "matched", "movie": new_movie}))
+            self.commit()
+            if on_done is not None:
+                on_done(new_movie)
+
+        self._active += 1
+        self._queued.add(movie)
+        self.runner.submit(fetch_match, candidate, PRIORITY_INTERACTIVE,
+                           on_done=done, on_error=partial(self._on_failed, movie))
+
+    def dismiss(self, title):
+        """Leave a movie without details and stop trying to match it"""
+        self.review_queue.dismiss(title)
+        self.review_queue.save()
+
+    def _fill(self):
+        while self._queue and self._active < self.workers * 2:
+            movie = self._queue.popleft()
+            self._active += 1
+            self.runner.submit(resolve_movie, movie.title, movie.release_date,
+                               on_done=partial(self._on_resolved, movie),
+                               on_error=partial(self._on_failed, movie))
+
+    def _on_resolved(self, movie, result):
+        self._active = max(0, self._active - 1)
+        self.failures = 0
+        self._results.append((movie, result))
+        self._after_result()
+
+    def _on_failed(self, movie, error):
+        self._active = max(0, self._active - 1)
+        self._queued.discard(movie)
+        self.failures += 1
+        logging.error(f"Enrichment failed for {movie.title}: {error}")
+        if self.failures >= self.MAX_FAILURES:
+            logging.warning("Enrichment stopped after repeated failures")
+            self.stop()
+        self._after_result()
+
+    def _after_result(self):
+        if len(self._results) >= self.BATCH_SIZE or (not self._queue and not self._active):
+            self.commit()
+        elif self._results and self._flush_job is None:
+            self._flush_job = self.app.root.after(self.FLUSH_MS, self.commit)
+        self._fill()
+
+    def commit(self, update_ui=True):
+        """Apply the buffered results to the movie lists in one batch"""
+        if self._flush_job is not None:
+            try:
+                self.app.root.after_cancel(self._flush_job)
+            except tk.TclError:
+                pass  # The window is already gone
+            self._flush_job = None
+        results, self._results = self._results, []
+        if not results:
+            return
+
+        matched = 0
+        with self.movie_manager.batch():
+            for movie, result in results:
+                self._queued.discard(movie)
+                if self.movie_manager.list_name_of(movie) is None or not movie.needs_details:
+                    continue  # Removed, or filled in by hand meanwhile
+                if result["status"] == "matched":
+                    if self._apply_match(movie, result["movie"]):
+                        matched += 1
+                else:
+                    reason = "ambiguous" if result["candidates"] else "not found"
+                    self.review_queue.add(movie.title, reason, result["year"], result["candidates"])
+        self.review_queue.save()
+        self.matched += matched
+        logging.info(f"Enrichment committed {matched} of {len(results)} results")
+
+        if not update_ui:
+            return
+        self.app.movie_list_panel.refresh()
+        progress = self.progress()
+        self.app.gui_helper.show_status(
+            f"Fetched details for {self.matched} movies, {progress['remaining']} left, "
+            f"{progress['review']} to review"
+        )
+
+    def _apply_match(self, movie, new_movie):
+        """Replace the quick-added movie, unless the match is already in the lists"""
+        for existing in (self.movie_manager.find_by_title(new_movie.title),
+                         self.movie_manager.get_movie_by_id(new_movie.id)):
+            if existing is not None and existing is not movie:
+                self.review_queue.add(movie.title, "duplicate", candidates=[{
+                    "id": new_movie.id, "title": new_movie.title, "release_date": new_movie.release_date
+                }])
+                return False
+        new_movie.user_ratings = movie.user_ratings
+        self.review_queue.remove(movie.title)
+        if not self.movie_manager.update_movie(movie, new_movie):
+            return False
+        self.app.poster_manager.fetch(new_movie, PRIORITY_PREFETCH)
+        return True
@@ -1,7 +1,14 @@
 import tkinter as tk
 from tkinter import messagebox
 from models.manager import MovieManager
+from models.storage import create_storage
+from models.stats import MovieStats
 from gui.gui_helper import GUIHelper
+from gui.thumbnail_loader import ThumbnailLoader
+from gui.enrichment_job import EnrichmentJob
+from gui.poster_manager import PosterManager
+from utils.thumbnail_cache import ThumbnailCache
+from utils.backup_manager import BackupManager
 from gui.gui_settings import SettingsManager
 from gui.gui_search import MovieSearchGUI
 from gui.gui_movie_list import MovieListGUI
@@ -9,7 +16,11 @@ from gui.color_scheme import ColorSchemeManager
 from gui.widgets.entry_panel import EntryPanel  # Ensure this import is included
 from gui.widgets.api_key_dialog import APIKeyDialog
 from api.tmdb_api import TMDbAPI
+from api.tmdb_client import tmdb_client
+from api.response_cache import ResponseCache
+from itertools import islice
 import logging
+import time
 
 # Set up logging
 logging.basicConfig(filename='app.log', level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,7 +33,27 @@ class MovieTrackerApp:
         # Initialize managers and GUIs
         self.settings_manager = SettingsManager()
         self.ui_settings = self.settings_manager.ui_settings
-        self.movie_manager = MovieManager()
+        # Finish (or roll back) a restore that was interrupted before anything reads the data
+        BackupManager.recover()
+        # Movies are streamed in after the window is built (see load_movies_progressively)
+        self.movie_manager = MovieManager(
+            storage=create_storage(
+                self.ui_settings.get("storage_backend", "json"),
+                write_delay=self.ui_settings.get("write_delay_ms", 500) / 1000
+            ),
+            autoload=False
+        )
+        # Kept up to date by MovieManager listeners as movies load and change
+        self.movie_stats = MovieStats(self.movie_manager)
+        # Fills in quick-added movies from TMDb once the lists are loaded
+        self.enrichment = EnrichmentJob(self)
+        # Pre-scaled posters kept on disk between runs
+        self.thumbnail_cache = ThumbnailCache()
+        # Decodes list thumbnails in the background; shared by both lists
+        self.thumbnail_loader = ThumbnailLoader(self.root, cache=self.thumbnail_cache)
+        # TMDb searches, details and images are kept on disk and served from there when offline
+        tmdb_client.cache = ResponseCache()
+        TMDbAPI.set_offline(self.settings_manager.is_offline_mode())
         
         # Set window dimensions from settings with increased height
         width = self.ui_settings.get("window_width", 1000)
@@ -37,7 +68,8 @@ class MovieTrackerApp:
         self.root.minsize(800, 800)  # Increased minimum height from 700 to 800
         
         # Initialize GUI components in correct order
-        self.movie_search_gui = MovieSearchGUI(self.root, self.movie_manager)
+        self.poster_manager = PosterManager(self)
+        self.movie_search_gui = MovieSearchGUI(self.root, self.movie_manager, self.poster_manager)
         self.gui_helper = GUIHelper(self)
         self.movie_list_gui = MovieListGUI(self)
         
@@ -46,19 +78,75 @@ class MovieTrackerApp:
         
         # Setup GUI
         self.gui_helper.create_widgets()
-        self.load_movies()
+        self.load_movies_progressively()
         
         # Bind refresh event
         self.root.bind("<<RefreshMovieList>>", lambda e: self.refresh_movie_list())
 
     def run(self):
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            # Make sure pending background saves reach the disk before exiting
+            self.enrichment.close()
+            self.poster_manager.close()
+            self.movie_manager.close()
+            self.thumbnail_loader.close()
+            self.movie_search_gui.close()
+            tmdb_client.close()
 
     def load_movies(self):
-        self.gui_helper.update_listbox(self.to_watch_listbox, self.movie_manager.movies_to_watch)
-        self.gui_helper.update_listbox(self.watched_listbox, self.movie_manager.movies_watched)
+        # Keeps any search or genre filter the user has applied
+        self.movie_list_panel.refresh()
         self.gui_helper.show_status("Movies loaded successfully")
 
+    def load_movies_progressively(self, chunk_size=200):
+        """Stream movies from storage into the lists in chunks between Tk events"""
+        start = time.perf_counter()
+        loader = self.movie_manager.iter_load_data()
+        state = {"count": 0}
+
+        def load_chunk():
+            chunk = {"to_watch": [], "watched": []}
+            for list_name, movie in islice(loader, chunk_size):
+                chunk[list_name].append(movie)
+            loaded = sum(len(movies) for movies in chunk.values())
+
+            # Look the listboxes up each time in case update_ui() rebuilt them
+            listboxes = {"to_watch": self.to_watch_listbox, "watched": self.watched_listbox}
+            for list_name, movies in chunk.items():
+                if movies:
+                    listboxes[list_name].append_items(movies)
+
+            if loaded:
+                if not state["count"]:
+                    logging.info(f"Startup: first {loaded} movies shown after "
+                                 f"{(time.perf_counter() - start) * 1000:.1f} ms")
+                state["count"] += loaded
+                self.root.after(1, load_chunk)
+            else:
+                logging.info(f"Startup: loaded {state['count']} movies in "
+                             f"{(time.perf_counter() - start) * 1000:.1f} ms")
+                self.movie_list_panel.update_genre_menu()
+                self.gui_helper.show_status("Movies loaded successfully")
+                self.build_search_index()
+
+        load_chunk()
+
+    def build_search_index(self, chunk_size=500):
+        """Index the loaded movies for searching in small chunks between Tk events"""
+        start = time.perf_counter()
+
+        def index_chunk():
+            if self.movie_manager.search_index.index_pending(chunk_size):
+                self.root.after(1, index_chunk)
+            else:
+                logging.info(f"Search index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+                self.enrichment.start()
+                self.poster_manager.backfill()
+
+        self.root.after(1, index_chunk)
+
     def update_ui(self):
         # Store current window dimensions before recreating widgets
         current_width = self.root.winfo_width()
@@ -121,6 +209,8 @@ class MovieTrackerApp:
 
     def check_api_key(self):
         """Check for API key and prompt if needed"""
+        if self.settings_manager.get_api_key() and not self.settings_manager.is_offline_mode():
+            TMDbAPI.set_api_key(self.settings_manager.get_api_key())
         if not self.settings_manager.get_api_key() and not self.settings_manager.is_offline_mode():
             dialog = APIKeyDialog(self.root, self.settings_manager)
             self.root.wait_window(dialog)
@@ -128,12 +218,14 @@ class MovieTrackerApp:
             if dialog.result == "api_key":
                 TMDbAPI.set_api_key(self.settings_manager.get_api_key())
             elif dialog.result == "offline":
+                TMDbAPI.set_offline(True)
                 self.movie_search_gui.disable_search()
 
     def toggle_offline_mode(self, enable=True):
         """Toggle offline mode"""
         if enable:
             self.settings_manager.enable_offline_mode()
+            TMDbAPI.set_offline(True)
             self.movie_search_gui.disable_search()
         else:
             api_key = self.settings_manager.get_api_key()
@@ -141,6 +233,8 @@ class MovieTrackerApp:
                 self.settings_manager.set_api_key(api_key)
                 TMDbAPI.set_api_key(api_key)
                 self.movie_search_gui.enable_search()
+                self.enrichment.start()
+                self.poster_manager.backfill()
 
 def main():
     app = MovieTrackerApp()
@@ -10,31 +10,30 @@ from gui.widgets.entry_panel import EntryPanel
 from gui.widgets.tooltip import TooltipManager
 from gui.widgets.window_manager import WindowManager
 from gui.widgets.settings_dialog import SettingsDialog
+from api.tmdb_client import tmdb_client
+
+NETWORK_STATUS_MS = 500
 
 class GUIHelper:
     def __init__(self, app):
         self.app = app
         self.window_manager = WindowManager(app)
         self.tooltip_manager = TooltipManager(app)
+        self._network_status_job = None
         
     def update_listbox(self, listbox, items):
         logging.debug(f"Updating listbox with {len(items)} items")
-        listbox.delete(0, tk.END)
-        for item in items:
-            listbox.insert(tk.END, item)  # Pass the movie object instead of item.title
-        listbox.update()
+        listbox.set_items(items)  # Pass the movie objects instead of their titles
         
         # Update genre menu if we're updating a movie listbox
         if hasattr(listbox, 'master') and hasattr(listbox.master, 'master'):
             movie_list_panel = listbox.master.master
-            if hasattr(movie_list_panel, 'update_genre_menu'):
-                movie_list_panel.update_genre_menu()
+            if hasattr(movie_list_panel, 'schedule_genre_menu_update'):
+                movie_list_panel.schedule_genre_menu_update()
 
     def show_movie_poster(self, movie):
-        poster_path = movie.get_poster_path()
+        poster_path = movie.get_poster_path(self.window_manager.POSTER_SIZE)
         if (poster_path):
-            if not poster_path.startswith("http"):
-                poster_path = os.path.join("data/posters", os.path.basename(poster_path))
             if os.path.exists(poster_path):
                 self.window_manager.show_poster_window(movie, poster_path)
             else:
@@ -78,6 +77,7 @@ class GUIHelper:
         self.app.search_entry = entry_panel.search_entry
         self.app.label_to_watch = movie_list_panel.label_to_watch
         self.app.label_watched = movie_list_panel.label_watched
+        self.app.movie_list_panel = movie_list_panel
 
         # Add status bar at bottom
         self.status_var = tk.StringVar()
@@ -92,11 +92,41 @@ class GUIHelper:
         )
         self.status_bar.pack(side='bottom', fill='x')
 
+        # TMDb request queue on the right of the status bar
+        self.network_var = tk.StringVar()
+        self.network_label = tk.Label(
+            self.status_bar,
+            textvariable=self.network_var,
+            anchor=tk.E,
+            bg=self.app.ui_settings["secondary_bg"],
+            fg=self.app.ui_settings["text_color"]
+        )
+        self.network_label.pack(side='right', padx=5)
+        self.update_network_status()
+
     def show_status(self, message, timeout=3000):
         """Show a message in the status bar that disappears after timeout ms"""
         self.status_var.set(message)
         self.app.root.after(timeout, lambda: self.status_var.set(""))
 
+    def update_network_status(self):
+        """Show how many TMDb requests are queued or running and how long they wait"""
+        status = tmdb_client.scheduler.status()
+        if status["paused_for"]:
+            text = f"TMDb rate limited, resuming in {status['paused_for']:.0f}s ({status['queued']} queued)"
+        elif status["queued"]:
+            text = f"TMDb: {status['queued']} queued, ~{status['recent_wait_ms'] / 1000:.1f}s wait"
+        elif status["in_flight"]:
+            text = f"TMDb: {status['in_flight']} loading"
+        else:
+            text = ""
+        if self.network_var.get() != text:
+            self.network_var.set(text)
+        # create_widgets() calls this again when the UI is rebuilt; keep a single loop running
+        if self._network_status_job is not None:
+            self.app.root.after_cancel(self._network_status_job)
+        self._network_status_job = self.app.root.after(NETWORK_STATUS_MS, self.update_network_status)
+
     def open_settings(self):
         """Open the settings dialog"""
         dialog = SettingsDialog(self.app.root, self.app.settings_manager)
@@ -17,6 +17,7 @@ class MovieListGUI:
         if self.movie_manager.add_movie(movie):
             self.app.load_movies()  # Refresh the display
             self.app.gui_helper.show_status(f"Added '{title}' to watchlist")
+            self.app.enrichment.start()
         else:
             messagebox.showwarning("Warning", "Movie already exists in your lists!")
 
@@ -30,11 +31,8 @@ class MovieListGUI:
         if messagebox.askyesno("Confirm", f"Remove '{selected_movie.title}' from your lists?"):
             try:
                 self.app.movie_manager.remove_movie(selected_movie)
-                # Update both listboxes
-                self.app.gui_helper.update_listbox(self.app.to_watch_listbox, 
-                                                 self.app.movie_manager.movies_to_watch)
-                self.app.gui_helper.update_listbox(self.app.watched_listbox, 
-                                                 self.app.movie_manager.movies_watched)
+                # Drop just that row from whichever listbox shows it
+                self.app.movie_list_panel.show_removed(selected_movie)
                 self.app.gui_helper.show_status(f"Removed {selected_movie.title}")
             except Exception as e:
                 logging.error(f"Error removing movie: {e}")
@@ -45,10 +43,10 @@ class MovieListGUI:
         selected = self.app.to_watch_listbox.curselection()
         if selected:
             movie_title = self.app.to_watch_listbox.get(selected[0])
-            movie = next((m for m in self.movie_manager.movies_to_watch if m.title == movie_title), None)
+            movie = self.movie_manager.find_by_title(movie_title)
             if movie:
                 self.movie_manager.mark_as_watched(movie)
-                self.app.load_movies()  # Ensure the movie list is updated after marking a movie as watched
+                self.app.movie_list_panel.show_moved(movie, "watched")
         else:
             messagebox.showwarning("Warning", "Please select a movie to mark as watched!")
 
@@ -57,20 +55,15 @@ class MovieListGUI:
         selected = self.app.watched_listbox.curselection()
         if selected:
             movie_title = self.app.watched_listbox.get(selected[0])
-            movie = next((m for m in self.movie_manager.movies_watched if m.title == movie_title), None)
+            movie = self.movie_manager.find_by_title(movie_title)
             if movie:
                 self.movie_manager.unwatch_movie(movie)
-                self.app.load_movies()  # Ensure the movie list is updated after unwatching a movie
+                self.app.movie_list_panel.show_moved(movie, "to_watch")
         else:
             messagebox.showwarning("Warning", "Please select a movie to un-watch!")
 
     def refresh(self):
-        self.app.to_watch_listbox.delete(0, tk.END)
-        for movie in self.movie_manager.movies_to_watch:
-            self.app.to_watch_listbox.insert(tk.END, movie.title)
-        self.app.watched_listbox.delete(0, tk.END)
-        for movie in self.movie_manager.movies_watched:
-            self.app.watched_listbox.insert(tk.END, movie.title)
+        self.app.movie_list_panel.refresh()
 
     def fetch_details(self):
         """Fetch details from TMDb for a quick-added movie"""
@@ -1,19 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
-import requests
 import logging
 from io import BytesIO
-from api.tmdb_api import TMDbAPI
+from api.tmdb_api import TMDbAPI, image_url
+from api.tmdb_client import tmdb_client
 from models.movie import Movie
 from gui.color_scheme import ColorSchemeManager
+from gui.background import BackgroundRunner
+from utils.poster_store import poster_store, POSTER_VARIANTS
 
 class MovieSearchGUI:
-    def __init__(self, root, movie_manager):
+    TYPING_DELAY_MS = 500
+
+    def __init__(self, root, movie_manager, poster_manager=None):
         self.root = root
         self.movie_manager = movie_manager
+        self.poster_manager = poster_manager
         self.search_results = []
         self.temp_images = {}  # Store thumbnail images while window is open
+        # TMDb searches and poster downloads run here so the window never blocks
+        self.runner = BackgroundRunner(root, workers=6, name="tmdb")
 
         # Create search controls in main window
         self.search_frame = tk.Frame(self.root)
@@ -54,7 +61,6 @@ class MovieSearchGUI:
         # Use the provided title for search
         if title and title.strip():
             search_entry.insert(0, title.strip())
-            search_window.after(100, lambda: perform_search())
 
         # Results area
         results_frame = tk.Frame(left_frame)
@@ -83,21 +89,49 @@ class MovieSearchGUI:
         preview_info = tk.Text(right_frame, wrap='word', height=10, width=40)
         preview_info.pack(pady=5, padx=5, fill='both', expand=True)
 
-        def load_thumbnail(url):
-            """Load a thumbnail from URL"""
-            if not url:
+        # Each search bumps the generation; results from older searches are dropped
+        search_state = {"generation": 0, "futures": [], "typing_job": None, "selecting": False}
+
+        def fetch_thumbnail(movie_id, url):
+            """Load a poster's search variant from the store, else download and scale it (runs on a worker thread)"""
+            stored = poster_store.path(movie_id, POSTER_VARIANTS["search"])
+            if stored and poster_store.is_variant(stored):
+                with Image.open(stored) as img:
+                    return img.copy()
+            response = tmdb_client.get(url, endpoint="image")
+            if response.status_code != 200:
                 return None
-            try:
-                response = requests.get(f"https://image.tmdb.org/t/p/w92{url}")
-                if response.status_code == 200:
-                    img = Image.open(BytesIO(response.content))
-                    img.thumbnail((92, 138))  # Maintain aspect ratio
-                    return ImageTk.PhotoImage(img)
-            except Exception as e:
+            img = Image.open(BytesIO(response.content))
+            img.thumbnail(POSTER_VARIANTS["search"])  # Maintain aspect ratio
+            return img
+
+        def load_thumbnail_async(movie, on_loaded):
+            """Fetch a result's thumbnail in the background, then call on_loaded(photo) on the Tk thread"""
+            generation = search_state["generation"]
+
+            def on_done(img):
+                if img is None or generation != search_state["generation"] or not search_window.winfo_exists():
+                    return
+                photo = ImageTk.PhotoImage(img)
+                self.temp_images[movie['id']] = photo
+                on_loaded(photo)
+
+            def on_error(e):
                 logging.error(f"Error loading thumbnail: {e}")
-            return None
 
-        def perform_search():
+            search_state["futures"].append(self.runner.submit(
+                fetch_thumbnail, movie['id'], image_url(movie['poster_path']), on_done=on_done, on_error=on_error
+            ))
+
+        def cancel_pending():
+            """Forget the current search and drop its requests that have not started yet"""
+            search_state["generation"] += 1
+            for future in search_state["futures"]:
+                future.cancel()
+            search_state["futures"] = []
+
+        def perform_search(show_warning=True):
+            cancel_pending()
             # Clear previous results
             for widget in scrollable_frame.winfo_children():
                 widget.destroy()
@@ -105,51 +139,78 @@ class MovieSearchGUI:
 
             query = search_entry.get().strip()
             if not query:
-                messagebox.showwarning("Warning", "Please enter a movie title!")
+                if show_warning:
+                    messagebox.showwarning("Warning", "Please enter a movie title!")
                 return
 
-            try:
-                results = TMDbAPI.search_movie(query)
-                self.search_results = results
+            status_label = tk.Label(scrollable_frame, text=f"Searching for '{query}'...")
+            status_label.pack(pady=10)
+            generation = search_state["generation"]
 
-                if not results:
-                    tk.Label(scrollable_frame, text="No results found").pack(pady=10)
+            def on_results(results):
+                if generation != search_state["generation"] or not search_window.winfo_exists():
                     return
+                status_label.destroy()
+                show_results(results)
 
-                for movie in results:
-                    # Create frame for result
-                    result_frame = tk.Frame(scrollable_frame, relief='groove', bd=1)
-                    result_frame.pack(fill='x', pady=2, padx=5)
-                    
-                    # Make the frame focusable
-                    result_frame.configure(takefocus=1)
-                    
-                    # Load thumbnail if available
-                    if movie.get('poster_path'):
-                        img = load_thumbnail(movie['poster_path'])
-                        if img:
-                            self.temp_images[movie['id']] = img
-                            tk.Label(result_frame, image=img).pack(side='left', padx=5, pady=5)
-                    
-                    # Add movie info
-                    info_frame = tk.Frame(result_frame)
-                    info_frame.pack(side='left', fill='both', expand=True, padx=5, pady=5)
-                    
-                    title = movie['title']
-                    if movie.get('release_date'):
-                        title += f" ({movie['release_date'][:4]})"
-                    label = tk.Label(info_frame, text=title, anchor='w', justify='left')
-                    label.pack(fill='x')
-                    
-                    # Bind clicks to all widgets in the frame
-                    for widget in [result_frame, info_frame, label]:
-                        widget.bind('<Button-1>', lambda e, m=movie: show_preview(m))
-                        widget.bind('<Double-Button-1>', lambda e, m=movie: select_and_close(m))
-
-            except Exception as e:
+            def on_error(e):
+                if generation != search_state["generation"] or not search_window.winfo_exists():
+                    return
                 logging.error(f"Search error: {e}")
+                status_label.config(text="Search failed")
                 messagebox.showerror("Error", "Failed to search movies")
 
+            search_state["futures"].append(
+                self.runner.submit(TMDbAPI.search_movie, query, on_done=on_results, on_error=on_error)
+            )
+
+        def show_results(results):
+            self.search_results = results
+
+            if not results:
+                tk.Label(scrollable_frame, text="No results found").pack(pady=10)
+                return
+
+            for movie in results:
+                # Create frame for result
+                result_frame = tk.Frame(scrollable_frame, relief='groove', bd=1)
+                result_frame.pack(fill='x', pady=2, padx=5)
+                
+                # Make the frame focusable
+                result_frame.configure(takefocus=1)
+                
+                # Poster streams in when its download finishes
+                if movie.get('poster_path'):
+                    thumb_label = tk.Label(result_frame)
+                    thumb_label.pack(side='left', padx=5, pady=5)
+                    load_thumbnail_async(movie, lambda photo, label=thumb_label: label.config(image=photo))
+                
+                # Add movie info
+                info_frame = tk.Frame(result_frame)
+                info_frame.pack(side='left', fill='both', expand=True, padx=5, pady=5)
+                
+                title = movie['title']
+                if movie.get('release_date'):
+                    title += f" ({movie['release_date'][:4]})"
+                label = tk.Label(info_frame, text=title, anchor='w', justify='left')
+                label.pack(fill='x')
+                
+                # Bind clicks to all widgets in the frame
+                for widget in [result_frame, info_frame, label]:
+                    widget.bind('<Button-1>', lambda e, m=movie: show_preview(m))
+                    widget.bind('<Double-Button-1>', lambda e, m=movie: select_and_close(m))
+
+        def on_typing(event):
+            # Search again after a pause in typing; stale results are discarded
+            if event.keysym == 'Return':
+                return
+            if search_state["typing_job"] is not None:
+                search_window.after_cancel(search_state["typing_job"])
+            search_state["typing_job"] = search_window.after(
+                self.TYPING_DELAY_MS, lambda: [search_state.update(typing_job=None),
+                                               perform_search(show_warning=False)]
+            )
+
         def show_preview(movie):
             preview_info.config(state='normal')
             preview_info.delete(1.0, tk.END)
@@ -168,18 +229,45 @@ class MovieSearchGUI:
             
             # Show poster if available
             if movie.get('poster_path'):
-                img = load_thumbnail(movie['poster_path'])
-                if img:
-                    preview_poster.config(image=img)
-                    preview_poster.image = img
+                def show_poster(photo):
+                    preview_poster.config(image=photo)
+                    preview_poster.image = photo
+                if movie['id'] in self.temp_images:
+                    show_poster(self.temp_images[movie['id']])
+                else:
+                    load_thumbnail_async(movie, show_poster)
 
         def select_and_close(movie_data):
-            """Handle selection and window closing in one function"""
+            """Fetch full details in the background, then add the movie and close the window"""
+            if search_state["selecting"]:
+                return  # Already fetching details for a selection
+            logging.debug(f"Selecting movie: {movie_data['title']}")
+            search_state["selecting"] = True
+            select_button.config(state="disabled")
+
+            def finish():
+                search_state["selecting"] = False
+                select_button.config(state="normal")
+
+            def on_details(details):
+                if not search_window.winfo_exists():
+                    return
+                finish()
+                add_selected(movie_data, details)
+
+            def on_error(e):
+                if not search_window.winfo_exists():
+                    return
+                finish()
+                logging.error(f"Error selecting movie: {e}")
+                messagebox.showerror("Error", f"Failed to process movie: {str(e)}")
+
+            self.runner.submit(TMDbAPI.get_movie_details, movie_data["id"],
+                               on_done=on_details, on_error=on_error)
+
+        def add_selected(movie_data, details):
+            """Add (or update) the selected movie with its full details"""
             try:
-                logging.debug(f"Selecting movie: {movie_data['title']}")
-                
-                # Get full details
-                details = TMDbAPI.get_movie_details(movie_data["id"])
                 if not details:
                     logging.error("Failed to get movie details from TMDb")
                     messagebox.showerror("Error", "Failed to get movie details from TMDb")
@@ -195,7 +283,8 @@ class MovieSearchGUI:
                     poster_path=movie_data.get("poster_path"),
                     details=movie_data
                 )
-                new_movie.save_poster()
+                if self.poster_manager is None:
+                    new_movie.save_poster()
                 new_movie.needs_details = False
                 
                 success = False
@@ -209,9 +298,16 @@ class MovieSearchGUI:
                     
                 if success:
                     logging.debug("Successfully updated/added movie")
+                    # The poster is downloaded in the background and shows up when it lands
+                    if self.poster_manager is not None:
+                        self.poster_manager.fetch(new_movie)
                     self.root.event_generate("<<RefreshMovieList>>")
+                    cancel_pending()
                     search_window.destroy()
                     return True
+                elif self.movie_manager.find_by_title(new_movie.title) is not None:
+                    messagebox.showwarning("Warning", "Movie already exists in your lists!")
+                    return False
                 else:
                     logging.error("Failed to update/add movie")
                     messagebox.showerror("Error", "Failed to update/add movie to your list")
@@ -241,15 +337,21 @@ class MovieSearchGUI:
                                     None))
         select_button.pack(pady=10)
         
-        # Bind enter key to search
+        # Bind enter key to search, and search again as the user types
         search_entry.bind('<Return>', lambda e: perform_search())
+        search_entry.bind('<KeyRelease>', on_typing)
         
         # Do initial search if title provided
         if title:
             perform_search()
 
         # Clean up on window close
-        search_window.protocol("WM_DELETE_WINDOW", lambda: [search_window.destroy(), self.temp_images.clear()])
+        search_window.protocol("WM_DELETE_WINDOW",
+                               lambda: [cancel_pending(), search_window.destroy(), self.temp_images.clear()])
+
+    def close(self):
+        """Stop background TMDb requests"""
+        self.runner.close()
 
     def disable_search(self):
         """Disable search functionality for offline mode"""
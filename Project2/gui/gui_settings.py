@@ -30,6 +30,8 @@ class SettingsManager:
             "offline_mode": False,
             "api_key": None,
             "current_scheme": "Dark Purple",
+            "storage_backend": "json",  # "json", "jsonl" (JSON Lines) or "sqlite"
+            "write_delay_ms": 500,  # Coalescing window for background saves
         }
         
         self.load_settings()
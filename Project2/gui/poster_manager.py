@@ -0,0 +1,174 @@
+# This file defines the PosterManager class. It downloads posters in the background and backfills the ones the library is missing.
+
+import os
+import logging
+from collections import deque
+from functools import partial
+
+from api.tmdb_api import TMDbAPI
+from api.request_scheduler import PRIORITY_INTERACTIVE, PRIORITY_PREFETCH
+from gui.background import BackgroundRunner
+from utils.posters import download_poster
+from utils.poster_store import poster_store, POSTER_DIR
+
+
+class PosterManager:
+    """Poster downloads on a bounded worker pool, delivered back on the Tk thread.
+
+    fetch() queues one movie's poster; concurrent requests for the same
+    TMDb id share a single download. Posters go into the PosterStore under
+    the movie's id, and the movie's row is redrawn when one lands.
+    backfill() walks the whole library in chunks between Tk events and
+    fetches every poster that is not in the store yet, at prefetch
+    priority so searches and enrichment go first. Posters saved by name
+    before the store existed are moved into it instead of downloaded.
+    Stored posters still missing their scaled variants get them rendered.
+    Afterwards images no movie uses any more are garbage collected.
+    """
+
+    SCAN_CHUNK = 500   # Movies checked per Tk event while looking for missing posters
+    STATUS_EVERY = 25  # Report backfill progress after this many downloads
+
+    def __init__(self, app, workers=4, store=poster_store):
+        self.app = app
+        self.workers = workers
+        self.store = store
+        self.runner = BackgroundRunner(app.root, workers=workers, name="posters")
+        self.downloaded = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self._waiting = {}  # TMDb id -> [(movie, on_done)] for the download in progress
+        self._backfill = None  # Progress of a running backfill
+        app.movie_manager.add_listener(self._on_movie_event)
+
+    def fetch(self, movie, priority=PRIORITY_INTERACTIVE, on_done=None):
+        """Download a movie's poster in the background, then call on_done(movie, ok) on the Tk thread"""
+        if movie.id is None:
+            return False
+        waiting = self._waiting.get(movie.id)
+        if waiting is not None:
+            waiting.append((movie, on_done))
+            self.deduplicated += 1
+            return True
+        self._waiting[movie.id] = [(movie, on_done)]
+        self.runner.submit(self._download, movie.id, self._tmdb_path(movie), self._legacy_file(movie), priority,
+                           on_done=partial(self._on_downloaded, movie.id),
+                           on_error=partial(self._on_failed, movie.id))
+        return True
+
+    def backfill(self):
+        """Fetch every missing poster in the library; progress goes to the status bar"""
+        if self._backfill is not None or not TMDbAPI.is_available():
+            return
+        self._backfill = {
+            "movies": self.app.movie_manager.movies_to_watch + self.app.movie_manager.movies_watched,
+            "position": 0, "pending": deque(), "outstanding": 0, "total": 0, "done": 0
+        }
+        self._scan_chunk()
+
+    def close(self):
+        self._backfill = None
+        self.runner.close()
+        self.store.save()
+
+    def is_missing(self, movie):
+        """True for a movie with a poster on TMDb that is not in the store, or lacks its variants"""
+        if movie.id is None or not movie.poster_path or movie.poster_path.startswith("http"):
+            return False
+        return not self.store.has(movie.id, variants=True)
+
+    @staticmethod
+    def _legacy_file(movie):
+        """File a poster was saved to by name before the poster store existed"""
+        if movie.poster_path and not movie.poster_path.startswith(('/', 'http')):
+            return os.path.join(POSTER_DIR, movie.poster_path)
+        return None
+
+    @staticmethod
+    def _tmdb_path(movie):
+        """TMDb poster path, if the movie knows it without loading details"""
+        if movie.poster_path and movie.poster_path.startswith('/'):
+            return movie.poster_path
+        details = movie.get_loaded_details() or {}
+        return movie.summary.get("poster_path") or details.get("poster_path")
+
+    def _download(self, movie_id, tmdb_path, legacy_file, priority):
+        """Runs on a worker thread; returns True once the poster is in the store"""
+        if self.store.has(movie_id):
+            self.store.ensure_variants(movie_id)
+            return True
+        if legacy_file and os.path.exists(legacy_file) and os.path.getsize(legacy_file):
+            self.store.put_file(movie_id, legacy_file, move=True)
+            return True
+        if tmdb_path is None:
+            # Summaries saved before they kept the poster path
+            tmdb_path = TMDbAPI.get_movie_details(movie_id, priority=priority).get("poster_path")
+            if not tmdb_path:
+                return False
+        return download_poster(tmdb_path, movie_id, priority, self.store)
+
+    def _on_downloaded(self, movie_id, ok):
+        if ok:
+            self.downloaded += 1
+        else:
+            self.failed += 1
+        for movie, on_done in self._waiting.pop(movie_id, []):
+            if ok and self.app.movie_manager.list_name_of(movie) is not None:
+                self.app.movie_list_panel.show_changed(movie)
+            if on_done is not None:
+                try:
+                    on_done(movie, ok)
+                except Exception as e:
+                    logging.error(f"Poster callback failed for {movie.title}: {e}")
+
+    def _on_failed(self, movie_id, error):
+        logging.error(f"Poster download failed for movie {movie_id}: {error}")
+        self._on_downloaded(movie_id, False)
+
+    def _on_movie_event(self, event, movie, list_name):
+        # Drop the store's reference once no movie with this id is left
+        if event == "deleted" and movie.id is not None and self.app.movie_manager.get_movie_by_id(movie.id) is None:
+            self.store.release(movie.id)
+
+    def _scan_chunk(self):
+        state = self._backfill
+        if state is None:
+            return
+        start = state["position"]
+        state["position"] = min(start + self.SCAN_CHUNK, len(state["movies"]))
+        for movie in state["movies"][start:state["position"]]:
+            if self.is_missing(movie):
+                state["pending"].append(movie)
+        self._pump()
+        if self._backfill is not None and state["position"] < len(state["movies"]):
+            self.app.root.after(1, self._scan_chunk)
+
+    def _pump(self):
+        """Keep a few backfill downloads queued without flooding the worker pool"""
+        state = self._backfill
+        while state["pending"] and state["outstanding"] < self.workers * 2:
+            movie = state["pending"].popleft()
+            if self.fetch(movie, PRIORITY_PREFETCH, on_done=self._on_backfilled):
+                state["outstanding"] += 1
+                state["total"] += 1
+        if state["position"] >= len(state["movies"]) and not state["pending"] and not state["outstanding"]:
+            self._backfill = None
+            if state["total"]:
+                logging.info(f"Poster backfill: {state['done']} of {state['total']} downloaded")
+                self.app.gui_helper.show_status(f"Downloaded {state['done']} missing posters")
+            # The library may have changed since the backfill started, so read it now
+            manager = self.app.movie_manager
+            live_ids = [movie.id for movie in manager.movies_to_watch + manager.movies_watched
+                        if movie.id is not None]
+            self.runner.submit(self.store.gc, live_ids)
+
+    def _on_backfilled(self, movie, ok):
+        state = self._backfill
+        if state is None:
+            return
+        state["outstanding"] -= 1
+        state["done"] += int(ok)
+        if state["done"] and state["done"] % self.STATUS_EVERY == 0:
+            remaining = len(state["pending"]) + state["outstanding"]
+            self.app.gui_helper.show_status(f"Downloading posters: {state['done']} done, {remaining} left")
+        self._pump()
@@ -0,0 +1,111 @@
+# This file defines the ThumbnailLoader class. It decodes poster thumbnails on worker threads and caches them for the listboxes.
+
+import os
+import queue
+import logging
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import ImageTk
+from utils.thumbnail_cache import ThumbnailCache
+
+
+class ThumbnailLoader:
+    """Decode poster thumbnails off the Tk thread and keep them in an LRU cache.
+
+    get() returns a cached PhotoImage right away, or None after queueing
+    the poster for decoding. Worker threads only produce PIL images;
+    finished results are picked up by a short after() poll on the Tk
+    thread, turned into PhotoImages, cached and handed to the callbacks
+    that asked for them. One loader is shared by every listbox, so
+    thumbnails survive list refreshes and widget rebuilds. With a
+    ThumbnailCache, scaled images are also read from and saved to disk.
+    """
+
+    POLL_MS = 15
+
+    def __init__(self, root, size=(40, 60), max_items=1000, workers=2, cache=None):
+        self.root = root
+        self.cache = cache
+        self.size = size
+        self.max_items = max_items
+        self._cache = OrderedDict()  # poster path -> PhotoImage (None if it could not be read)
+        self._callbacks = {}         # poster path -> callbacks waiting for it
+        self._results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        self._poll_job = None
+
+    def get(self, poster_path, callback=None):
+        """Return the cached thumbnail, or None and call callback(poster_path, photo) once decoded"""
+        if poster_path in self._cache:
+            self._cache.move_to_end(poster_path)
+            return self._cache[poster_path]
+
+        callbacks = self._callbacks.get(poster_path)
+        if callbacks is None:
+            callbacks = self._callbacks[poster_path] = []
+            self._executor.submit(self._decode_job, poster_path)
+            self._schedule_poll()
+        if callback is not None and callback not in callbacks:
+            callbacks.append(callback)
+        return None
+
+    def clear(self):
+        self._cache.clear()
+
+    def close(self):
+        """Stop the workers, dropping any queued decodes, and save the disk cache index"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self.cache is not None:
+            self.cache.save()
+            logging.info(f"Thumbnail cache: {self.cache.hits} hits, {self.cache.misses} misses")
+        if self._poll_job is not None:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except tk.TclError:
+                pass  # The window is already gone
+            self._poll_job = None
+
+    def _decode_job(self, poster_path):
+        try:
+            image = self.decode(poster_path)
+        except Exception as e:
+            logging.error(f"Error creating thumbnail for {poster_path}: {e}")
+            image = None
+        self._results.put((poster_path, image))
+
+    def decode(self, poster_path):
+        """Scaled PIL image for a poster, from the disk cache when there is one"""
+        if self.cache is not None:
+            return self.cache.get(poster_path, self.size)
+        if not poster_path or not os.path.exists(poster_path):
+            return None
+        return ThumbnailCache.scale(poster_path, self.size)
+
+    def _schedule_poll(self):
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        """Turn decoded images into PhotoImages on the Tk thread and notify waiting widgets"""
+        self._poll_job = None
+        while True:
+            try:
+                poster_path, image = self._results.get_nowait()
+            except queue.Empty:
+                break
+            photo = ImageTk.PhotoImage(image) if image is not None else None
+            self._store(poster_path, photo)
+            for callback in self._callbacks.pop(poster_path, []):
+                try:
+                    callback(poster_path, photo)
+                except Exception as e:
+                    logging.error(f"Thumbnail callback failed for {poster_path}: {e}")
+        if self._callbacks:
+            self._schedule_poll()
+
+    def _store(self, poster_path, photo):
+        self._cache[poster_path] = photo
+        self._cache.move_to_end(poster_path)
+        while len(self._cache) > self.max_items:
+            self._cache.popitem(last=False)
@@ -1,15 +1,33 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
-from utils.backup_manager import BackupManager
+import contextlib
+import threading
+from functools import partial
+from api.tmdb_client import tmdb_client
+from gui.background import BackgroundRunner
+from utils.backup_manager import BackupManager, BackupCancelled
+from utils.poster_store import poster_store
 
 class BackupDialog(tk.Toplevel):
+    PROGRESS_MS = 100
+    RESTORE_CHOICES = (
+        ("Everything", None),
+        ("Movies only", ("movies",)),
+        ("Posters only", ("posters",))
+    )
+
     def __init__(self, parent, app):
         super().__init__(parent)
         self.app = app
+        # Backups run on a worker thread; it reports progress through these
+        self.runner = BackgroundRunner(self, workers=1, name="backup")
+        self._cancel = None
+        self._progress = (0, 0)
+        self._progress_job = None
         self.title("Backup and Restore")
-        self.geometry("500x450")  # Increased height from 400 to 450
-        self.minsize(500, 450)    # Also increased minimum height
+        self.geometry("500x560")
+        self.minsize(500, 560)
         self.resizable(True, True)
         self.transient(parent)
         self.grab_set()
@@ -30,15 +48,22 @@ class BackupDialog(tk.Toplevel):
                  style="Header.TLabel").pack(pady=(0, 5))
         
         ttk.Label(backup_frame, 
-                 text="This will save your movie list, posters, and all cached data\n"
-                      "to a single file that you can restore later.",
+                 text="This will save your movie list, posters, and all cached data.\n"
+                      "Only files changed since the last backup are added, so keep\n"
+                      "earlier backups: newer ones build on them.",
                  style="Info.TLabel",
                  justify="left").pack(pady=(0, 10))
         
-        ttk.Button(backup_frame, 
-                  text="Create Backup", 
-                  command=self.create_backup,
-                  width=20).pack()
+        self.backup_button = ttk.Button(backup_frame,
+                                        text="Create Backup",
+                                        command=self.create_backup,
+                                        width=20)
+        self.backup_button.pack()
+
+        self.progress_bar = ttk.Progressbar(backup_frame, mode="determinate")
+        self.progress_bar.pack(fill="x", pady=(10, 0))
+        self.progress_label = ttk.Label(backup_frame, text="", style="Info.TLabel")
+        self.progress_label.pack()
 
         # Restore section
         restore_frame = ttk.LabelFrame(main_frame, text="Restore", padding="15")
@@ -50,54 +75,216 @@ class BackupDialog(tk.Toplevel):
         
         ttk.Label(restore_frame, 
                  text="Select a previous backup file to restore your movie collection.\n"
-                      "This will replace your current data with the backup's contents.\n"
-                      "Your current data will be lost.",
+                      "The chosen part of your current data is replaced with the backup's.\n"
+                      "The backup is checked first; if it is damaged, nothing changes.",
                  style="Info.TLabel",
                  justify="left").pack(pady=(0, 10))
-        
-        ttk.Button(restore_frame, 
-                  text="Restore from Backup",
-                  command=self.restore_backup,
-                  width=20).pack()
+
+        self.restore_choice = tk.IntVar(value=0)
+        choice_frame = ttk.Frame(restore_frame)
+        choice_frame.pack(pady=(0, 10))
+        for index, (label, _) in enumerate(self.RESTORE_CHOICES):
+            ttk.Radiobutton(choice_frame, text=label, variable=self.restore_choice,
+                            value=index).pack(side="left", padx=5)
+
+        restore_buttons = ttk.Frame(restore_frame)
+        restore_buttons.pack()
+        self.restore_button = ttk.Button(restore_buttons,
+                                         text="Restore from Backup",
+                                         command=self.restore_backup,
+                                         width=20)
+        self.restore_button.pack(side="left", padx=5)
+        self.verify_button = ttk.Button(restore_buttons,
+                                        text="Verify Backup",
+                                        command=self.verify_backup,
+                                        width=20)
+        self.verify_button.pack(side="left", padx=5)
 
         # Close button at bottom
         ttk.Button(main_frame, 
                   text="Close",
-                  command=self.destroy,
+                  command=self.close,
                   width=20).pack(pady=(0, 5))
+        self.protocol("WM_DELETE_WINDOW", self.close)
 
         self.center_window()
 
     def create_backup(self):
+        """Start a backup on a worker thread, or cancel the one that is running"""
+        if self._cancel is not None:
+            self._cancel.set()
+            self.backup_button.config(state="disabled")
+            self.progress_label.config(text="Cancelling...")
+            return
         try:
-            backup_file = BackupManager.create_backup()
-            messagebox.showinfo("Success", 
-                              f"Backup created successfully!\n\n"
-                              f"Location: {backup_file}")
+            self.app.movie_manager.flush()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to create backup: {str(e)}")
+            return
+        self._cancel = threading.Event()
+        self._progress = (0, 0)
+        self.backup_button.config(text="Cancel Backup")
+        self.restore_button.config(state="disabled")
+        self.verify_button.config(state="disabled")
+        self.progress_label.config(text="Looking for changes...")
+        self.runner.submit(BackupManager.create_backup, "data", "backups", False,
+                           self._on_progress, self._cancel,
+                           on_done=self._on_backup_done, on_error=self._on_backup_failed)
+        self._progress_job = self.after(self.PROGRESS_MS, self._show_progress)
+
+    def _on_progress(self, done, total):
+        # Worker thread: just remember it, the Tk thread polls
+        self._progress = (done, total)
+
+    def _show_progress(self):
+        done, total = self._progress
+        if total:
+            self.progress_bar.config(maximum=total, value=done)
+            self.progress_label.config(text=f"{done} of {total} files")
+        self._progress_job = self.after(self.PROGRESS_MS, self._show_progress)
+
+    def _job_finished(self):
+        self._cancel = None
+        if self._progress_job is not None:
+            self.after_cancel(self._progress_job)
+            self._progress_job = None
+        self.backup_button.config(text="Create Backup", state="normal")
+        self.restore_button.config(state="normal")
+        self.verify_button.config(state="normal")
+        self.progress_bar.config(value=0)
+        self.progress_label.config(text="")
+
+    def _on_backup_done(self, backup_file):
+        if not self.winfo_exists():
+            return
+        self._job_finished()
+        messagebox.showinfo("Success", 
+                          f"Backup created successfully!\n\n"
+                          f"Location: {backup_file}")
+
+    def _on_backup_failed(self, error):
+        if not self.winfo_exists():
+            return
+        self._job_finished()
+        if not isinstance(error, BackupCancelled):
+            messagebox.showerror("Error", f"Failed to create backup: {str(error)}")
+
+    def verify_backup(self):
+        """Read a backup and check every file's checksum on a worker thread, without restoring it"""
+        backup_file = self._ask_backup_file()
+        if not backup_file:
+            return
+        self._cancel = threading.Event()  # Not checked by a verify, but blocks a second job
+        self._progress = (0, 0)
+        self.backup_button.config(state="disabled")
+        self.restore_button.config(state="disabled")
+        self.verify_button.config(state="disabled")
+        self.progress_label.config(text="Verifying...")
+        self.runner.submit(BackupManager.restore_backup, backup_file, "data", self._restore_parts(), True,
+                           self._on_progress,
+                           on_done=self._on_verify_done, on_error=self._on_verify_failed)
+        self._progress_job = self.after(self.PROGRESS_MS, self._show_progress)
+
+    def _on_verify_done(self, summary):
+        if not self.winfo_exists():
+            return
+        self._job_finished()
+        messagebox.showinfo("Backup Verified",
+                            f"All {summary['files']} files match their checksums "
+                            f"({summary['bytes'] / (1024 * 1024):.1f} MB in {len(summary['archives'])} archives).")
+
+    def _on_verify_failed(self, error):
+        if not self.winfo_exists():
+            return
+        self._job_finished()
+        messagebox.showerror("Error", f"Backup verification failed: {str(error)}")
+
+    def _restore_parts(self):
+        return self.RESTORE_CHOICES[self.restore_choice.get()][1]
+
+    def _ask_backup_file(self):
+        return filedialog.askopenfilename(
+            title="Select Backup File",
+            filetypes=[("ZIP files", "*.zip")],
+            initialdir="backups"
+        )
+
+    def close(self):
+        """Close the dialog, cancelling a backup that is still running"""
+        if self._cancel is not None:
+            self._cancel.set()
+        if self._progress_job is not None:
+            self.after_cancel(self._progress_job)
+            self._progress_job = None
+        self.runner.close()
+        self.destroy()
 
     def restore_backup(self):
+        """Unpack and verify a backup on a worker thread, then swap it in on the Tk thread"""
+        backup_file = self._ask_backup_file()
+        if not backup_file:
+            return
+        label, parts = self.RESTORE_CHOICES[self.restore_choice.get()]
+        if not messagebox.askyesno("Confirm Restore",
+                                   f"This will replace your current data with the backup ({label.lower()}).\n"
+                                   "Your current data will be lost.\n\n"
+                                   "Are you sure you want to continue?"):
+            return
         try:
-            backup_file = filedialog.askopenfilename(
-                title="Select Backup File",
-                filetypes=[("ZIP files", "*.zip")],
-                initialdir="backups"
-            )
-            if backup_file:
-                if messagebox.askyesno("Confirm Restore", 
-                                     "This will replace your current data with the backup.\n"
-                                     "Your current data will be lost.\n\n"
-                                     "Are you sure you want to continue?"):
-                    BackupManager.restore_backup(backup_file)
-                    # Reload the MovieManager data
-                    self.app.movie_manager.load_data()
-                    # Force refresh of the UI
-                    self.app.load_movies()
-                    messagebox.showinfo("Success", "Backup restored successfully!")
-                    self.destroy()
+            # Don't let a pending background save overwrite the restored data
+            self.app.movie_manager.flush()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to restore backup: {str(e)}")
+            return
+        self._cancel = threading.Event()  # Not checked by a restore, but blocks a second job
+        self._progress = (0, 0)
+        self.backup_button.config(state="disabled")
+        self.restore_button.config(state="disabled")
+        self.verify_button.config(state="disabled")
+        self.progress_label.config(text="Restoring...")
+        self.runner.submit(BackupManager.stage_restore, backup_file, "data", parts, False,
+                           self._on_progress,
+                           on_done=partial(self._on_restore_staged, parts), on_error=self._on_restore_failed)
+        self._progress_job = self.after(self.PROGRESS_MS, self._show_progress)
+
+    def _on_restore_staged(self, parts, summary):
+        if not self.winfo_exists():
+            return  # The staged copy is discarded by BackupManager.recover() on the next start
+        try:
+            # The SQLite databases must not be open while their files are swapped
+            cache = tmdb_client.cache
+            with self.app.movie_manager.storage_released(), \
+                    (cache.released() if cache is not None else contextlib.nullcontext()):
+                BackupManager.finish_restore("data", parts)
+        except Exception as e:
+            self._on_restore_failed(e)
+            return
+        # Deleting the replaced data can take a while; recover() also does it on the next start
+        threading.Thread(target=BackupManager.recover, args=("data",),
+                         name="restore-cleanup", daemon=True).start()
+
+        try:
+            if parts is None or "movies" in parts:
+                # Reload the MovieManager data (keeping the old lists if it fails)
+                with self.app.movie_manager.batch():
+                    self.app.movie_manager.load_data()
+            if parts is None or "posters" in parts:
+                poster_store.reload()
+                self.app.thumbnail_loader.clear()
+            # Force refresh of the UI
+            self.app.load_movies()
+        except Exception as e:
+            self._on_restore_failed(e)
+            return
+        self._job_finished()
+        messagebox.showinfo("Success", f"Backup restored successfully! ({summary['files']} files)")
+        self.close()
+
+    def _on_restore_failed(self, error):
+        if not self.winfo_exists():
+            return
+        self._job_finished()
+        messagebox.showerror("Error", f"Failed to restore backup: {str(error)}")
 
     def center_window(self):
         self.update_idletasks()
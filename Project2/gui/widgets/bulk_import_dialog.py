@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
 import re
+from models.enrichment import split_title_year
 
 class BulkImportDialog(tk.Toplevel):
     def __init__(self, parent):
@@ -77,13 +78,17 @@ Avatar (2009)
 
     def _parse_text(self, text):
         """Parse text into list of movie titles"""
-        lines = text.split('\n')
-        movies = []
-        for line in lines:
+        return [title for title, _ in self._parse_entries(text)]
+
+    def _parse_entries(self, text):
+        """Parse text into (title, year) pairs; year is None when the line has none"""
+        entries = []
+        for line in text.split('\n'):
             title = self._clean_title(line)
             if title:  # Only add non-empty, non-None titles
-                movies.append(title)  # Removed debug print
-        return movies
+                _, year = split_title_year(line.strip(' .'))
+                entries.append((title, year))
+        return entries
 
     def _update_preview(self, event=None):
         """Update preview area with detected movies"""
@@ -99,7 +104,7 @@ Avatar (2009)
         
     def submit(self):
         text = self.text_area.get("1.0", "end-1c")
-        movies = self._parse_text(text)
+        movies = self._parse_entries(text)
         if movies:
             self.result = movies
         self.destroy()
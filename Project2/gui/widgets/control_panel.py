@@ -2,6 +2,8 @@ import tkinter as tk
 from gui.color_scheme import ColorSchemeManager
 from gui.widgets.about_dialog import AboutDialog
 from gui.widgets.backup_dialog import BackupDialog
+from gui.widgets.stats_dialog import StatsDialog
+from gui.widgets.review_dialog import ReviewDialog
 
 class ControlPanel(tk.Frame):
     def __init__(self, parent, app):
@@ -24,6 +26,8 @@ class ControlPanel(tk.Frame):
             ("View Details", self.app.show_selected_movie_details, "Show detailed information about selected movie (Ctrl+D)"),
             ("View Poster", self.app.show_selected_movie_poster, "Display movie poster in new window (Ctrl+P)"),
             ("Fetch Details", self.app.movie_list_gui.fetch_details, "Search TMDb to get movie details"),
+            ("Review Matches", self.show_review_dialog, "Pick TMDb matches for movies that could not be matched automatically"),
+            ("Statistics", self.show_stats_dialog, "Ratings by genre, runtimes and top rated movies"),
             ("Backup/Restore", self.show_backup_dialog, "Backup or restore your movie data"),
             ("Settings", self.app.open_settings, "Configure application settings (Ctrl+,)"),
             ("About", self.show_about, "About Movie Tracker and credits")
@@ -42,6 +46,14 @@ class ControlPanel(tk.Frame):
         """Show the about dialog"""
         AboutDialog(self)
 
+    def show_stats_dialog(self):
+        """Show library statistics"""
+        StatsDialog(self, self.app)
+
+    def show_review_dialog(self):
+        """Show movies waiting for a TMDb match to be picked"""
+        ReviewDialog(self, self.app)
+
     def show_backup_dialog(self):
         """Show the backup/restore dialog"""
         BackupDialog(self, self.app)
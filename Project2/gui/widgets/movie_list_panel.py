@@ -8,6 +8,7 @@ from gui.widgets.bulk_import_dialog import BulkImportDialog
 from models.movie import Movie  # Add this import
 
 class MovieListPanel(tk.Frame):
+    SEARCH_DELAY_MS = 150
     def __init__(self, parent, app):
         super().__init__(parent)
         self.app = app  # Now we have access to all app components through self.app
@@ -33,7 +34,8 @@ class MovieListPanel(tk.Frame):
             "fg": app.ui_settings["listbox_fg"],
             "selectbackground": app.ui_settings["selection_bg"],
             "selectforeground": app.ui_settings["selection_fg"],
-            "activestyle": "none"
+            "activestyle": "none",
+            "thumbnail_loader": app.thumbnail_loader
         }
 
         # Create and grid widgets
@@ -74,10 +76,23 @@ class MovieListPanel(tk.Frame):
         # Add genre filter with proper initialization
         self.genre_var = tk.StringVar()
         self.genre_var.set("All Genres")
+        self.selected_genres = set()
+        self.genre_vars = {}  # genre -> BooleanVar backing its menu checkbutton
+        self.genre_match_all = tk.BooleanVar(value=False)
+        self._genre_menu_job = None
         
         filter_frame = tk.Frame(self)
         filter_frame.grid(row=4, column=0, pady=5, sticky="ew")
         
+        # As-you-type search over titles, people and overviews
+        self.search_var = tk.StringVar()
+        self._search_job = None
+        tk.Label(filter_frame, text="Search:", **title_style).pack(side=tk.LEFT, padx=5)
+        self.search_entry = tk.Entry(filter_frame, textvariable=self.search_var, width=20)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_entry.bind('<Escape>', lambda e: self.search_var.set(""))
+        self.search_var.trace('w', self._on_search_changed)
+
         tk.Label(filter_frame, text="Filter by genre:", **title_style).pack(side=tk.LEFT, padx=5)
         self.genre_menu = tk.OptionMenu(filter_frame, self.genre_var, "All Genres")
         self.genre_menu.pack(side=tk.LEFT, fill=tk.X, expand=True)
@@ -90,50 +105,105 @@ class MovieListPanel(tk.Frame):
         
         # Initial population of genre menu
         self.update_genre_menu()
-        
-        # Bind genre selection
-        self.genre_var.trace('w', self._on_genre_filter)
 
         ColorSchemeManager.apply_scheme(self, app.ui_settings)
         self._setup_drag_drop()
         self._setup_context_menus()  # Add this line to initialize context menus
 
-    def _on_genre_filter(self, *args):
-        """Handle genre filter selection"""
-        genre = self.genre_var.get()
-        if (genre == "All Genres"):
-            # Show all movies
-            self.app.gui_helper.update_listbox(self.to_watch_listbox, self.app.movie_manager.movies_to_watch)
-            self.app.gui_helper.update_listbox(self.watched_listbox, self.app.movie_manager.movies_watched)
+    def _on_search_changed(self, *args):
+        # Wait for a short pause in typing before filtering
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DELAY_MS, self._apply_filters)
+
+    def _apply_filters(self):
+        """Show only movies matching the search text and the selected genres"""
+        self._search_job = None
+        manager = self.app.movie_manager
+        to_watch, watched = manager.movies_to_watch, manager.movies_watched
+
+        if self.selected_genres:
+            joiner = " + " if self.genre_match_all.get() else " / "
+            self.genre_var.set(joiner.join(sorted(self.selected_genres)))
+            # Filter both listboxes using the manager's genre index
+            to_watch, watched = manager.filter_by_genres(
+                self.selected_genres, match_all=self.genre_match_all.get()
+            )
         else:
-            # Filter both listboxes by selected genre
-            to_watch_filtered = [movie for movie in self.app.movie_manager.movies_to_watch
-                               if any(g['name'] == genre for g in movie.details.get('genres', []))]
-            watched_filtered = [movie for movie in self.app.movie_manager.movies_watched
-                              if any(g['name'] == genre for g in movie.details.get('genres', []))]
-            
-            self.app.gui_helper.update_listbox(self.to_watch_listbox, to_watch_filtered)
-            self.app.gui_helper.update_listbox(self.watched_listbox, watched_filtered)
+            self.genre_var.set("All Genres")
+
+        query = self.search_var.get().strip()
+        if query:
+            # Best matches first
+            results = manager.search(query)
+            to_watch_set, watched_set = set(to_watch), set(watched)
+            to_watch = [movie for movie in results if movie in to_watch_set]
+            watched = [movie for movie in results if movie in watched_set]
+
+        self.app.gui_helper.update_listbox(self.to_watch_listbox, to_watch)
+        self.app.gui_helper.update_listbox(self.watched_listbox, watched)
+
+    def refresh(self):
+        """Reload both listboxes from the manager, keeping the current filters"""
+        self._apply_filters()
+
+    def show_moved(self, movie, to_list_name):
+        """Move one movie's row to the other listbox without rebuilding either list"""
+        if to_list_name == "watched":
+            from_list, to_list = self.to_watch_listbox, self.watched_listbox
+        else:
+            from_list, to_list = self.watched_listbox, self.to_watch_listbox
+        from_list.apply_changes(removed=[movie])
+        to_list.apply_changes(added=[movie])
+
+    def show_removed(self, movie):
+        self.to_watch_listbox.apply_changes(removed=[movie])
+        self.watched_listbox.apply_changes(removed=[movie])
+        self.schedule_genre_menu_update()
+
+    def show_changed(self, movie):
+        """Redraw the row of a movie whose ratings or details changed"""
+        self.to_watch_listbox.refresh_items([movie])
+        self.watched_listbox.refresh_items([movie])
+
+    def schedule_genre_menu_update(self):
+        """Rebuild the genre menu once the current batch of updates is done"""
+        if self._genre_menu_job is None:
+            self._genre_menu_job = self.after_idle(self._update_genre_menu_now)
+
+    def _update_genre_menu_now(self):
+        self._genre_menu_job = None
+        self.update_genre_menu()
+
+    def _toggle_genre(self, genre):
+        if self.genre_vars[genre].get():
+            self.selected_genres.add(genre)
+        else:
+            self.selected_genres.discard(genre)
+        self._apply_filters()
+
+    def _clear_genre_filter(self):
+        self.selected_genres.clear()
+        self._apply_filters()
 
     def update_genre_menu(self):
-        """Update genre menu with all available genres"""
-        genres = set()
-        all_movies = self.app.movie_manager.movies_to_watch + self.app.movie_manager.movies_watched
-        
-        for movie in all_movies:
-            if hasattr(movie, 'details') and movie.details:
-                for genre in movie.details.get('genres', []):
-                    genres.add(genre['name'])
+        """Update genre menu with all available genres and their movie counts"""
+        counts = self.app.movie_manager.genre_counts()
         
         # Update menu
         menu = self.genre_menu["menu"]
         menu.delete(0, "end")
-        menu.add_command(label="All Genres", 
-                        command=lambda: self.genre_var.set("All Genres"))
+        menu.add_command(label="All Genres", command=self._clear_genre_filter)
+        menu.add_checkbutton(label="Match all selected genres", variable=self.genre_match_all,
+                             command=self._apply_filters)
+        menu.add_separator()
         
-        for genre in sorted(genres):
-            menu.add_command(label=genre, 
-                           command=lambda g=genre: self.genre_var.set(g))
+        self.genre_vars = {}
+        for genre in sorted(counts):
+            self.genre_vars[genre] = tk.BooleanVar(value=genre in self.selected_genres)
+            menu.add_checkbutton(label=f"{genre} ({counts[genre]})",
+                                 variable=self.genre_vars[genre],
+                                 command=lambda g=genre: self._toggle_genre(g))
 
     def _setup_drag_drop(self):
         # Remove single-click bindings for drag-drop
@@ -144,15 +214,10 @@ class MovieListPanel(tk.Frame):
                 movie = from_list.items[sel[0]]
                 if from_list == self.to_watch_listbox:
                     self.app.movie_manager.mark_as_watched(movie)
+                    self.show_moved(movie, "watched")
                 else:
                     self.app.movie_manager.unwatch_movie(movie)
-                
-                # Update the listboxes
-                self.app.gui_helper.update_listbox(self.to_watch_listbox, self.app.movie_manager.movies_to_watch)
-                self.app.gui_helper.update_listbox(self.watched_listbox, self.app.movie_manager.movies_watched)
-                
-                # Update genre menu after moving movies
-                self.update_genre_menu()
+                    self.show_moved(movie, "to_watch")
 
         # Bind double-click events
         self.to_watch_listbox.bind('<Double-Button-1>', 
@@ -188,8 +253,7 @@ class MovieListPanel(tk.Frame):
             clicked_index = int(y // listbox.item_height)
             
             if 0 <= clicked_index < len(listbox.items):
-                listbox.selected_index = clicked_index
-                listbox._redraw()
+                listbox.selection_set(clicked_index)
                 listbox.event_generate('<<ListboxSelect>>')
                 self.context_menu.post(event.x_root, event.y_root)
 
@@ -208,18 +272,20 @@ class MovieListPanel(tk.Frame):
             dialog = RatingDialog(self, selected_movie)
             self.wait_window(dialog)
             
-            if dialog.result:
+            if dialog.result or dialog.ratings_changed:
                 # Add each rating from the dialog
-                for rating in dialog.result:
+                for rating in dialog.result or []:
                     selected_movie.add_rating(rating)
                 
-                # Refresh lists with movies from manager
-                self.app.gui_helper.update_listbox(self.to_watch_listbox, self.app.movie_manager.movies_to_watch)
-                self.app.gui_helper.update_listbox(self.watched_listbox, self.app.movie_manager.movies_watched)
-                self.app.movie_manager.save_data()
-                self.app.gui_helper.show_status(
-                    f"Added {len(dialog.result)} ratings for {selected_movie.title}"
-                )
+                # Redraw just this movie's row
+                self.show_changed(selected_movie)
+                self.app.movie_manager.save_movie(selected_movie)
+                if dialog.result:
+                    self.app.gui_helper.show_status(
+                        f"Added {len(dialog.result)} ratings for {selected_movie.title}"
+                    )
+                else:
+                    self.app.gui_helper.show_status(f"Updated ratings for {selected_movie.title}")
                 
         except Exception as e:
             logging.error(f"Error rating movie: {e}")
@@ -236,10 +302,8 @@ class MovieListPanel(tk.Frame):
         if messagebox.askyesno("Confirm", f"Clear all ratings for {selected_movie.title}?"):
             try:
                 selected_movie.clear_ratings()
-                # Refresh lists
-                self.app.gui_helper.update_listbox(self.to_watch_listbox, self.app.movie_manager.movies_to_watch)
-                self.app.gui_helper.update_listbox(self.watched_listbox, self.app.movie_manager.movies_watched)
-                self.app.movie_manager.save_data()
+                self.show_changed(selected_movie)
+                self.app.movie_manager.save_movie(selected_movie)
                 self.app.gui_helper.show_status(f"Cleared ratings for {selected_movie.title}")
             except Exception as e:
                 logging.error(f"Error clearing ratings: {e}")
@@ -254,26 +318,26 @@ class MovieListPanel(tk.Frame):
             added_count = 0
             skipped = []
             
-            # Process each movie title
-            for title in dialog.result:
-                if title and title.strip():
-                    clean_title = title.strip()
-                    try:
-                        # Create and add the movie
-                        movie = Movie(title=clean_title)
-                        movie.needs_details = True
-                        if self.app.movie_manager.add_movie(movie):
-                            added_count += 1
-                        else:
-                            skipped.append(title)
-                    except Exception as e:
-                        logging.error(f"Failed to add movie {title}: {e}")
-                        skipped.append(f"{title} (Error)")
+            # Process each movie title, writing them all out in one go
+            with self.app.movie_manager.batch():
+                for title, year in dialog.result:
+                    if title and title.strip():
+                        clean_title = title.strip()
+                        try:
+                            # Create and add the movie; the year helps matching it on TMDb later
+                            movie = Movie(title=clean_title, release_date=str(year) if year else None)
+                            movie.needs_details = True
+                            if self.app.movie_manager.add_movie(movie):
+                                added_count += 1
+                            else:
+                                skipped.append(title)
+                        except Exception as e:
+                            logging.error(f"Failed to add movie {title}: {e}")
+                            skipped.append(f"{title} (Error)")
             
             # Update display
-            self.app.movie_manager.save_data()
-            self.app.gui_helper.update_listbox(self.to_watch_listbox, 
-                                             self.app.movie_manager.movies_to_watch)
+            self.refresh()
+            self.app.enrichment.start()
             
             # Show status
             status = f"Added {added_count} movies"
@@ -295,10 +359,7 @@ class MovieListPanel(tk.Frame):
             # Show search dialog to find correct movie
             try:
                 self.app.movie_search_gui.search_movie(selected_movie.title)
-                self.app.gui_helper.update_listbox(self.to_watch_listbox, 
-                                                 self.app.movie_manager.movies_to_watch)
-                self.app.gui_helper.update_listbox(self.watched_listbox, 
-                                                 self.app.movie_manager.movies_watched)
+                self.refresh()
             except Exception as e:
                 logging.error(f"Error fetching details: {e}")
                 messagebox.showerror("Error", "Failed to fetch movie details")
@@ -306,6 +367,5 @@ class MovieListPanel(tk.Frame):
     def _redraw_current_list(self):
         """Redraw the current listbox to show updated ratings"""
         current_genre = self.genre_var.get()
-        self._on_genre_filter()
-        self._on_genre_filter()
+        self._apply_filters()
 
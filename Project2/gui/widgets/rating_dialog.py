@@ -6,11 +6,13 @@ class RatingDialog(tk.Toplevel):
         super().__init__(parent)
         self.movie = movie
         self.result = None
+        self.ratings_changed = False  # True if saved ratings were removed on submit
+        self.pending_removals = 0     # Saved ratings to remove when the dialog is submitted
         self.rating_frames = []
         
         # Configure window
         self.title(f"Rate Movie: {movie.title}")
-        self.geometry("400x400")
+        self.geometry("400x440")
         self.resizable(False, False)
         self.transient(parent)
         self.grab_set()
@@ -22,6 +24,16 @@ class RatingDialog(tk.Toplevel):
         # Title label
         tk.Label(main_frame, text="Add Multiple Ratings", font=('Helvetica', 12, 'bold')).pack(pady=(0, 10))
         
+        # Existing ratings summary
+        saved_frame = tk.Frame(main_frame)
+        saved_frame.pack(fill="x", pady=(0, 10))
+        self.saved_label = tk.Label(saved_frame, anchor="w")
+        self.saved_label.pack(side="left", fill="x", expand=True)
+        self.remove_saved_button = tk.Button(saved_frame, text="Remove Last Saved",
+                                             command=self._remove_last_saved_rating)
+        self.remove_saved_button.pack(side="right")
+        self._update_saved_label()
+        
         # Scrollable container
         scroll_container = tk.Frame(main_frame)
         scroll_container.pack(fill="both", expand=True)
@@ -120,6 +132,26 @@ class RatingDialog(tk.Toplevel):
             frame_data['frame'].destroy()
             self.canvas.configure(scrollregion=self.canvas.bbox("all"))
             
+    def _update_saved_label(self):
+        """Show the movie's rating count and average as they will be after submitting"""
+        count = self.movie.get_rating_count() - self.pending_removals
+        if count:
+            kept = self.movie.user_ratings[:count]
+            average = sum(r.rating for r in kept) / count
+            text = f"Saved: {count} ratings, average {average:.1f}"
+        else:
+            text = "Saved: no ratings left" if self.pending_removals else "Saved: no ratings yet"
+        if self.pending_removals:
+            text += f" ({self.pending_removals} removed on submit)"
+        self.saved_label.config(text=text)
+        self.remove_saved_button.config(state='normal' if count else 'disabled')
+
+    def _remove_last_saved_rating(self):
+        """Mark the movie's most recent saved rating for removal; nothing changes until submit"""
+        if self.pending_removals < self.movie.get_rating_count():
+            self.pending_removals += 1
+            self._update_saved_label()
+
     def center_window(self):
         self.update_idletasks()
         width = self.winfo_width()
@@ -133,6 +165,10 @@ class RatingDialog(tk.Toplevel):
         self.destroy()
         
     def submit(self):
+        # Apply the removals first so the new ratings are not the ones removed
+        for _ in range(self.pending_removals):
+            self.movie.remove_last_rating()
+        self.ratings_changed = self.pending_removals > 0
         # Collect all ratings
         self.result = [int(float(frame['var'].get())) for frame in self.rating_frames]
         self.destroy()
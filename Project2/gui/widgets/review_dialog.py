@@ -0,0 +1,111 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from gui.color_scheme import ColorSchemeManager
+
+class ReviewDialog(tk.Toplevel):
+    """Pick the right TMDb match for movies the enrichment job left for review"""
+
+    def __init__(self, parent, app):
+        super().__init__(parent)
+        self.app = app
+        self.enrichment = app.enrichment
+        self.title("Review Matches")
+        self.geometry("700x450")
+        self.transient(parent)
+
+        main_frame = ttk.Frame(self, padding="20")
+        main_frame.pack(fill="both", expand=True)
+
+        lists_frame = ttk.Frame(main_frame)
+        lists_frame.pack(fill="both", expand=True)
+
+        ttk.Label(lists_frame, text="Movies").grid(row=0, column=0, sticky="w")
+        ttk.Label(lists_frame, text="Possible matches").grid(row=0, column=1, sticky="w")
+        self.entry_list = tk.Listbox(lists_frame, exportselection=False)
+        self.entry_list.grid(row=1, column=0, sticky="nsew", padx=(0, 10))
+        self.candidate_list = tk.Listbox(lists_frame, exportselection=False)
+        self.candidate_list.grid(row=1, column=1, sticky="nsew")
+        lists_frame.columnconfigure(0, weight=1)
+        lists_frame.columnconfigure(1, weight=2)
+        lists_frame.rowconfigure(1, weight=1)
+
+        self.entry_list.bind("<<ListboxSelect>>", lambda e: self._show_candidates())
+        self.candidate_list.bind("<Double-Button-1>", lambda e: self.use_match())
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill="x", pady=(10, 0))
+        ttk.Button(button_frame, text="Use Match", command=self.use_match).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Search...", command=self.search).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Dismiss", command=self.dismiss).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Close", command=self.destroy).pack(side="right", padx=5)
+
+        self.entries = []
+        self._fill_entries()
+
+        ColorSchemeManager.apply_scheme(self, app.ui_settings)
+        self.center_window()
+
+    def _fill_entries(self):
+        self.enrichment.review_queue.prune(self.app.movie_manager)
+        self.entries = self.enrichment.review_queue.pending()
+        self.entry_list.delete(0, tk.END)
+        for entry in self.entries:
+            year = f" ({entry['year']})" if entry.get("year") else ""
+            self.entry_list.insert(tk.END, f"{entry['title']}{year} - {entry['reason']}")
+        self.candidate_list.delete(0, tk.END)
+
+    def _selected_entry(self):
+        selection = self.entry_list.curselection()
+        return self.entries[selection[0]] if selection else None
+
+    def _show_candidates(self):
+        self.candidate_list.delete(0, tk.END)
+        entry = self._selected_entry()
+        if entry is None:
+            return
+        for candidate in entry["candidates"]:
+            year = (candidate.get("release_date") or "")[:4]
+            self.candidate_list.insert(tk.END, f"{candidate['title']} ({year})" if year else candidate["title"])
+
+    def use_match(self):
+        entry = self._selected_entry()
+        selection = self.candidate_list.curselection()
+        if entry is None or not selection:
+            messagebox.showwarning("Warning", "Please select a movie and one of its matches", parent=self)
+            return
+        movie = self.app.movie_manager.find_by_title(entry["title"])
+        if movie is None:
+            self._fill_entries()
+            return
+        candidate = entry["candidates"][selection[0]]
+
+        def on_done(new_movie):
+            self.app.gui_helper.show_status(f"Matched '{entry['title']}' to {new_movie.title}")
+            if self.winfo_exists():
+                self._fill_entries()
+
+        self.enrichment.accept(movie, candidate, on_done=on_done)
+        self.app.gui_helper.show_status(f"Fetching details for {candidate['title']}...")
+
+    def search(self):
+        """Fall back to the regular search dialog for this movie"""
+        entry = self._selected_entry()
+        movie = self.app.movie_manager.find_by_title(entry["title"]) if entry else None
+        if movie is None:
+            return
+        self.app.movie_search_gui.search_movie(title=entry["title"], update_existing=True, existing_movie=movie)
+        self._fill_entries()
+
+    def dismiss(self):
+        entry = self._selected_entry()
+        if entry is not None:
+            self.enrichment.dismiss(entry["title"])
+            self._fill_entries()
+
+    def center_window(self):
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
@@ -121,6 +121,7 @@ class SettingsDialog(tk.Toplevel):
             if messagebox.askyesno("Enable Offline Mode", 
                                  "No API key entered. Enable offline mode?"):
                 self.settings_manager.enable_offline_mode()
+                TMDbAPI.set_offline(True)
                 messagebox.showinfo("Success", "Offline mode enabled")
             return
             
@@ -0,0 +1,58 @@
+import tkinter as tk
+from tkinter import ttk
+from gui.color_scheme import ColorSchemeManager
+
+class StatsDialog(tk.Toplevel):
+    def __init__(self, parent, app):
+        super().__init__(parent)
+        self.app = app
+        self.title("Library Statistics")
+        self.geometry("500x600")
+        self.transient(parent)
+
+        main_frame = ttk.Frame(self, padding="20")
+        main_frame.pack(fill="both", expand=True)
+
+        stats_text = tk.Text(main_frame, wrap=tk.WORD)
+        stats_text.pack(fill="both", expand=True)
+        stats_text.insert(tk.END, self._format_stats())
+        stats_text.configure(state='disabled')
+
+        ttk.Button(main_frame, text="Close", command=self.destroy).pack(pady=(10, 0))
+
+        ColorSchemeManager.apply_scheme(self, app.ui_settings)
+        self.center_window()
+
+    def _format_stats(self):
+        stats = self.app.movie_stats
+        lines = [f"Movies: {stats.count}", ""]
+
+        lines.append("Average TMDb rating per genre:")
+        our_ratings = stats.average_rating_per_genre(user_ratings=True)
+        for genre, rating in sorted(stats.average_rating_per_genre().items(), key=lambda g: -g[1]):
+            ours = f"  (ours: {our_ratings[genre]:.1f})" if genre in our_ratings else ""
+            lines.append(f"  {genre}: {rating:.1f}{ours}")
+
+        lines += ["", "Runtimes:"]
+        counts, edges = stats.runtime_histogram()
+        for count, low, high in zip(counts, edges[:-1], edges[1:]):
+            if count:
+                lines.append(f"  {int(low)}-{int(high)} min: {count}")
+
+        lines += ["", "Watched movies by release year:"]
+        for year, count in sorted(stats.watched_per_year().items()):
+            lines.append(f"  {year}: {count}")
+
+        lines += ["", "Top rated:"]
+        for movie, score in stats.top_rated(10):
+            lines.append(f"  {score:.2f}  {movie.title}")
+
+        return "\n".join(lines)
+
+    def center_window(self):
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
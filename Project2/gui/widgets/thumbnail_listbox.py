@@ -1,8 +1,19 @@
 import tkinter as tk
-from PIL import Image, ImageTk
-import os
+from gui.thumbnail_loader import ThumbnailLoader
 
 class ThumbnailListbox(tk.Canvas):
+    """Canvas-based listbox showing a poster thumbnail, title and genres per movie.
+
+    Rendering is virtualized: canvas items exist only for the rows in view
+    plus OVERSCAN rows either side. Each visible row owns a "slot" of four
+    canvas items (background, thumbnail, title, genres) which is moved and
+    reconfigured when the row scrolls out and another one scrolls in.
+    """
+
+    OVERSCAN = 5  # Extra rows rendered above and below the viewport
+    SLOT_ITEMS = ("bg", "image", "title", "genres")
+    TOP_MARGIN = 5
+
     def __init__(self, parent, **kwargs):
         # Store style options before creating canvas
         self.font = kwargs.pop('font', ('Helvetica', 10))
@@ -10,6 +21,8 @@ class ThumbnailListbox(tk.Canvas):
         self.bg = kwargs.pop('bg', 'white')
         self.selectbackground = kwargs.pop('selectbackground', '#0078D7')
         self.selectforeground = kwargs.pop('selectforeground', 'white')
+        # Shared with other listboxes so decoded thumbnails outlive any one list
+        thumbnail_loader = kwargs.pop('thumbnail_loader', None)
         
         # Remove other Listbox-specific options that Canvas doesn't support
         kwargs.pop('selectmode', None)
@@ -21,10 +34,13 @@ class ThumbnailListbox(tk.Canvas):
         self.configure(bg=self.bg)  # Set canvas background
         
         self.items = []
-        self.images = {}  # Store PhotoImage references
         self.selected_index = None
         self.item_height = 70  # Height for each item
         self.thumbnail_size = (40, 60)  # Width, Height for thumbnails
+        self.thumbnail_loader = thumbnail_loader or ThumbnailLoader(self, size=self.thumbnail_size)
+        self._visible = {}     # row index -> slot currently drawing it
+        self._free_slots = []  # Hidden slots ready for reuse
+        self._slot_count = 0
         
         # Bindings for selection
         self.bind('<Button-1>', self._on_click)
@@ -32,6 +48,7 @@ class ThumbnailListbox(tk.Canvas):
         # Scrolling
         self.configure(scrollregion=(0, 0, 0, 0))
         self._total_height = 0
+        self._width = 0
         
         # Modify mousewheel binding to use proper scroll region
         self.bind_all('<MouseWheel>', self._on_mousewheel)
@@ -40,17 +57,74 @@ class ThumbnailListbox(tk.Canvas):
     def delete(self, first, last=None):
         """Clear all items"""
         self.items.clear()
-        self.images.clear()
         self.selected_index = None
-        super().delete('all')  # Use parent class's delete method instead of calling self.delete
+        self._release_all()
+        self._update_scrollregion()
 
     def insert(self, index, movie):
         """Insert a movie at specified index"""
         if index == tk.END:
             index = len(self.items)  # Convert END to actual index
         self.items.insert(index, movie)
+        if self.selected_index is not None and index <= self.selected_index:
+            self.selected_index += 1
         self._redraw()
 
+    def append_items(self, movies):
+        """Append several movies with a single redraw"""
+        self.items.extend(movies)
+        self._redraw()
+
+    def set_items(self, movies):
+        """Replace all items with a single layout pass, keeping the selected movie selected"""
+        selected = self._selected_movie()
+        self.items = list(movies)
+        self.selected_index = self._index_of(selected)
+        self._redraw()
+
+    def apply_changes(self, added=(), removed=(), moved=()):
+        """Apply a diff instead of rebuilding the list.
+
+        `removed` movies are dropped, `added` movies appended and `moved`
+        (movie, new_index) pairs repositioned. Only rows from the first
+        changed index down are re-rendered, and only where they are in view.
+        """
+        selected = self._selected_movie()
+        first_changed = len(self.items)
+        for movie in removed:
+            index = self._index_of(movie)
+            if index is not None:
+                del self.items[index]
+                first_changed = min(first_changed, index)
+        for movie, new_index in moved:
+            index = self._index_of(movie)
+            if index is not None:
+                del self.items[index]
+                new_index = min(new_index, len(self.items))
+                self.items.insert(new_index, movie)
+                first_changed = min(first_changed, index, new_index)
+        if added:
+            first_changed = min(first_changed, len(self.items))
+            self.items.extend(added)
+
+        self.selected_index = self._index_of(selected)
+        for index in [i for i in self._visible if i >= first_changed]:
+            self._release(index)
+        self._update_scrollregion()
+        self._render_visible()
+
+    def refresh_items(self, movies):
+        """Re-render the rows showing these movies, e.g. after their ratings changed"""
+        movies = set(movies)
+        for index, slot in self._visible.items():
+            if self.items[index] in movies:
+                self._draw_row(index, slot)
+
+    def selection_set(self, index):
+        """Select a row without generating <<ListboxSelect>>, like tk.Listbox"""
+        if 0 <= index < len(self.items):
+            self._set_selection(index)
+
     def curselection(self):
         """Return current selection for compatibility with tk.Listbox"""
         return (self.selected_index,) if self.selected_index is not None else ()
@@ -67,88 +141,149 @@ class ThumbnailListbox(tk.Canvas):
             pass
         return None
 
-    def _create_thumbnail(self, poster_path):
-        """Create thumbnail from poster path"""
-        if not poster_path or not os.path.exists(poster_path):
+    def _selected_movie(self):
+        if self.selected_index is not None and self.selected_index < len(self.items):
+            return self.items[self.selected_index]
+        return None
+
+    def _index_of(self, movie):
+        """Position of a movie in the list, or None"""
+        if movie is None:
             return None
-            
         try:
-            image = Image.open(poster_path)
-            image.thumbnail(self.thumbnail_size, Image.LANCZOS)
-            return ImageTk.PhotoImage(image)
-        except Exception as e:
-            print(f"Error creating thumbnail: {e}")
+            return self.items.index(movie)
+        except ValueError:
+            return None
+
+    def _thumbnail(self, movie):
+        """Cached thumbnail for a movie, or None while it is still being decoded"""
+        if not hasattr(movie, 'get_poster_path'):
+            return None
+        poster_path = movie.get_poster_path(self.thumbnail_size)
+        if not poster_path:
             return None
+        return self.thumbnail_loader.get(poster_path, self._on_thumbnail_ready)
+
+    def _on_thumbnail_ready(self, poster_path, photo):
+        """Show a freshly decoded thumbnail in the rows that are waiting for it"""
+        if photo is None or not self.winfo_exists():
+            return
+        for index, slot in self._visible.items():
+            movie = self.items[index]
+            if hasattr(movie, 'get_poster_path') and movie.get_poster_path(self.thumbnail_size) == poster_path:
+                self.itemconfigure(slot["image"], image=photo, state='normal')
+                slot["photo"] = photo
 
     def _redraw(self):
-        """Redraw all items"""
-        super().delete('all')
-        y = 5
-        
-        for i, movie in enumerate(self.items):
-            # Background rectangle
-            item_area = self.create_rectangle(
-                5, y, self.winfo_width()-5, y+self.item_height-5,
-                fill=self._get_item_color(i),
-                width=0,
-                tags=f'item_{i}'
-            )
-            
-            # Poster thumbnail and title area
-            x_offset = 15
-            if hasattr(movie, 'get_poster_path') and movie.get_poster_path():
-                if movie not in self.images:
-                    self.images[movie] = self._create_thumbnail(movie.get_poster_path())
-                if self.images[movie]:
-                    self.create_image(x_offset, y+5, anchor='nw', 
-                                   image=self.images[movie],
-                                   tags=f'item_{i}')
-            
-            # Movie title and rating
-            text_color = self.selectforeground if i == self.selected_index else self.fg
-            title = movie.title if hasattr(movie, 'title') else str(movie)
-            
-            rating_text = ""
-            if hasattr(movie, 'details') and movie.details:
-                tmdb_rating = movie.details.get('vote_average')
-                if tmdb_rating:
-                    rating_text = f" ★ {tmdb_rating:.1f}"
-            
-            user_rating = movie.get_average_user_rating() if hasattr(movie, 'get_average_user_rating') else None
-            if user_rating:
-                rating_text += f" (Our Rating: {user_rating:.1f})"
-            
-            # Add indicator for movies needing details
-            if hasattr(movie, 'needs_details') and movie.needs_details:
-                title += " (⚠️ Needs Details)"
-            
-            self.create_text(
-                x_offset + 55, y + 20,
-                text=title + rating_text,
-                anchor='w',
-                font=self.font,
-                fill=text_color,
-                tags=f'item_{i}'
-            )
-            
-            # Add genre tags
-            if hasattr(movie, 'details') and movie.details and 'genres' in movie.details:
-                genre_text = ' • '.join(g['name'] for g in movie.details['genres'][:3])  # Limit to 3 genres
-                self.create_text(
-                    x_offset + 55, y + self.item_height - 20,  # Position below title
-                    text=genre_text,
-                    anchor='w',
-                    font=(self.font[0], int(self.font[1] * 0.9)),  # Slightly smaller font
-                    fill='#666666',  # Subdued color for genres
-                    tags=f'item_{i}'
-                )
-            
-            y += self.item_height
-        
-        # Update scroll region
-        self._total_height = y
+        """Re-render the rows in view after the items changed"""
+        self._update_scrollregion()
+        self._release_all()
+        self._render_visible()
+
+    def _update_scrollregion(self):
+        self._total_height = self.TOP_MARGIN + len(self.items) * self.item_height
         self.configure(scrollregion=(0, 0, self.winfo_width(), self._total_height))
 
+    def _visible_range(self):
+        """Return (first, last) row indexes to render, last exclusive"""
+        top = self.canvasy(0) - self.TOP_MARGIN
+        bottom = self.canvasy(max(self.winfo_height(), 1)) - self.TOP_MARGIN
+        first = max(0, int(top // self.item_height) - self.OVERSCAN)
+        last = min(len(self.items), int(bottom // self.item_height) + 1 + self.OVERSCAN)
+        return first, last
+
+    def _render_visible(self):
+        """Draw newly visible rows, recycling the slots of rows that scrolled away"""
+        first, last = self._visible_range()
+        for index in [i for i in self._visible if not first <= i < last]:
+            self._release(index)
+        for index in range(first, last):
+            if index not in self._visible:
+                slot = self._free_slots.pop() if self._free_slots else self._new_slot()
+                self._visible[index] = slot
+                self._draw_row(index, slot)
+
+    def _new_slot(self):
+        self._slot_count += 1
+        return {
+            "bg": self.create_rectangle(0, 0, 0, 0, width=0),
+            "image": self.create_image(0, 0, anchor='nw'),
+            "title": self.create_text(0, 0, anchor='w', font=self.font),
+            "genres": self.create_text(0, 0, anchor='w',
+                                       font=(self.font[0], int(self.font[1] * 0.9)),  # Slightly smaller font
+                                       fill='#666666')  # Subdued color for genres
+        }
+
+    def _release(self, index):
+        slot = self._visible.pop(index)
+        for name in self.SLOT_ITEMS:
+            self.itemconfigure(slot[name], state='hidden')
+        slot["photo"] = None
+        self._free_slots.append(slot)
+
+    def _release_all(self):
+        for index in list(self._visible):
+            self._release(index)
+
+    def _draw_row(self, index, slot):
+        """Move a slot to row `index` and fill it with that movie"""
+        movie = self.items[index]
+        y = self.TOP_MARGIN + index * self.item_height
+        x_offset = 15
+
+        self.coords(slot["bg"], 5, y, self.winfo_width() - 5, y + self.item_height - 5)
+        self.itemconfigure(slot["bg"], fill=self._get_item_color(index), state='normal')
+
+        # Poster thumbnail
+        image = self._thumbnail(movie)
+        slot["photo"] = image  # Keeps the image alive even if the loader's cache evicts it
+        self.coords(slot["image"], x_offset, y + 5)
+        self.itemconfigure(slot["image"], image=image or '', state='normal' if image else 'hidden')
+
+        # Movie title and rating
+        self.coords(slot["title"], x_offset + 55, y + 20)
+        self.itemconfigure(slot["title"], text=self._row_text(movie), state='normal',
+                           fill=self.selectforeground if index == self.selected_index else self.fg)
+
+        # Genre tags, positioned below the title
+        genre_text = ""
+        if hasattr(movie, 'summary') and movie.summary.get('genres'):
+            genre_text = ' • '.join(movie.summary['genres'][:3])  # Limit to 3 genres
+        self.coords(slot["genres"], x_offset + 55, y + self.item_height - 20)
+        self.itemconfigure(slot["genres"], text=genre_text, state='normal' if genre_text else 'hidden')
+
+    def _row_text(self, movie):
+        title = movie.title if hasattr(movie, 'title') else str(movie)
+
+        rating_text = ""
+        if hasattr(movie, 'summary') and movie.summary:
+            tmdb_rating = movie.summary.get('vote_average')
+            if tmdb_rating:
+                rating_text = f" ★ {tmdb_rating:.1f}"
+
+        user_rating = movie.get_average_user_rating() if hasattr(movie, 'get_average_user_rating') else None
+        if user_rating:
+            rating_text += f" (Our Rating: {user_rating:.1f})"
+
+        # Add indicator for movies needing details
+        if hasattr(movie, 'needs_details') and movie.needs_details:
+            title += " (⚠️ Needs Details)"
+        return title + rating_text
+
+    def _restyle(self, index):
+        """Update the selection colours of one row, if it is on screen"""
+        slot = self._visible.get(index)
+        if slot is not None:
+            self.itemconfigure(slot["bg"], fill=self._get_item_color(index))
+            self.itemconfigure(slot["title"],
+                               fill=self.selectforeground if index == self.selected_index else self.fg)
+
+    def _set_selection(self, index):
+        previous, self.selected_index = self.selected_index, index
+        if previous is not None and previous != index:
+            self._restyle(previous)
+        self._restyle(index)
+
     def _get_item_color(self, index):
         """Get background color for item"""
         if index == self.selected_index:
@@ -166,19 +301,35 @@ class ThumbnailListbox(tk.Canvas):
     def _select_item(self, index):
         """Handle item selection"""
         if 0 <= index < len(self.items):
-            self.selected_index = index
-            self._redraw()
+            self._set_selection(index)
             self.event_generate('<<ListboxSelect>>')
 
     def _on_configure(self, event):
-        """Handle resize"""
-        self._redraw()
+        """Handle resize: stretch row backgrounds and fill any newly exposed rows"""
+        if event.width != self._width:
+            self._width = event.width
+            for index, slot in self._visible.items():
+                y = self.TOP_MARGIN + index * self.item_height
+                self.coords(slot["bg"], 5, y, event.width - 5, y + self.item_height - 5)
+            self._update_scrollregion()
+        self._render_visible()
 
     def _on_mousewheel(self, event):
         """Improved mousewheel scrolling"""
         if self._total_height > self.winfo_height():
             self.yview_scroll(int(-1*(event.delta/120)), "units")
 
+    def yview(self, *args):
+        """Scroll like Canvas.yview, rendering the rows that come into view"""
+        result = super().yview(*args)
+        if args:
+            self._render_visible()
+        return result
+
+    def yview_moveto(self, fraction):
+        super().yview_moveto(fraction)
+        self._render_visible()
+
     def yview_scroll(self, number, what):
         """Override scroll to ensure proper movement"""
         if what == "units":
@@ -196,9 +347,8 @@ class ThumbnailListbox(tk.Canvas):
         
         filtered = []
         for movie in self.items:
-            if (hasattr(movie, 'details') and movie.details 
-                and 'genres' in movie.details):
-                genres = [g['name'].lower() for g in movie.details['genres']]
+            if hasattr(movie, 'summary') and movie.summary.get('genres'):
+                genres = [g.lower() for g in movie.summary['genres']]
                 if genre.lower() in genres:
                     filtered.append(movie)
         return filtered
@@ -1,16 +1,17 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from PIL import ImageTk
 from gui.color_scheme import ColorSchemeManager
 
 class WindowManager:
+    POSTER_SIZE = (300, 450)
+
     def __init__(self, app):
         self.app = app
 
     def show_poster_window(self, movie, poster_path):
         poster_window = ColorSchemeManager.create_themed_toplevel(self.app.root, self.app.ui_settings)
         poster_window.title(movie.title)
-        poster_image = Image.open(poster_path)
-        poster_image = poster_image.resize((300, 450), Image.LANCZOS)
+        poster_image = self.app.thumbnail_cache.get(poster_path, self.POSTER_SIZE)
         poster_photo = ImageTk.PhotoImage(poster_image)
         poster_label = tk.Label(poster_window, image=poster_photo)
         poster_label.image = poster_photo
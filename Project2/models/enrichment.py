@@ -0,0 +1,161 @@
+# This file defines the ReviewQueue class and the matching helpers. They resolve quick-added movies to TMDb entries.
+
+import re
+import json
+import logging
+import unicodedata
+from difflib import SequenceMatcher
+
+from api.tmdb_api import TMDbAPI
+from api.request_scheduler import PRIORITY_ENRICHMENT
+from models.movie import Movie
+from models.storage import atomic_write_json, movie_key
+
+MATCH_THRESHOLD = 0.9  # Minimum score for an automatic match
+MATCH_MARGIN = 0.15    # How far ahead of the runner-up the best match must be
+YEAR_PATTERN = re.compile(r'\s*\((\d{4})\)\s*$')
+
+
+def split_title_year(text):
+    """Split "Avatar (2009)" into ("Avatar", 2009); the year is None when absent"""
+    match = YEAR_PATTERN.search(text or "")
+    if not match:
+        return (text or "").strip(), None
+    return text[:match.start()].strip(), int(match.group(1))
+
+
+def year_of(release_date):
+    """Year of a TMDb release date ("2009-12-15") or a bare year, else None"""
+    match = re.match(r'\s*(\d{4})', str(release_date or ""))
+    return int(match.group(1)) if match else None
+
+
+def normalize_title(title):
+    """Lowercase, accents and punctuation dropped, "&" spelled out, no leading article"""
+    title = unicodedata.normalize("NFKD", (title or "").lower())
+    title = "".join(c for c in title if not unicodedata.combining(c)).replace("&", " and ")
+    title = re.sub(r"[^\w\s]", "", title)
+    title = re.sub(r"^(the|a|an)\s+", "", title.strip())
+    return " ".join(title.split())
+
+
+def score_candidate(title, year, candidate):
+    """Title similarity (0-1) adjusted by how well the release year agrees"""
+    score = SequenceMatcher(None, normalize_title(title), normalize_title(candidate.get("title"))).ratio()
+    candidate_year = year_of(candidate.get("release_date"))
+    if year and candidate_year:
+        if candidate_year == year:
+            score += 0.2
+        elif abs(candidate_year - year) == 1:
+            score += 0.05  # Festival premiere vs. release
+        else:
+            score -= 0.3
+    return score
+
+
+def pick_match(title, year, candidates):
+    """Return the candidate that clearly matches, or None if none does or it is a toss-up"""
+    scored = sorted(((score_candidate(title, year, c), i) for i, c in enumerate(candidates)), reverse=True)
+    if not scored:
+        return None
+    best_score, best = scored[0]
+    runner_up = scored[1][0] if len(scored) > 1 else 0.0
+    if best_score >= MATCH_THRESHOLD and best_score - runner_up >= MATCH_MARGIN:
+        return candidates[best]
+    return None
+
+
+def fetch_match(candidate, priority=PRIORITY_ENRICHMENT):
+    """Build a Movie from a search result's full details; its poster is fetched once it is committed"""
+    details = TMDbAPI.get_movie_details(candidate["id"], priority=priority)
+    movie = Movie(
+        id=details["id"],
+        title=details.get("title") or candidate.get("title"),
+        release_date=details.get("release_date"),
+        poster_path=details.get("poster_path"),
+        details=details
+    )
+    movie.needs_details = False
+    return movie
+
+
+def resolve_movie(title, release_date=None):
+    """Search TMDb for a quick-added title (runs on a worker thread).
+
+    Returns {"status": "matched", "movie": Movie} or {"status": "review",
+    "year": ..., "candidates": [...]} when there is no clear best match.
+    """
+    search_title, year = split_title_year(title)
+    year = year or year_of(release_date)
+    candidates = TMDbAPI.search_movie(search_title, year=year, priority=PRIORITY_ENRICHMENT)
+    if not candidates and year:
+        # The year may be off; try the title alone
+        candidates = TMDbAPI.search_movie(search_title, priority=PRIORITY_ENRICHMENT)
+    match = pick_match(search_title, year, candidates)
+    if match is None:
+        return {"status": "review", "year": year, "candidates": candidates}
+    return {"status": "matched", "movie": fetch_match(match)}
+
+
+class ReviewQueue:
+    """Quick-added movies the enrichment job could not match on its own.
+
+    Entries are keyed like the manager's title index and remember the
+    search candidates, so the user can pick one later without searching
+    again. Dismissed entries stay (hidden) so the job does not retry them.
+    Saved to a JSON file so the queue survives restarts.
+    """
+
+    def __init__(self, state_file="data/enrichment.json"):
+        self.state_file = state_file
+        self.items = self._load()  # movie_key(title) -> entry
+
+    def add(self, title, reason, year=None, candidates=()):
+        self.items[movie_key(title)] = {
+            "title": title,
+            "reason": reason,
+            "year": year,
+            "candidates": list(candidates),
+            "dismissed": False
+        }
+
+    def get(self, title):
+        return self.items.get(movie_key(title))
+
+    def remove(self, title):
+        self.items.pop(movie_key(title), None)
+
+    def dismiss(self, title):
+        entry = self.get(title)
+        if entry is not None:
+            entry["dismissed"] = True
+
+    def pending(self):
+        """Entries still waiting for the user, in the order they were added"""
+        return [entry for entry in self.items.values() if not entry["dismissed"]]
+
+    def prune(self, movie_manager):
+        """Forget entries whose movie was removed or got its details another way"""
+        for key, entry in list(self.items.items()):
+            movie = movie_manager.find_by_title(entry["title"])
+            if movie is None or not movie.needs_details:
+                del self.items[key]
+
+    def __contains__(self, title):
+        return movie_key(title) in self.items
+
+    def __len__(self):
+        return len(self.pending())
+
+    def save(self):
+        try:
+            atomic_write_json(self.state_file, {"review": self.items}, indent=2)
+        except OSError as e:
+            logging.error(f"Failed to save review queue: {e}")
+
+    def _load(self):
+        try:
+            with open(self.state_file, "r") as file:
+                return json.load(file).get("review", {})
+        except (OSError, ValueError):
+            return {}
@@ -1,160 +1,405 @@
 # This file defines the MovieManager class. It handles loading, saving, and managing lists of movies.
 
-import json
-import os
 import logging
+from contextlib import contextmanager
 from models.movie import Movie
+from models.movie_list import MovieList
+from models.search import SearchIndex
+from models.storage import JSONStorage, movie_key
 
 class MovieManager:
-    def __init__(self, data_file="data/movies.json"):
+    def __init__(self, data_file="data/movies.json", storage=None, autoload=True):
         self.data_file = data_file
-        self.movies_to_watch = []
-        self.movies_watched = []
-        self.load_data()
+        self.storage = storage or JSONStorage(data_file)
+        self.movies_to_watch = MovieList()
+        self.movies_watched = MovieList()
+        # Indexes kept in step with the two lists by every mutator
+        self._title_index = {}  # movie_key(title) -> movie
+        self._id_index = {}     # TMDb id -> movie
+        self._list_index = {}   # movie_key(title) -> "to_watch" / "watched"
+        self._genre_index = {}  # genre name -> set of movies
+        self._movie_genres = {} # movie -> genre names it is indexed under
+        # Full-text index over titles, people and overviews
+        self.search_index = SearchIndex(text_source=self.storage.load_search_text)
+        # Callbacks notified of every change: callback(event, movie, list_name)
+        self._listeners = []
+        # Storage writes deferred by batch(); None when no batch is open
+        self._pending_writes = None
+        self._pending_full_save = False
+        if autoload:
+            self.load_data()
 
     def add_movie(self, movie):
         """Add a movie or update if it already exists"""
         # Check if movie exists in either list
-        for existing in self.movies_to_watch + self.movies_watched:
-            if existing.title.lower() == movie.title.lower():
-                # If we're adding a movie with details to replace one without details
-                if existing.needs_details and not movie.needs_details:
-                    logging.debug(f"Replacing movie without details: {existing.title}")
-                    # Remove from appropriate list
-                    if existing in self.movies_to_watch:
-                        self.movies_to_watch.remove(existing)
-                    else:
-                        self.movies_watched.remove(existing)
-                    # Add new version to to_watch
-                    self.movies_to_watch.append(movie)
-                    self.save_data()
-                    return True
-                return False
+        existing = self._title_index.get(movie_key(movie.title))
+        if existing is not None:
+            # If we're adding a movie with details to replace one without details
+            if existing.needs_details and not movie.needs_details:
+                logging.debug(f"Replacing movie without details: {existing.title}")
+                # Remove from appropriate list and add new version to to_watch
+                self._detach(existing)
+                self._attach(movie, "to_watch")
+                self._notify("deleted", existing)
+                if self.storage.incremental:
+                    self._write(self.storage.delete_movie, existing)
+                self._store_movie(movie)
+                return True
+            return False
         
         # If movie doesn't exist, add it normally
-        self.movies_to_watch.append(movie)
-        self.save_data()
+        self._attach(movie, "to_watch")
+        self._store_movie(movie)
         return True
 
     def remove_movie(self, movie):
         """Remove a specific movie from either list"""
-        if movie in self.movies_to_watch:
-            self.movies_to_watch.remove(movie)
-        elif movie in self.movies_watched:
-            self.movies_watched.remove(movie)
-        self.save_data()
+        if self._contains(movie):
+            self._detach(movie)
+            self._notify("deleted", movie)
+        if self.storage.incremental:
+            self._write(self.storage.delete_movie, movie)
+        else:
+            self.save_data()
 
     def mark_as_watched(self, movie):
-        if movie in self.movies_to_watch:
-            self.movies_to_watch.remove(movie)
-            self.movies_watched.append(movie)
-            self.save_data()
+        if self._contains(movie, "to_watch"):
+            self._detach(movie)
+            self._attach(movie, "watched")
+            self._store_movie(movie, with_details=False)
 
     def unwatch_movie(self, movie):
-        if movie in self.movies_watched:
-            self.movies_watched.remove(movie)
-            self.movies_to_watch.append(movie)
-            self.save_data()
+        if self._contains(movie, "watched"):
+            self._detach(movie)
+            self._attach(movie, "to_watch")
+            self._store_movie(movie, with_details=False)
+
+    def find_by_title(self, title):
+        """Return the movie with this title (case-insensitive), or None"""
+        return self._title_index.get(movie_key(title))
+
+    def get_movie_by_id(self, movie_id):
+        """Return the movie with this TMDb id, or None"""
+        return self._id_index.get(movie_id)
+
+    def list_name_of(self, movie):
+        """Return "to_watch" or "watched" for a managed movie, or None"""
+        if not self._contains(movie):
+            return None
+        return self._list_index[movie_key(movie.title)]
+
+    def save_movie(self, movie):
+        """Persist changes made to a single movie (e.g. its ratings or details).
+
+        Returns False without writing anything if the movie is not in either list,
+        so saving a movie that was removed meanwhile does not bring it back.
+        """
+        if not self._contains(movie):
+            logging.debug(f"Not saving {movie.title}: it is no longer in the lists")
+            return False
+        self._index_genres(movie)
+        self.search_index.add(movie)
+        self._notify("changed", movie, self._list_name(movie))
+        return self._store_movie(movie, with_details=False)
+
+    def genre_counts(self, list_name=None):
+        """Return {genre: number of movies}, optionally for one list only"""
+        if list_name is None:
+            return {genre: len(movies) for genre, movies in self._genre_index.items()}
+        counts = {}
+        for genre, movies in self._genre_index.items():
+            count = sum(1 for movie in movies if self._list_name(movie) == list_name)
+            if count:
+                counts[genre] = count
+        return counts
+
+    def filter_by_genres(self, genres, match_all=False):
+        """Return (to_watch, watched) lists of movies tagged with any (or all) of `genres`"""
+        sets = [self._genre_index.get(genre, set()) for genre in genres]
+        if not sets:
+            return list(self.movies_to_watch), list(self.movies_watched)
+        if match_all:
+            selected = set.intersection(*sets)
+        else:
+            selected = set().union(*sets)
+        # Keep the order of the lists
+        return (
+            [movie for movie in self.movies_to_watch if movie in selected],
+            [movie for movie in self.movies_watched if movie in selected]
+        )
+
+    def search(self, query, limit=None):
+        """Return the managed movies matching `query`, best match first"""
+        return [movie for movie, _ in self.search_index.search(query, limit)]
+
+    def add_listener(self, callback):
+        """Register callback(event, movie, list_name) for list changes.
+
+        Events are "added", "removed", "changed" (ratings or details edited in
+        place) and "reset" (lists reloaded or rolled back; movie is None).
+        A move between lists is "removed" then "added"; "deleted" follows
+        only once a movie has left the manager for good (list_name is None).
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, event, movie=None, list_name=None):
+        for callback in self._listeners:
+            try:
+                callback(event, movie, list_name)
+            except Exception as e:
+                logging.error(f"Movie listener failed on {event}: {e}")
 
     def save_movies(self):
         """Save movies to JSON file (alias for save_data for consistency)"""
         return self.save_data()
 
+    @contextmanager
+    def batch(self):
+        """Defer persistence until the block exits, then write everything at once.
+
+        If the block raises, the in-memory lists are restored and nothing is
+        written. Nested batches join the outermost one.
+        """
+        if self._pending_writes is not None:
+            yield self
+            return
+
+        snapshot = (list(self.movies_to_watch), list(self.movies_watched))
+        self._pending_writes = []
+        self._pending_full_save = False
+        try:
+            yield self
+        except BaseException:
+            self._pending_writes = None
+            self.movies_to_watch, self.movies_watched = MovieList(snapshot[0]), MovieList(snapshot[1])
+            self._rebuild_indexes()
+            logging.debug("Rolled back movie batch")
+            raise
+
+        pending, self._pending_writes = self._pending_writes, None
+        if self._pending_full_save or (pending and not self.storage.incremental):
+            self.save_data()
+        elif pending:
+            try:
+                with self.storage.transaction():
+                    for func, args in pending:
+                        func(*args)
+            except Exception as e:
+                logging.error(f"Failed to save data: {e}")
+                raise
+        logging.debug(f"Committed movie batch ({len(pending)} writes)")
+
     def save_data(self):
-        """Save movies to JSON file"""
+        """Save both movie lists to storage"""
+        if self._pending_writes is not None:
+            self._pending_full_save = True
+            return True
         try:
-            data = {
-                "to_watch": [movie.to_dict() for movie in self.movies_to_watch],
-                "watched": [movie.to_dict() for movie in self.movies_watched]
-            }
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-            with open(self.data_file, "w") as file:
-                json.dump(data, file, indent=2)
+            self.storage.save_all(self.movies_to_watch, self.movies_watched)
             return True
         except Exception as e:
             logging.error(f"Failed to save data: {e}")
             raise
 
+    def flush(self):
+        """Block until every pending write has reached the disk"""
+        self.storage.flush()
+
+    @contextmanager
+    def storage_released(self):
+        """Flush, and let the storage's files be replaced during the block (see BackupDialog)"""
+        self.flush()
+        with self.storage.released():
+            yield
+
+    def close(self):
+        """Flush pending writes and release the storage backend"""
+        self.storage.close()
+
+    def _list_name(self, movie):
+        return self._list_index.get(movie_key(movie.title), "to_watch")
+
+    def _list(self, list_name):
+        return self.movies_watched if list_name == "watched" else self.movies_to_watch
+
+    def _contains(self, movie, list_name=None):
+        """Check the indexes for this exact movie object (optionally in a given list)"""
+        key = movie_key(movie.title)
+        if self._title_index.get(key) is not movie:
+            return False
+        return list_name is None or self._list_index[key] == list_name
+
+    def _index(self, movie, list_name):
+        key = movie_key(movie.title)
+        self._title_index[key] = movie
+        self._list_index[key] = list_name
+        if movie.id is not None:
+            self._id_index[movie.id] = movie
+        self._index_genres(movie)
+        self.search_index.add(movie)
+
+    def _index_genres(self, movie):
+        """(Re)index a movie under the genres in its summary"""
+        genres = tuple(movie.summary.get('genres', ()))
+        old_genres = self._movie_genres.get(movie, ())
+        if genres == old_genres and movie in self._movie_genres:
+            return
+        self._unindex_genres(movie)
+        self._movie_genres[movie] = genres
+        for genre in genres:
+            self._genre_index.setdefault(genre, set()).add(movie)
+
+    def _unindex_genres(self, movie):
+        for genre in self._movie_genres.pop(movie, ()):
+            movies = self._genre_index.get(genre)
+            if movies is not None:
+                movies.discard(movie)
+                if not movies:
+                    del self._genre_index[genre]
+
+    def _unindex(self, movie):
+        key = movie_key(movie.title)
+        if self._title_index.get(key) is movie:
+            del self._title_index[key]
+            del self._list_index[key]
+        if movie.id is not None and self._id_index.get(movie.id) is movie:
+            del self._id_index[movie.id]
+        self._unindex_genres(movie)
+        self.search_index.remove(movie)
+
+    def _attach(self, movie, list_name):
+        """Append a movie to a list and index it"""
+        self._list(list_name).append(movie)
+        self._index(movie, list_name)
+        self._notify("added", movie, list_name)
+
+    def _detach(self, movie):
+        """Remove an indexed movie from whichever list holds it"""
+        list_name = self._list_index[movie_key(movie.title)]
+        self._list(list_name).remove(movie)
+        self._unindex(movie)
+        self._notify("removed", movie, list_name)
+
+    def _rebuild_indexes(self):
+        self._title_index.clear()
+        self._id_index.clear()
+        self._list_index.clear()
+        self._genre_index.clear()
+        self._movie_genres.clear()
+        self.search_index.clear()
+        for list_name in ("to_watch", "watched"):
+            for movie in self._list(list_name):
+                self._index(movie, list_name)
+        self._notify("reset")
+
+    def _store_movie(self, movie, with_details=True):
+        """Write a single movie, falling back to a full save for non-incremental storage"""
+        if not self.storage.incremental:
+            return self.save_data()
+        try:
+            return self._write(self.storage.save_movie, movie, self._list_name(movie), with_details)
+        except Exception as e:
+            logging.error(f"Failed to save movie {movie.title}: {e}")
+            raise
+
+    def _write(self, func, *args):
+        """Run an incremental storage write now, or queue it if a batch is open"""
+        if self._pending_writes is not None:
+            self._pending_writes.append((func, args))
+        else:
+            func(*args)
+        return True
+
     def load_data(self):
+        loaded = False
+        for _ in self.iter_load_data():
+            loaded = True
+        return loaded
+
+    def iter_load_data(self):
+        """Load movies from storage, yielding (list_name, movie) as each one is added.
+
+        The lists are cleared first and filled as the generator is consumed,
+        so callers can show the first movies before the rest are parsed.
+        """
+        self.movies_to_watch = MovieList()
+        self.movies_watched = MovieList()
+        self._rebuild_indexes()
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    
-                    # Handle to_watch movies
-                    self.movies_to_watch = []
-                    for movie_data in data.get("to_watch", []):
-                        user_ratings = movie_data.pop('user_ratings', [])
-                        needs_details = movie_data.pop('needs_details', True)
-                        movie = Movie(
-                            id=movie_data.get('id'),
-                            title=movie_data['title'],
-                            release_date=movie_data.get('release_date'),
-                            poster_path=movie_data.get('poster_path'),
-                            details=movie_data.get('details')
-                        )
-                        movie.user_ratings = user_ratings
-                        movie.needs_details = needs_details
-                        self.movies_to_watch.append(movie)
-                    
-                    # Handle watched movies (similar process)
-                    for movie_data in data.get("watched", []):
-                        user_ratings = movie_data.pop('user_ratings', [])  # Remove and store ratings
-                        movie = Movie(
-                            id=movie_data['id'],
-                            title=movie_data['title'],
-                            release_date=movie_data['release_date'],
-                            poster_path=movie_data['poster_path'],
-                            details=movie_data['details']
-                        )
-                        movie.user_ratings = user_ratings  # Set ratings after creation
-                        self.movies_watched.append(movie)
-                
-                return True
+            for list_name, movie_data in self.storage.iter_load():
+                movie = self._movie_from_data(list_name, movie_data)
+                self._attach(movie, list_name)
+                yield list_name, movie
         except Exception as e:
             logging.error(f"Error loading movies: {e}")
             raise
-        return False
+
+    def _movie_from_data(self, list_name, movie_data):
+        movie = Movie(
+            id=movie_data.get('id'),
+            title=movie_data['title'],
+            release_date=movie_data.get('release_date'),
+            poster_path=movie_data.get('poster_path'),
+            details=movie_data.get('details')
+        )
+        movie.user_ratings = movie_data.get('user_ratings', [])
+        # Older files only stored this flag for the watchlist
+        if 'needs_details' in movie_data:
+            movie.needs_details = movie_data['needs_details']
+        elif list_name == "to_watch":
+            movie.needs_details = True
+        self._defer_details(movie, movie_data)
+        return movie
+
+    def _defer_details(self, movie, movie_data):
+        """Leave split-out details in the details store until they are needed"""
+        if movie.get_loaded_details() is None and 'summary' in movie_data and movie.id is not None:
+            movie.set_details_loader(self.storage.load_details, movie_data['summary'])
 
     def get_movie_details(self, movie_id):
-        for movie in self.movies_to_watch + self.movies_watched:
-            if movie.id == movie_id:
-                return movie.details
-        return None
+        movie = self._id_index.get(movie_id)
+        return movie.details if movie else None
 
     def update_movie(self, old_movie, new_movie):
-        """Update an existing movie with new details"""
+        """Update an existing movie with new details.
+
+        Returns False if the movie is not managed, or if the new title belongs
+        to another movie (the same duplicate rule as add_movie).
+        """
         logging.debug(f"Attempting to update movie: {old_movie.title} -> {new_movie.title}")
         
-        # First try to find by exact object
-        if old_movie in self.movies_to_watch:
-            idx = self.movies_to_watch.index(old_movie)
-            self.movies_to_watch[idx] = new_movie
-            logging.debug("Updated movie in to_watch list (exact match)")
-            self.save_movies()
-            return True
-            
-        if old_movie in self.movies_watched:
-            idx = self.movies_watched.index(old_movie)
-            self.movies_watched[idx] = new_movie
-            logging.debug("Updated movie in watched list (exact match)")
+        # First try to find by exact object, then fall back to matching by title
+        if self._contains(old_movie):
+            match = "exact match"
+        else:
+            old_movie = self._title_index.get(movie_key(old_movie.title), old_movie)
+            match = "title match"
+        if not self._contains(old_movie):
+            logging.error(f"Failed to find movie to update: {old_movie.title}")
+            return False
+
+        clash = self._title_index.get(movie_key(new_movie.title))
+        if clash is not None and clash is not old_movie:
+            logging.error(f"Cannot rename {old_movie.title} to {new_movie.title}: already in the lists")
+            return False
+
+        list_name = self._list_index[movie_key(old_movie.title)]
+        self._list(list_name).replace(old_movie, new_movie)
+        self._unindex(old_movie)
+        self._index(new_movie, list_name)
+        self._notify("removed", old_movie, list_name)
+        self._notify("added", new_movie, list_name)
+        self._notify("deleted", old_movie)
+        logging.debug(f"Updated movie in {list_name} list ({match})")
+        self._replace_stored(old_movie, new_movie, list_name)
+        return True
+
+    def _replace_stored(self, old_movie, new_movie, list_name):
+        if self.storage.incremental:
+            self._write(self.storage.replace_movie, old_movie, new_movie, list_name)
+        else:
             self.save_movies()
-            return True
-            
-        # If exact match fails, try matching by title
-        for i, movie in enumerate(self.movies_to_watch):
-            if movie.title.lower() == old_movie.title.lower():
-                self.movies_to_watch[i] = new_movie
-                logging.debug("Updated movie in to_watch list (title match)")
-                self.save_movies()
-                return True
-                
-        for i, movie in enumerate(self.movies_watched):
-            if movie.title.lower() == old_movie.title.lower():
-                self.movies_watched[i] = new_movie
-                logging.debug("Updated movie in watched list (title match)")
-                self.save_movies()
-                return True
-                
-        logging.error(f"Failed to find movie to update: {old_movie.title}")
-        return False
@@ -1,16 +1,62 @@
 # This file defines the Movie class. It encapsulates all logic and behavior for a single movie object.
 
 import os
-import requests
+import sys
 import logging
 from api.tmdb_api import BASE_URL, TMDB_API_KEY
+from api.tmdb_client import tmdb_client
+from api.request_scheduler import PRIORITY_INTERACTIVE
+from utils.posters import download_poster
+from utils.poster_store import poster_store, POSTER_DIR
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Rating:
+    """A single user rating. Supports rating["user"] / rating["rating"] like the old dicts."""
+
+    __slots__ = ("user", "rating")
+
+    def __init__(self, user, rating):
+        self.user = _intern(user)
+        self.rating = rating
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"<Rating {self.user}: {self.rating}>"
+
+    @classmethod
+    def from_data(cls, data):
+        if isinstance(data, cls):
+            return data
+        return cls(data["user"], data["rating"])
+
+    def to_dict(self):
+        return {"user": self.user, "rating": self.rating}
+
 
 class Movie:
+    __slots__ = (
+        "id", "title", "release_date", "poster_path", "needs_details", "details_saved",
+        "_details", "_details_loader", "_summary", "_user_ratings",
+        "_rating_sum", "_rating_min", "_rating_max", "_latest_by_user"
+    )
+    SEARCH_CAST = 10  # Cast members whose names are searchable
+    SEARCH_CREW_JOBS = ("Director", "Screenplay", "Writer")
+
     def __init__(self, id=None, title=None, release_date=None, poster_path=None, details=None):
         self.id = id
         self.title = title
         self.release_date = release_date
         self.poster_path = poster_path
+        self._details_loader = None
+        self._summary = None
         self.details = details
         self.user_ratings = []  # List of user ratings
         self.needs_details = id is None  # True if movie was quick-added
@@ -18,70 +64,221 @@ class Movie:
     def __repr__(self):
         return f"<Movie {self.title}>"
 
-    def save_poster(self):
-        """Save poster to local storage and update poster_path"""
+    @property
+    def details(self):
+        """Full TMDb details, loaded from the details store on first access"""
+        if self._details is None and self._details_loader is not None:
+            loader, self._details_loader = self._details_loader, None
+            try:
+                self._details = loader(self)
+                self.details_saved = True
+            except Exception as e:
+                logging.error(f"Failed to load details for {self.title}: {e}")
+        return self._details
+
+    @details.setter
+    def details(self, value):
+        self._details = value
+        self._details_loader = None
+        self._summary = None
+        self.details_saved = False  # True once the details store has a copy
+
+    def set_details_loader(self, loader, summary=None):
+        """Defer loading details until they are first needed"""
+        self._details = None
+        self._details_loader = loader
+        self._summary = self._compact_summary(summary)
+        self.details_saved = True
+
+    def get_loaded_details(self):
+        """Return details only if they are already in memory"""
+        return self._details
+
+    @property
+    def summary(self):
+        """Compact details (year, genres, votes, runtime) available without loading details"""
+        if self._summary is None and self._details:
+            self._summary = self._compact_summary({
+                "year": (self._details.get('release_date') or "")[:4] or None,
+                "genre_ids": [g['id'] for g in self._details.get('genres', []) if 'id' in g],
+                "genres": [g['name'] for g in self._details.get('genres', [])],
+                "vote_average": self._details.get('vote_average'),
+                "vote_count": self._details.get('vote_count'),
+                "runtime": self._details.get('runtime'),
+                "poster_path": self._details.get('poster_path')
+            })
+        return self._summary or {}
+
+    @classmethod
+    def search_text(cls, details):
+        """Searchable text from TMDb details: original title, overview and main cast and crew names.
+
+        Kept out of the summary so the main index stays compact; JSONStorage
+        saves it in a sidecar file for the search index.
+        """
+        credits = details.get('credits') or {}
+        people = [c['name'] for c in credits.get('cast', [])[:cls.SEARCH_CAST]] + \
+                 [c['name'] for c in credits.get('crew', []) if c.get('job') in cls.SEARCH_CREW_JOBS]
+        text = {}
+        if details.get('original_title'):
+            text["original_title"] = details['original_title']
+        if details.get('overview'):
+            text["overview"] = details['overview']
+        if people:
+            text["people"] = list(dict.fromkeys(people))
+        return text
+
+    @staticmethod
+    def _compact_summary(summary):
+        """Share genre names and years between movies and store lists as tuples"""
+        if not summary:
+            return summary
+        compact = {
+            "year": _intern(summary.get('year')),
+            "genre_ids": tuple(summary.get('genre_ids', ())),
+            "genres": tuple(_intern(name) for name in summary.get('genres', ())),
+            "vote_average": summary.get('vote_average'),
+            "vote_count": summary.get('vote_count'),
+            "runtime": summary.get('runtime')
+        }
+        if summary.get('poster_path'):
+            compact["poster_path"] = summary['poster_path']  # TMDb path, to re-download a lost poster
+        return compact
+
+    @property
+    def user_ratings(self):
+        """List of Rating records"""
+        return self._user_ratings
+
+    @user_ratings.setter
+    def user_ratings(self, ratings):
+        self._user_ratings = [Rating.from_data(r) for r in ratings]
+        self._rebuild_rating_stats()
+
+    def _rebuild_rating_stats(self):
+        """Recompute the cached rating aggregates from scratch"""
+        self._rating_sum = 0
+        self._rating_min = self._rating_max = None
+        self._latest_by_user = {}
+        for r in self._user_ratings:
+            self._count_rating(r)
+
+    def _count_rating(self, r):
+        self._rating_sum += r.rating
+        if self._rating_min is None or r.rating < self._rating_min:
+            self._rating_min = r.rating
+        if self._rating_max is None or r.rating > self._rating_max:
+            self._rating_max = r.rating
+        self._latest_by_user[r.user] = r.rating
+
+    def ratings_to_list(self):
+        """User ratings as plain dicts, for saving"""
+        return [r.to_dict() for r in self._user_ratings]
+
+    def save_poster(self, priority=PRIORITY_INTERACTIVE):
+        """Download the poster into the poster store; poster_path keeps the TMDb path"""
         if self.poster_path and self.poster_path.startswith('/'):  # Check if it's a TMDb path
             try:
-                os.makedirs("data/posters", exist_ok=True)
-                poster_filename = f"{self.id}_{self.title.replace(' ', '_')}.jpg"
-                poster_file = os.path.join("data/posters", poster_filename)
-                
-                # Construct full TMDb image URL
-                full_url = f"https://image.tmdb.org/t/p/w500{self.poster_path}"
-                
-                response = requests.get(full_url, stream=True)
-                if response.status_code == 200:
-                    with open(poster_file, "wb") as file:
-                        for chunk in response.iter_content(1024):
-                            file.write(chunk)
-                    self.poster_path = poster_filename  # Update to local path
-                    logging.debug(f"Saved poster for {self.title} to {poster_file}")
-                    return poster_file
-                else:
-                    logging.error(f"Failed to download poster: {response.status_code}")
+                if download_poster(self.poster_path, self.id, priority):
+                    logging.debug(f"Saved poster for {self.title}")
+                    return poster_store.path(self.id)
             except Exception as e:
                 logging.error(f"Failed to save poster: {e}")
         return None
 
     def fetch_details(self):
         # Fetch movie details from TMDb API
-        url = f"{BASE_URL}/movie/{self.id}?api_key={TMDB_API_KEY}"
-        response = requests.get(url)
+        url = f"{BASE_URL}/movie/{self.id}?api_key={TMDB_API_KEY}&append_to_response=credits"
+        response = tmdb_client.get(url, endpoint="movie/{id}")
         if response.status_code == 200:
             self.details = response.json()
             return self.details
         return None
 
-    def get_poster_path(self):
-        if not self.poster_path:
-            return None
+    def get_poster_path(self, size=None):
+        """Local poster file (or a remote URL), or None if there is none yet.
+
+        With a (width, height) `size`, the nearest pre-rendered variant is preferred.
+        """
+        if self.id is not None:
+            stored = poster_store.path(self.id, size)
+            if stored:
+                return stored
+        if not self.poster_path or self.poster_path.startswith('/'):
+            return None  # Not downloaded yet
         if self.poster_path.startswith("http"):
             return self.poster_path
-        return os.path.join("data/posters", self.poster_path)
+        # Saved by name before the poster store existed
+        return os.path.join(POSTER_DIR, self.poster_path)
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "title": self.title,
-            "release_date": self.release_date,
-            "poster_path": self.poster_path,
-            "details": self.details,
-            "user_ratings": self.user_ratings,  # Add this line to save ratings
-            "needs_details": self.needs_details
+    def to_dict(self, include_details=True):
+        extra = self.details if include_details else self.summary
+        return self.fields_to_dict(self.id, self.title, self.release_date, self.poster_path,
+                                   self._user_ratings, self.needs_details, include_details, extra)
+
+    @staticmethod
+    def fields_to_dict(movie_id, title, release_date, poster_path, ratings, needs_details, include_details, extra):
+        """The saved form of a movie, built from its fields (see JSONStorage.snapshot)"""
+        data = {
+            "id": movie_id,
+            "title": title,
+            "release_date": release_date,
+            "poster_path": poster_path,
+            "user_ratings": [r.to_dict() for r in ratings],
+            "needs_details": needs_details
         }
+        if include_details:
+            data["details"] = extra
+        elif extra:
+            data["summary"] = extra
+        return data
 
     def add_rating(self, rating, user="default"):
         """Add a user rating (1-10)"""
         if 1 <= rating <= 10:
-            self.user_ratings.append({"user": user, "rating": rating})
+            r = Rating(user, rating)
+            self._user_ratings.append(r)
+            self._count_rating(r)
             return True
         return False
 
+    def remove_last_rating(self):
+        """Remove the most recent rating, updating the cached aggregates. Returns it (or None)."""
+        if not self._user_ratings:
+            return None
+        r = self._user_ratings.pop()
+        self._rating_sum -= r.rating
+        if r.rating in (self._rating_min, self._rating_max):
+            # Only an extreme needs the remaining ratings scanned again
+            remaining = [p.rating for p in self._user_ratings]
+            self._rating_min = min(remaining, default=None)
+            self._rating_max = max(remaining, default=None)
+        # Fall back to this user's previous rating, if any
+        previous = next((p.rating for p in reversed(self._user_ratings) if p.user == r.user), None)
+        if previous is None:
+            del self._latest_by_user[r.user]
+        else:
+            self._latest_by_user[r.user] = previous
+        return r
+
     def get_average_user_rating(self):
         """Get average user rating"""
-        if not self.user_ratings:
+        if not self._user_ratings:
             return None
-        return sum(r["rating"] for r in self.user_ratings) / len(self.user_ratings)
+        return self._rating_sum / len(self._user_ratings)
+
+    def get_rating_count(self):
+        return len(self._user_ratings)
+
+    def get_rating_range(self):
+        """Return (lowest, highest) user rating, or None if unrated"""
+        if not self._user_ratings:
+            return None
+        return self._rating_min, self._rating_max
+
+    def get_user_rating(self, user="default"):
+        """Return the latest rating given by `user`, or None"""
+        return self._latest_by_user.get(user)
 
     def clear_ratings(self):
         """Clear all user ratings"""
@@ -0,0 +1,64 @@
+# This file defines the MovieList class. It is the ordered list of movies behind each of MovieManager's two lists.
+
+
+class MovieList:
+    """Ordered list of movies with constant-time append, remove, replace and membership.
+
+    Each movie's slot is kept in a map; remove() only blanks the slot, and
+    the blanks are squeezed out the next time the list is read in order
+    (iterated or indexed), so a run of moves costs one pass, not one per move.
+    Reads like a list: iteration, len(), indexing, slicing and `+`.
+    """
+
+    def __init__(self, movies=()):
+        self._items = list(movies)
+        self._positions = {movie: i for i, movie in enumerate(self._items)}
+        self._holes = 0
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, movie):
+        return movie in self._positions
+
+    def __iter__(self):
+        return iter(self._compacted())
+
+    def __getitem__(self, index):
+        return self._compacted()[index]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return f"<MovieList of {len(self)}>"
+
+    def append(self, movie):
+        self._positions[movie] = len(self._items)
+        self._items.append(movie)
+
+    def remove(self, movie):
+        """Remove a movie; raises ValueError if it is not in the list"""
+        position = self._positions.pop(movie, None)
+        if position is None:
+            raise ValueError(f"{movie!r} is not in the list")
+        self._items[position] = None
+        self._holes += 1
+
+    def replace(self, old, new):
+        """Put `new` in the place of `old`"""
+        position = self._positions.pop(old, None)
+        if position is None:
+            raise ValueError(f"{old!r} is not in the list")
+        self._items[position] = new
+        self._positions[new] = position
+
+    def _compacted(self):
+        if self._holes:
+            self._items = [movie for movie in self._items if movie is not None]
+            self._positions = {movie: i for i, movie in enumerate(self._items)}
+            self._holes = 0
+        return self._items
@@ -0,0 +1,284 @@
+# This file defines the SearchIndex class. It is an in-memory full-text index over the local movie library.
+
+import re
+import math
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+import numpy as np
+
+from models.movie import Movie
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+TYPO_LETTERS = "abcdefghijklmnopqrstuvwxyz0123456789"
+STOP_WORDS = frozenset((
+    "a an and are as at be but by for from has he her his in is it its of on "
+    "or she that the their they this to was were who will with"
+).split())
+
+
+def tokenize(text):
+    """Lowercase, strip accents and split text into alphanumeric tokens, dropping stop words"""
+    if not text:
+        return []
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return [token for token in TOKEN_RE.findall(text) if token not in STOP_WORDS]
+
+
+def _edits1(word):
+    """All strings one delete, transpose, replace or insert away from `word`"""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    deletes = [a + b[1:] for a, b in splits if b]
+    transposes = [a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1]
+    replaces = [a + c + b[1:] for a, b in splits if b for c in TYPO_LETTERS]
+    inserts = [a + c + b for a, b in splits for c in TYPO_LETTERS]
+    return set(deletes + transposes + replaces + inserts)
+
+
+class SearchIndex:
+    """Inverted index with BM25 ranking, prefix and typo-tolerant matching.
+
+    Each movie is indexed under the tokens of its title, original title, cast
+    and crew names and overview, weighted by field. Text comes from the
+    movie's details if those are loaded, else from `text_source(movie)`
+    (the storage's saved search text), so indexing never pulls details
+    from disk.
+
+    Every indexed movie gets a row number, and each term keeps the rows it
+    appears in as compact arrays that are scored with NumPy, so a query word
+    costs a few vector operations however many movies contain it. Removing
+    or re-indexing a movie only marks its old row dead; dead rows are
+    compacted away once they make up a quarter of the index.
+
+    add() and remove() only queue work. The queue is applied on the next
+    search, or earlier in chunks through index_pending().
+    """
+
+    FIELD_WEIGHTS = {"title": 3.0, "original_title": 2.0, "people": 1.5, "overview": 1.0}
+    K1 = 1.2
+    B = 0.75
+    PREFIX_PENALTY = 0.8
+    TYPO_PENALTY = 0.5
+    MAX_EXPANSIONS = 50   # Vocabulary terms a prefix or typo may expand to
+    MIN_TYPO_LENGTH = 4   # Shorter words are only matched exactly or by prefix
+    MIN_COMPACT_ROWS = 1000
+
+    def __init__(self, capacity=1024, text_source=None):
+        self._initial_capacity = capacity
+        self.text_source = text_source
+        self.clear()
+
+    def clear(self):
+        self._pending = {}     # movie -> True to (re)index, False to remove
+        self._rows = {}        # movie -> live row
+        self._movies = []      # row -> movie, None for dead rows
+        self._capacity = self._initial_capacity
+        self._doc_len = np.zeros(self._capacity, dtype=np.float64)
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        self._total_len = 0.0
+        self._postings = {}    # term -> (array of rows, array of weighted term frequencies)
+        self._terms = []       # sorted vocabulary, for prefix lookups
+
+    def __len__(self):
+        self.index_pending()
+        return len(self._rows)
+
+    def add(self, movie):
+        """Queue a movie to be (re)indexed"""
+        self._pending[movie] = True
+
+    def remove(self, movie):
+        """Queue a movie to be dropped from the index"""
+        self._pending[movie] = False
+
+    def index_pending(self, limit=None):
+        """Apply up to `limit` queued changes (all by default). Returns how many are left."""
+        while self._pending and (limit is None or limit > 0):
+            movie = next(iter(self._pending))
+            if self._pending.pop(movie):
+                self._add(movie)
+            else:
+                self._remove(movie)
+            if limit is not None:
+                limit -= 1
+        dead = len(self._movies) - len(self._rows)
+        if dead >= self.MIN_COMPACT_ROWS and dead * 4 >= len(self._movies):
+            self._compact()
+        return len(self._pending)
+
+    def search(self, query, limit=None):
+        """Return [(movie, score)] best first; every query word has to match.
+
+        The last word also matches as a prefix so results narrow while typing.
+        Words with no exact or prefix match fall back to terms one typo away.
+        """
+        self.index_pending()
+        tokens = tokenize(query)
+        if not tokens or not self._rows:
+            return []
+
+        rows = len(self._movies)
+        avg_len = self._total_len / len(self._rows)
+        expanded = []
+        for i, token in enumerate(tokens):
+            variants = self._expand(token, prefix=i == len(tokens) - 1)
+            if not variants:
+                return []
+            expanded.append(variants)
+        # Score the most selective word first; later words only score rows still in the running
+        expanded.sort(key=self._match_count)
+        scores = None
+        for variants in expanded:
+            token_scores = self._score_token(variants, rows, avg_len, scores)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = np.where(token_scores > 0, scores + token_scores, 0.0)
+
+        scores[~self._alive[:rows]] = 0.0
+        matched = np.flatnonzero(scores)
+        if limit and matched.size > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(self._movies[row], float(scores[row])) for row in matched]
+
+    def _add(self, movie):
+        self._remove(movie)
+        terms = Counter()
+        for field, text in self._fields(movie):
+            weight = self.FIELD_WEIGHTS[field]
+            for token, count in Counter(tokenize(text)).items():
+                terms[token] += count * weight
+
+        row = len(self._movies)
+        if row == self._capacity:
+            self._grow()
+        self._movies.append(movie)
+        self._rows[movie] = row
+        self._alive[row] = True
+        length = sum(terms.values())
+        self._doc_len[row] = length
+        self._total_len += length
+
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("i"), array("f"))
+                insort(self._terms, term)
+            postings[0].append(row)
+            postings[1].append(tf)
+
+    def _remove(self, movie):
+        row = self._rows.pop(movie, None)
+        if row is None:
+            return
+        self._movies[row] = None
+        self._alive[row] = False
+        self._total_len -= self._doc_len[row]
+        self._doc_len[row] = 0.0
+
+    def _grow(self):
+        self._capacity *= 2
+        for name in ("_doc_len", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros(self._capacity, dtype=old.dtype)
+            new[:len(self._movies)] = old[:len(self._movies)]
+            setattr(self, name, new)
+
+    def _compact(self):
+        """Drop dead rows, renumbering the live ones and rewriting every posting list"""
+        rows = len(self._movies)
+        alive = self._alive[:rows]
+        new_row = np.cumsum(alive) - 1
+        for term in list(self._postings):
+            term_rows, tf = self._term_arrays(term)
+            keep = alive[term_rows]
+            if not keep.any():
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+                continue
+            self._postings[term] = (
+                array("i", new_row[term_rows[keep]].astype(np.int32).tobytes()),
+                array("f", tf[keep].astype(np.float32).tobytes())
+            )
+        self._doc_len[:alive.sum()] = self._doc_len[:rows][alive]
+        self._doc_len[alive.sum():rows] = 0.0
+        self._movies = [movie for movie in self._movies if movie is not None]
+        self._rows = {movie: row for row, movie in enumerate(self._movies)}
+        self._alive[:rows] = False
+        self._alive[:len(self._movies)] = True
+
+    def _expand(self, token, prefix):
+        """Return {term: penalty} for the vocabulary terms `token` may stand for"""
+        variants = {}
+        if token in self._postings:
+            variants[token] = 1.0
+        if prefix:
+            i = bisect_left(self._terms, token)
+            while i < len(self._terms) and len(variants) < self.MAX_EXPANSIONS:
+                term = self._terms[i]
+                if not term.startswith(token):
+                    break
+                variants.setdefault(term, self.PREFIX_PENALTY)
+                i += 1
+        if not variants and len(token) >= self.MIN_TYPO_LENGTH:
+            for term in _edits1(token):
+                if term in self._postings:
+                    variants[term] = self.TYPO_PENALTY
+                    if len(variants) >= self.MAX_EXPANSIONS:
+                        break
+        return variants
+
+    def _match_count(self, variants):
+        return sum(len(self._postings[term][0]) for term in variants)
+
+    def _score_token(self, variants, rows, avg_len, candidates=None):
+        """BM25 score of one query word for every row, through its best-matching variant.
+
+        With `candidates` (the scores so far), only rows with a positive score are scored.
+        """
+        k1, b = self.K1, self.B
+        n_docs = len(self._rows)
+        scores = None
+        for term, penalty in variants.items():
+            term_rows, tf = self._term_arrays(term)
+            df = term_rows.size
+            idf = penalty * math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            if candidates is not None:
+                keep = candidates[term_rows] > 0
+                term_rows, tf = term_rows[keep], tf[keep]
+            norm = k1 * (1 - b + b * self._doc_len[term_rows] / avg_len)
+            term_scores = idf * tf * (k1 + 1) / (tf + norm)
+            if scores is None:
+                scores = np.zeros(rows, dtype=np.float64)
+                scores[term_rows] = term_scores
+            else:
+                scores[term_rows] = np.maximum(scores[term_rows], term_scores)
+        return scores
+
+    def _term_arrays(self, term):
+        """NumPy copies of a term's rows and frequencies"""
+        term_rows, tf = self._postings[term]
+        return (np.frombuffer(term_rows, dtype=np.int32).copy(),
+                np.frombuffer(tf, dtype=np.float32).astype(np.float64))
+
+    def _fields(self, movie):
+        yield "title", movie.title
+        details = movie.get_loaded_details()
+        if details:
+            text = Movie.search_text(details)
+        else:
+            text = (self.text_source(movie) if self.text_source else None) or {}
+        original = text.get('original_title')
+        if original and original != movie.title:
+            yield "original_title", original
+        people = text.get('people')
+        if people:
+            yield "people", " ".join(people)
+        overview = text.get('overview')
+        if overview:
+            yield "overview", overview
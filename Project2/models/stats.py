@@ -0,0 +1,187 @@
+# This file defines the MovieStats class. It keeps NumPy columns of per-movie numbers for fast aggregate queries.
+
+import logging
+import numpy as np
+
+
+class MovieStats:
+    """Columnar statistics over a MovieManager's movies.
+
+    Each movie owns one row in a set of NumPy columns. The columns are kept
+    up to date through MovieManager listeners: adding a movie fills a row,
+    removing one moves the last row into its slot, so no query ever needs a
+    rebuild. Missing numbers are stored as NaN.
+    """
+
+    MAX_GENRES = 64  # One bit per genre in the uint64 mask
+    COLUMNS = ("year", "runtime", "vote_average", "vote_count",
+               "user_mean", "user_count", "genre_mask", "watched")
+
+    def __init__(self, movie_manager, capacity=1024):
+        self.movie_manager = movie_manager
+        self._capacity = capacity
+        self._allocate(capacity)
+        self.count = 0
+        self._rows = {}        # id(movie) -> row
+        self._movies = []      # row -> movie
+        self.genre_bits = {}   # genre name -> bit position
+
+        self._rebuild()
+        movie_manager.add_listener(self._on_change)
+
+    def close(self):
+        self.movie_manager.remove_listener(self._on_change)
+
+    # Column maintenance
+
+    def _allocate(self, capacity):
+        self.year = np.full(capacity, np.nan, dtype=np.float32)
+        self.runtime = np.full(capacity, np.nan, dtype=np.float32)
+        self.vote_average = np.full(capacity, np.nan, dtype=np.float32)
+        self.vote_count = np.zeros(capacity, dtype=np.int64)
+        self.user_mean = np.full(capacity, np.nan, dtype=np.float32)
+        self.user_count = np.zeros(capacity, dtype=np.int32)
+        self.genre_mask = np.zeros(capacity, dtype=np.uint64)
+        self.watched = np.zeros(capacity, dtype=bool)
+
+    def _grow(self):
+        self._capacity *= 2
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(self._capacity, dtype=old.dtype)
+            if old.dtype.kind == 'f':
+                new[:] = np.nan
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def _rebuild(self):
+        self.count = 0
+        self._rows.clear()
+        self._movies.clear()
+        for movie in self.movie_manager.movies_to_watch:
+            self._add(movie, "to_watch")
+        for movie in self.movie_manager.movies_watched:
+            self._add(movie, "watched")
+
+    def _on_change(self, event, movie, list_name):
+        if event == "added":
+            self._add(movie, list_name)
+        elif event == "removed":
+            self._remove(movie)
+        elif event == "changed":
+            row = self._rows.get(id(movie))
+            if row is not None:
+                self._fill(row, movie, list_name)
+        elif event == "reset":
+            self._rebuild()
+
+    def _add(self, movie, list_name):
+        if id(movie) in self._rows:
+            self._remove(movie)
+        if self.count == self._capacity:
+            self._grow()
+        row = self.count
+        self.count += 1
+        self._rows[id(movie)] = row
+        self._movies.append(movie)
+        self._fill(row, movie, list_name)
+
+    def _remove(self, movie):
+        row = self._rows.pop(id(movie), None)
+        if row is None:
+            return
+        last = self.count - 1
+        if row != last:
+            # Move the last row into the freed slot
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[last]
+            moved = self._movies[last]
+            self._movies[row] = moved
+            self._rows[id(moved)] = row
+        self._movies.pop()
+        self.count = last
+
+    def _fill(self, row, movie, list_name):
+        summary = movie.summary
+        year = summary.get('year') or (movie.release_date or "")[:4]
+        self.year[row] = float(year) if str(year).isdigit() else np.nan
+        self.runtime[row] = summary.get('runtime') or np.nan
+        self.vote_average[row] = summary.get('vote_average') or np.nan
+        self.vote_count[row] = summary.get('vote_count') or 0
+
+        self.user_count[row] = movie.get_rating_count()
+        average = movie.get_average_user_rating()
+        self.user_mean[row] = np.nan if average is None else average
+
+        mask = 0
+        for genre in summary.get('genres', ()):
+            bit = self.genre_bits.get(genre)
+            if bit is None:
+                if len(self.genre_bits) >= self.MAX_GENRES:
+                    logging.debug(f"Too many genres for stats mask, skipping {genre}")
+                    continue
+                bit = self.genre_bits[genre] = len(self.genre_bits)
+            mask |= 1 << bit
+        self.genre_mask[row] = mask
+        self.watched[row] = list_name == "watched"
+
+    def _view(self, name):
+        return getattr(self, name)[:self.count]
+
+    # Queries
+
+    def genre_selector(self, genre):
+        """Boolean array of rows tagged with `genre`"""
+        bit = self.genre_bits.get(genre)
+        if bit is None:
+            return np.zeros(self.count, dtype=bool)
+        return (self._view("genre_mask") & np.uint64(1 << bit)) != 0
+
+    def average_rating_per_genre(self, user_ratings=False):
+        """Return {genre: mean rating} using TMDb vote_average or our own ratings"""
+        values = self._view("user_mean" if user_ratings else "vote_average")
+        result = {}
+        for genre in self.genre_bits:
+            selected = values[self.genre_selector(genre)]
+            selected = selected[~np.isnan(selected)]
+            if selected.size:
+                result[genre] = float(selected.mean())
+        return result
+
+    def runtime_histogram(self, bins=(0, 60, 90, 120, 150, 180, 240, 600)):
+        """Return (counts, bin_edges) for the runtimes of movies that have one"""
+        runtimes = self._view("runtime")
+        return np.histogram(runtimes[~np.isnan(runtimes)], bins=bins)
+
+    def watched_per_year(self):
+        """Return {release year: number of watched movies}"""
+        years = self._view("year")[self._view("watched")]
+        years = years[~np.isnan(years)].astype(np.int32)
+        values, counts = np.unique(years, return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    def top_rated(self, n=10, min_votes=None, watched=None):
+        """Return the top `n` movies by weighted score.
+
+        Uses the IMDb-style weighted rating v/(v+m)*R + m/(v+m)*C, where m is
+        `min_votes` (default: the 80th percentile of vote counts) and C the
+        mean vote_average. Pass watched=True/False to limit to one list.
+        """
+        votes = self._view("vote_count").astype(np.float64)
+        average = self._view("vote_average").astype(np.float64)
+        rated = ~np.isnan(average) & (votes > 0)
+        if watched is not None:
+            rated &= self._view("watched") == watched
+        if not rated.any():
+            return []
+
+        m = float(np.percentile(votes[rated], 80)) if min_votes is None else float(min_votes)
+        c = float(average[rated].mean())
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.where(rated, votes / (votes + m) * average + m / (votes + m) * c, -np.inf)
+
+        n = min(n, int(rated.sum()))
+        top = np.argpartition(-score, n - 1)[:n]
+        top = top[np.argsort(-score[top])]
+        return [(self._movies[row], float(score[row])) for row in top]
@@ -0,0 +1,651 @@
+# This file defines the storage backends used by MovieManager to persist the movie lists.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+LIST_NAMES = ("to_watch", "watched")
+SEARCH_TEXT_KEYS = ("original_title", "overview", "people")  # Kept in summaries before the sidecar existed
+
+
+def movie_key(title):
+    """Return the key used to identify a movie by title"""
+    return (title or "").lower()
+
+
+@contextmanager
+def atomic_open(path, mode="w"):
+    """Open a temp file for writing; on success fsync it and rename it over `path`"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, mode) as file:
+        yield file
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """Write JSON to a temp file, fsync it and rename it over `path`"""
+    with atomic_open(path) as file:
+        json.dump(data, file, **dump_kwargs)
+
+
+class DetailsStore:
+    """Keeps each movie's TMDb details in its own file, named by TMDb id"""
+
+    def __init__(self, directory="data/details"):
+        self.directory = directory
+
+    def path(self, movie_id):
+        return os.path.join(self.directory, f"{movie_id}.json")
+
+    def load(self, movie_id):
+        path = self.path(movie_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def save(self, movie_id, details):
+        atomic_write_json(self.path(movie_id), details)
+
+    def delete(self, movie_id):
+        try:
+            os.remove(self.path(movie_id))
+        except FileNotFoundError:
+            pass
+
+    def stored_ids(self):
+        """Ids (as strings) of every movie with a details file"""
+        if not os.path.isdir(self.directory):
+            return set()
+        return {name[:-len(".json")] for name in os.listdir(self.directory) if name.endswith(".json")}
+
+
+class JSONStorage:
+    """Stores both movie lists in a single JSON file (rewritten on every save).
+
+    A ".jsonl" data file is written as JSON Lines (one movie per line, tagged
+    with its list) so it can be parsed incrementally by iter_load().
+
+    With a details directory, TMDb details are split out into a DetailsStore
+    and the main file only keeps a compact summary for each movie. Details
+    files of movies that are no longer in either list are deleted after
+    each write. The text the search index needs (overview, people...) goes
+    into a sidecar file next to the data file, which is only read when the
+    search index is built and only rewritten when some text changed.
+    """
+
+    incremental = False
+
+    def __init__(self, data_file="data/movies.json", details_dir=None):
+        self.data_file = data_file
+        self.json_lines = data_file.endswith(".jsonl")
+        self.details_store = DetailsStore(details_dir) if details_dir else None
+        self._details_ids = None  # Ids of the movies in the file, once it was loaded or written
+        self.search_file = f"{os.path.splitext(data_file)[0]}.search.json" if details_dir else None
+        self._search_texts = None  # str(TMDb id) -> Movie.search_text(), loaded on first use
+        self._search_texts_changed = False
+
+    def load(self):
+        """Return the raw {"to_watch": [...], "watched": [...]} data, or None if missing"""
+        if not os.path.exists(self.data_file):
+            return None
+        if not self.json_lines:
+            with open(self.data_file, 'r') as f:
+                return json.load(f)
+
+        data = {name: [] for name in LIST_NAMES}
+        for list_name, movie_data in self.iter_load():
+            data.setdefault(list_name, []).append(movie_data)
+        return data
+
+    def iter_load(self):
+        """Yield (list_name, movie_data) pairs, parsing JSON Lines files one line at a time"""
+        ids = set()
+        for list_name, movie_data in self._iter_entries():
+            if movie_data.get("id") is not None:
+                ids.add(str(movie_data["id"]))
+                if self.search_file and "summary" in movie_data:
+                    self._migrate_search_text(movie_data)
+            yield list_name, movie_data
+        if self.details_store and self._details_ids is None:
+            # Fully loaded: details of movies missing from the file are left over from older versions
+            self._delete_details(self.details_store.stored_ids() - ids)
+            self._details_ids = ids
+
+    def _iter_entries(self):
+        if not os.path.exists(self.data_file):
+            return
+        if not self.json_lines:
+            data = self.load()
+            for list_name in LIST_NAMES:
+                for movie_data in data.get(list_name, []):
+                    yield list_name, movie_data
+            return
+
+        with open(self.data_file, 'r') as f:
+            for line in f:
+                if line.strip():
+                    movie_data = json.loads(line)
+                    yield movie_data.pop("list", "to_watch"), movie_data
+
+    def load_details(self, movie):
+        if not self.details_store or movie.id is None:
+            return None
+        return self.details_store.load(movie.id)
+
+    def load_search_text(self, movie):
+        """Searchable text saved for a movie whose details are not loaded, or None"""
+        if not self.search_file or movie.id is None:
+            return None
+        return self._search_text_map().get(str(movie.id))
+
+    def save_all(self, movies_to_watch, movies_watched):
+        self.write_snapshot(self.snapshot(movies_to_watch, movies_watched))
+
+    def snapshot(self, movies_to_watch, movies_watched):
+        """Plain data for write_snapshot(); only this touches the Movie objects, so call it on their thread"""
+        details = {}  # TMDb id -> details that the details store does not have yet
+        lists = {
+            "to_watch": self._snapshot_fields(movies_to_watch, details),
+            "watched": self._snapshot_fields(movies_watched, details)
+        }
+        return {"lists": lists, "details": details}
+
+    def write_snapshot(self, snapshot):
+        from models.movie import Movie  # models.movie imports this module through the poster store
+        lists = {name: [Movie.fields_to_dict(*fields) for fields in zip(*columns)]
+                 for name, columns in snapshot["lists"].items()}
+        if self.details_store:
+            for movie_id, details in snapshot["details"].items():
+                self.details_store.save(movie_id, details)
+        self.write_data(lists)
+        if self.details_store:
+            self._remove_orphan_details(lists)
+            self._save_search_texts(lists, snapshot["details"], Movie.search_text)
+
+    def write_data(self, data):
+        """Write raw {"to_watch": [...], "watched": [...]} data in this storage's format"""
+        if not self.json_lines:
+            atomic_write_json(self.data_file, data, indent=2)
+            return
+
+        with atomic_open(self.data_file) as file:
+            for list_name in LIST_NAMES:
+                for movie_data in data.get(list_name, []):
+                    file.write(json.dumps({"list": list_name, **movie_data}))
+                    file.write("\n")
+
+    def _snapshot_fields(self, movies, details_to_save):
+        """The saved fields of `movies` as one list per field (see Movie.fields_to_dict).
+
+        Column lists hold the movies' own immutable values, so taking them
+        allocates next to nothing per movie; ratings lists are copied.
+        """
+        full = [not self.details_store or movie.id is None for movie in movies]
+        for movie, include_details in zip(movies, full):
+            if not include_details and not movie.details_saved:
+                details = movie.get_loaded_details()
+                if details is not None:
+                    details_to_save[movie.id] = details
+                    movie.details_saved = True
+        return (
+            [movie.id for movie in movies],
+            [movie.title for movie in movies],
+            [movie.release_date for movie in movies],
+            [movie.poster_path for movie in movies],
+            [tuple(movie.user_ratings) if movie.user_ratings else () for movie in movies],
+            [movie.needs_details for movie in movies],
+            full,
+            [movie.details if include_details else movie.summary for movie, include_details in zip(movies, full)]
+        )
+
+    def _remove_orphan_details(self, lists):
+        """Delete the details files of movies that were removed or replaced since the last load or write"""
+        live = {str(entry["id"]) for entries in lists.values() for entry in entries if entry.get("id") is not None}
+        if self._details_ids is not None:
+            # Before a complete load the lists may be partial, so nothing is deleted then
+            self._delete_details(self._details_ids - live)
+        self._details_ids = live
+
+    def _search_text_map(self):
+        if self._search_texts is None:
+            try:
+                with open(self.search_file, 'r') as f:
+                    self._search_texts = json.load(f)
+            except (OSError, ValueError):
+                self._search_texts = {}
+        return self._search_texts
+
+    def _migrate_search_text(self, movie_data):
+        """Move search text out of a summary written before the sidecar existed"""
+        summary = movie_data["summary"] or {}
+        text = {key: summary[key] for key in SEARCH_TEXT_KEYS if summary.get(key)}
+        if text:
+            self._search_text_map().setdefault(str(movie_data["id"]), text)
+            self._search_texts_changed = True
+
+    def _save_search_texts(self, lists, new_details, search_text):
+        """Rewrite the sidecar if movies with text were removed or got new details"""
+        texts = self._search_text_map()
+        live = {str(entry["id"]) for entries in lists.values() for entry in entries if entry.get("id") is not None}
+        updated = {movie_id: text for movie_id, text in texts.items() if movie_id in live}
+        for movie_id, details in new_details.items():
+            text = search_text(details)
+            if text:
+                updated[str(movie_id)] = text
+            else:
+                updated.pop(str(movie_id), None)
+        if not (self._search_texts_changed or new_details or len(updated) != len(texts)):
+            return
+        atomic_write_json(self.search_file, updated)
+        # Swapped in whole, so the search index can keep reading the old map meanwhile
+        self._search_texts = updated
+        self._search_texts_changed = False
+
+    def _delete_details(self, movie_ids):
+        for movie_id in movie_ids:
+            try:
+                self.details_store.delete(movie_id)
+            except OSError as e:
+                logging.error(f"Failed to delete details for movie {movie_id}: {e}")
+
+    def flush(self):
+        pass
+
+    @contextmanager
+    def released(self):
+        """Let the data files be replaced during the block (e.g. by a restore), forgetting what was read from them"""
+        try:
+            yield
+        finally:
+            self._details_ids = None
+            self._search_texts = None
+            self._search_texts_changed = False
+
+    def close(self):
+        pass
+
+
+class WriteBehindStorage:
+    """Wraps a full-rewrite storage and performs its saves on a worker thread.
+
+    save_all() takes a snapshot of both lists as plain data on the calling
+    thread, so the worker never touches Movie objects; bursts of saves
+    within `delay` seconds are coalesced into one write (but never held back
+    longer than `max_delay`). Details waiting to be written are carried
+    over to the next snapshot, including after a failed write. flush()
+    blocks until everything is on disk.
+    """
+
+    incremental = False
+
+    def __init__(self, storage, delay=0.5, max_delay=5.0):
+        self.storage = storage
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._snapshot = None        # storage.snapshot() waiting to be written
+        self._unsaved_details = {}   # Details from a write that failed
+        self._first_request = None   # monotonic time of the oldest unwritten save
+        self._last_request = None    # monotonic time of the newest unwritten save
+        self._writing = False
+        self._closing = False
+
+        # Metrics
+        self.pending_writes = 0      # saves coalesced into the next write
+        self.flush_count = 0
+        self.last_flush_latency = None  # seconds spent in the last write
+        self.last_error = None
+
+        self._worker = threading.Thread(target=self._run, name="movie-persister", daemon=True)
+        self._worker.start()
+
+    def load(self):
+        self.flush()
+        return self.storage.load()
+
+    def iter_load(self):
+        self.flush()
+        return self.storage.iter_load()
+
+    def load_details(self, movie):
+        return self.storage.load_details(movie)
+
+    def load_search_text(self, movie):
+        return self.storage.load_search_text(movie)
+
+    def save_all(self, movies_to_watch, movies_watched):
+        snapshot = self.storage.snapshot(movies_to_watch, movies_watched)
+        with self._cond:
+            now = time.monotonic()
+            # Details only go into the snapshot that first sees them changed, so keep older ones
+            pending = self._snapshot["details"] if self._snapshot is not None else {}
+            snapshot["details"] = {**self._unsaved_details, **pending, **snapshot["details"]}
+            self._unsaved_details = {}
+            if self._snapshot is None:
+                self._first_request = now
+            self._snapshot = snapshot
+            self._last_request = now
+            self.pending_writes += 1
+            self._cond.notify_all()
+
+    def flush(self):
+        """Write any pending snapshot now and wait for it to finish"""
+        with self._cond:
+            self._first_request = self._last_request = float("-inf")
+            self._cond.notify_all()
+            while self._snapshot is not None or self._writing:
+                self._cond.wait()
+
+    @contextmanager
+    def released(self):
+        self.flush()
+        with self.storage.released():
+            yield
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._worker.join()
+        self.storage.close()
+
+    def metrics(self):
+        with self._cond:
+            return {
+                "pending_writes": self.pending_writes,
+                "flush_count": self.flush_count,
+                "last_flush_latency": self.last_flush_latency,
+                "last_error": self.last_error,
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._snapshot is None and not self._closing:
+                    self._cond.wait()
+                if self._snapshot is None:
+                    return
+                # Wait for the burst to settle before writing
+                while True:
+                    now = time.monotonic()
+                    remaining = min(self._last_request + self.delay, self._first_request + self.max_delay) - now
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                snapshot, self._snapshot = self._snapshot, None
+                coalesced, self.pending_writes = self.pending_writes, 0
+                self._writing = True
+
+            start = time.perf_counter()
+            error = None
+            try:
+                self.storage.write_snapshot(snapshot)
+            except Exception as e:
+                error = e
+                logging.error(f"Failed to save data: {e}")
+
+            with self._cond:
+                if error is not None:
+                    # Retry these details with the next write; newer versions win
+                    if self._snapshot is not None:
+                        self._snapshot["details"] = {**snapshot["details"], **self._snapshot["details"]}
+                    else:
+                        self._unsaved_details = {**snapshot["details"], **self._unsaved_details}
+                self._writing = False
+                self.flush_count += 1
+                self.last_flush_latency = time.perf_counter() - start
+                self.last_error = error
+                self._cond.notify_all()
+            logging.debug(f"Saved {coalesced} coalesced changes in {self.last_flush_latency * 1000:.1f} ms")
+
+
+class SQLiteStorage:
+    """Stores one row per movie in SQLite so a mutation only rewrites that row.
+
+    TMDb details live in their own table and are only written when the
+    caller says they changed, so rating or list changes stay small.
+    """
+
+    incremental = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS movies (
+            key TEXT PRIMARY KEY,
+            tmdb_id INTEGER,
+            title TEXT NOT NULL,
+            release_date TEXT,
+            poster_path TEXT,
+            list_name TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            needs_details INTEGER NOT NULL DEFAULT 0,
+            user_ratings TEXT NOT NULL DEFAULT '[]'
+        );
+        CREATE INDEX IF NOT EXISTS movies_list_position ON movies (list_name, position);
+        CREATE TABLE IF NOT EXISTS details (
+            key TEXT PRIMARY KEY REFERENCES movies (key) ON DELETE CASCADE,
+            data TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_file="data/movies.db"):
+        self.db_file = db_file
+        self._connect()
+        self._transaction_depth = 0
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def transaction(self):
+        """Group several writes into a single commit (rolled back if the block raises)"""
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        self._transaction_depth = 1
+        try:
+            with self.conn:
+                yield
+        finally:
+            self._transaction_depth = 0
+
+    def load(self):
+        data = {name: [] for name in LIST_NAMES}
+        for list_name, movie_data in self.iter_load():
+            data.setdefault(list_name, []).append(movie_data)
+        return data if any(data.values()) else None
+
+    def iter_load(self):
+        """Yield (list_name, movie_data) pairs straight from the database cursor"""
+        rows = self.conn.execute("""
+            SELECT m.tmdb_id, m.title, m.release_date, m.poster_path, m.list_name,
+                   m.needs_details, m.user_ratings, d.data
+            FROM movies m LEFT JOIN details d ON d.key = m.key
+            ORDER BY m.list_name = 'watched', m.position
+        """).fetchall()
+        for tmdb_id, title, release_date, poster_path, list_name, needs_details, ratings, details in rows:
+            yield list_name, {
+                "id": tmdb_id,
+                "title": title,
+                "release_date": release_date,
+                "poster_path": poster_path,
+                "details": json.loads(details) if details else None,
+                "user_ratings": json.loads(ratings),
+                "needs_details": bool(needs_details)
+            }
+
+    def save_all(self, movies_to_watch, movies_watched):
+        """Replace the stored lists with the given ones in a single transaction"""
+        with self.transaction():
+            self.conn.execute("DELETE FROM details")
+            self.conn.execute("DELETE FROM movies")
+            for list_name, movies in zip(LIST_NAMES, (movies_to_watch, movies_watched)):
+                for position, movie in enumerate(movies):
+                    self._write_row(movie, list_name, position)
+                    self._write_details(movie)
+
+    def save_movie(self, movie, list_name, with_details=True):
+        """Insert or update a single movie, appending it if it changes list"""
+        key = movie_key(movie.title)
+        with self.transaction():
+            row = self.conn.execute(
+                "SELECT list_name, position FROM movies WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[0] == list_name:
+                position = row[1]
+            else:
+                position = self._next_position(list_name)
+            self._write_row(movie, list_name, position)
+            if with_details:
+                self._write_details(movie)
+
+    def replace_movie(self, old_movie, new_movie, list_name):
+        """Swap a movie for a new version, keeping its place in the list"""
+        old_key = movie_key(old_movie.title)
+        with self.transaction():
+            row = self.conn.execute(
+                "SELECT position FROM movies WHERE key = ?", (old_key,)
+            ).fetchone()
+            position = row[0] if row else self._next_position(list_name)
+            self.conn.execute("DELETE FROM movies WHERE key = ?", (old_key,))
+            self._write_row(new_movie, list_name, position)
+            self._write_details(new_movie)
+
+    def delete_movie(self, movie):
+        with self.transaction():
+            self.conn.execute("DELETE FROM movies WHERE key = ?", (movie_key(movie.title),))
+
+    def load_search_text(self, movie):
+        return None  # Details are loaded with the lists, so the search index reads them directly
+
+    def load_details(self, movie):
+        row = self.conn.execute(
+            "SELECT data FROM details WHERE key = ?", (movie_key(movie.title),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def flush(self):
+        pass
+
+    @contextmanager
+    def released(self):
+        """Close the database during the block so its file can be replaced, then reconnect"""
+        self.conn.close()
+        try:
+            yield
+        finally:
+            self._connect()
+
+    def close(self):
+        self.conn.close()
+
+    def _next_position(self, list_name):
+        row = self.conn.execute(
+            "SELECT MAX(position) FROM movies WHERE list_name = ?", (list_name,)
+        ).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _write_row(self, movie, list_name, position):
+        self.conn.execute("""
+            INSERT INTO movies (key, tmdb_id, title, release_date, poster_path, list_name,
+                                position, needs_details, user_ratings)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                tmdb_id = excluded.tmdb_id, title = excluded.title,
+                release_date = excluded.release_date, poster_path = excluded.poster_path,
+                list_name = excluded.list_name, position = excluded.position,
+                needs_details = excluded.needs_details, user_ratings = excluded.user_ratings
+        """, (
+            movie_key(movie.title), movie.id, movie.title, movie.release_date, movie.poster_path,
+            list_name, position, int(bool(movie.needs_details)), json.dumps(movie.ratings_to_list())
+        ))
+
+    def _write_details(self, movie):
+        key = movie_key(movie.title)
+        if movie.details:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO details (key, data) VALUES (?, ?)",
+                (key, json.dumps(movie.details))
+            )
+        else:
+            self.conn.execute("DELETE FROM details WHERE key = ?", (key,))
+
+
+def migrate_json_to_sqlite(json_file="data/movies.json", db_file="data/movies.db", details_dir=None):
+    """One-shot import of an existing movies.json into a SQLite database.
+
+    Returns the number of movies migrated. The JSON file is left in place.
+    """
+    source = JSONStorage(json_file, details_dir)
+    data = source.load()
+    if not data:
+        return 0
+
+    storage = SQLiteStorage(db_file)
+    try:
+        count = 0
+        with storage.conn:
+            for list_name in LIST_NAMES:
+                for position, movie_data in enumerate(data.get(list_name, [])):
+                    storage.conn.execute("""
+                        INSERT OR REPLACE INTO movies (key, tmdb_id, title, release_date, poster_path,
+                                                      list_name, position, needs_details, user_ratings)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        movie_key(movie_data['title']), movie_data.get('id'), movie_data['title'],
+                        movie_data.get('release_date'), movie_data.get('poster_path'), list_name,
+                        position, int(bool(movie_data.get('needs_details', movie_data.get('id') is None))),
+                        json.dumps(movie_data.get('user_ratings', []))
+                    ))
+                    details = movie_data.get('details')
+                    if details is None and source.details_store and movie_data.get('id') is not None:
+                        details = source.details_store.load(movie_data['id'])
+                    if details:
+                        storage.conn.execute(
+                            "INSERT OR REPLACE INTO details (key, data) VALUES (?, ?)",
+                            (movie_key(movie_data['title']), json.dumps(details))
+                        )
+                    count += 1
+        logging.info(f"Migrated {count} movies from {json_file} to {db_file}")
+        return count
+    finally:
+        storage.close()
+
+
+def create_storage(backend="json", data_dir="data", write_delay=0.5):
+    """Create the storage backend named in settings, migrating JSON data to SQLite on first use"""
+    json_file = os.path.join(data_dir, "movies.json")
+    details_dir = os.path.join(data_dir, "details")
+    if backend == "jsonl":
+        jsonl_file = os.path.join(data_dir, "movies.jsonl")
+        storage = JSONStorage(jsonl_file, details_dir)
+        if not os.path.exists(jsonl_file) and os.path.exists(json_file):
+            storage.write_data(JSONStorage(json_file).load())
+            logging.info(f"Converted {json_file} to {jsonl_file}")
+        return WriteBehindStorage(storage, delay=write_delay)
+    if backend != "sqlite":
+        return WriteBehindStorage(JSONStorage(json_file, details_dir), delay=write_delay)
+
+    db_file = os.path.join(data_dir, "movies.db")
+    if not os.path.exists(db_file) and os.path.exists(json_file):
+        migrate_json_to_sqlite(json_file, db_file, details_dir)
+    return SQLiteStorage(db_file)
@@ -0,0 +1,207 @@
+"""TMDbClient tests against a local stub HTTP server.
+
+Run from the project directory: python -m unittest discover tests
+"""
+
+import os
+import json
+import time
+import socket
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from api.tmdb_client import TMDbClient
+from api.response_cache import ResponseCache
+from api.request_scheduler import RequestScheduler
+
+IMAGE = bytes(range(256)) * 64
+
+
+class StubImages(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        StubImages.hits += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(IMAGE)))
+        self.end_headers()
+        self.wfile.write(IMAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubTMDb(BaseHTTPRequestHandler):
+    """Answers /3/flaky with 503 and /3/limited with 429 (Retry-After) until their failures run out"""
+    protocol_version = "HTTP/1.1"  # Keep-alive, so a pooled session reuses its connection
+    lock = threading.Lock()
+    failures = {}
+    hits = {}
+    client_ports = set()
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        with self.lock:
+            StubTMDb.hits[path] = StubTMDb.hits.get(path, 0) + 1
+            StubTMDb.client_ports.add(self.client_address[1])
+            remaining = StubTMDb.failures.get(path, 0)
+            if remaining:
+                StubTMDb.failures[path] = remaining - 1
+        if remaining and path == "/3/limited":
+            self._send(429, {"status_message": "rate limited"}, {"Retry-After": "0.3"})
+        elif remaining:
+            self._send(503, {"status_message": "unavailable"})
+        else:
+            self._send(200, {"results": []})
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RetryTest(unittest.TestCase):
+    def setUp(self):
+        StubTMDb.failures = {}
+        StubTMDb.hits = {}
+        StubTMDb.client_ports = set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubTMDb)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_port}/3"
+        self.client = self.make_client()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_client(self, backoff=0.05, **kwargs):
+        client = TMDbClient(backoff=backoff, **kwargs)
+        client.scheduler = RequestScheduler(rate=1e6, burst=1000)  # Test retries, not the rate limit
+        return client
+
+    def test_retries_server_errors(self):
+        StubTMDb.failures["/3/flaky"] = 2
+        response = self.client.get(f"{self.base}/flaky", endpoint="flaky")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StubTMDb.hits["/3/flaky"], 3)
+        metrics = self.client.metrics()["flaky"]
+        self.assertEqual(metrics["retries"], 2)
+        self.assertEqual(metrics["errors"], 2)
+        self.assertEqual(metrics["count"], 3)
+
+    def test_returns_last_response_when_retries_run_out(self):
+        self.client.close()
+        self.client = self.make_client(max_retries=2, backoff=0.01)
+        StubTMDb.failures["/3/flaky"] = 10
+        response = self.client.get(f"{self.base}/flaky", endpoint="flaky")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(StubTMDb.hits["/3/flaky"], 3)
+        self.assertEqual(self.client.metrics()["flaky"]["retries"], 2)
+
+    def test_honours_retry_after(self):
+        StubTMDb.failures["/3/limited"] = 1
+        start = time.monotonic()
+        response = self.client.get(f"{self.base}/limited", endpoint="limited")
+        elapsed = time.monotonic() - start
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StubTMDb.hits["/3/limited"], 2)
+        self.assertGreaterEqual(elapsed, 0.3)
+        self.assertLess(elapsed, 2.0)
+
+    def test_backoff_stays_within_bounds(self):
+        client = self.make_client(backoff=0.5, max_backoff=2.0)
+        try:
+            for attempt in range(6):
+                cap = min(2.0, 0.5 * 2 ** attempt)
+                delays = [client._backoff_delay(attempt) for _ in range(200)]
+                self.assertTrue(all(0 <= delay <= cap for delay in delays), attempt)
+        finally:
+            client.close()
+
+    def test_backoff_timing(self):
+        self.client.close()
+        self.client = self.make_client(backoff=0.1)
+        StubTMDb.failures["/3/flaky"] = 2
+        start = time.monotonic()
+        self.client.get(f"{self.base}/flaky", endpoint="flaky")
+        # Full jitter: at most 0.1 + 0.2 seconds of sleeping
+        self.assertLess(time.monotonic() - start, 0.3 + 0.5)
+
+    def test_retries_connection_errors_then_raises(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]  # Nothing listens here once the socket is closed
+        self.client.close()
+        self.client = self.make_client(max_retries=2, backoff=0.01)
+        with self.assertRaises(requests.ConnectionError):
+            self.client.get(f"http://127.0.0.1:{port}/3/search/movie", endpoint="search/movie")
+        metrics = self.client.metrics()["search/movie"]
+        self.assertEqual(metrics["count"], 3)
+        self.assertEqual(metrics["errors"], 3)
+
+    def test_reuses_one_pooled_connection(self):
+        for _ in range(20):
+            response = self.client.get(f"{self.base}/search/movie", endpoint="search/movie")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(StubTMDb.hits["/3/search/movie"], 20)
+        self.assertEqual(len(StubTMDb.client_ports), 1)
+
+
+class CachedStreamTest(unittest.TestCase):
+    def setUp(self):
+        StubImages.hits = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubImages)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/t/p/w500/poster.jpg"
+        self.temp_dir = tempfile.mkdtemp()
+        self.client = TMDbClient()
+        self.client.cache = ResponseCache(os.path.join(self.temp_dir, "http.db"))
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def read_image(self):
+        response = self.client.get(self.url, endpoint="image", stream=True)
+        try:
+            self.assertEqual(response.status_code, 200)
+            return b"".join(response.iter_content(1024)), getattr(response, "from_cache", False)
+        finally:
+            response.close()
+
+    def test_same_image_twice(self):
+        first, first_cached = self.read_image()
+        second, second_cached = self.read_image()
+        self.assertEqual(first, IMAGE)
+        self.assertEqual(second, IMAGE)
+        self.assertFalse(first_cached)
+        self.assertTrue(second_cached)
+        self.assertEqual(StubImages.hits, 1)
+
+    def test_offline_miss_can_be_streamed(self):
+        self.client.offline = True
+        response = self.client.get(self.url, endpoint="image", stream=True)
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(b"".join(response.iter_content(1024)), b"")
+        response.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,94 +1,435 @@
 import os
+import json
+import contextlib
 import shutil
+import hashlib
+import sqlite3
 import zipfile
 import logging
+import tempfile
 from datetime import datetime
 
+MANIFEST_NAME = "manifest.json"
+BACKUP_PATTERN = "movie_tracker_backup_{}.zip"
+DATA_FILES = ("movies.json", "movies.jsonl", "movies.search.json", "movies.db")
+DATA_DIRS = ("posters", "details", "cache")
+# Already compressed, so deflating them again only costs time
+STORED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".zip", ".gz")
+CHUNK_SIZE = 1024 * 1024
+SQLITE_EXTENSIONS = (".db",)  # Archived from a consistent snapshot instead of copied
+SQLITE_SIDE_FILES = ("-wal", "-shm", "-journal")  # Part of their database's snapshot, never archived alone
+# What a selective restore can bring back; names ending in "/" are directories
+RESTORE_PARTS = {
+    "movies": DATA_FILES + ("details/",),
+    "posters": ("posters/",),
+    "cache": ("cache/",)
+}
+STAGING_SUFFIX = ".restore"    # Sibling of the data directory, so the final renames stay on one filesystem
+PREVIOUS_SUFFIX = ".previous"  # The replaced data directory, until the restore is complete
+COMPLETE_MARKER = ".restore-complete"
+
+
+class BackupCancelled(Exception):
+    """Raised by create_backup when its cancel event is set"""
+
+
 class BackupManager:
+    """Incremental zip backups of the data directory.
+
+    Every backup holds a manifest.json listing each data file with its
+    sha1, size and mtime, and the archive and member that hold its content.
+    Only content that no earlier backup in the chain has is written to a
+    new archive; unchanged files (same size and mtime) are not even read.
+    Restoring a backup reads each file from the archive its manifest names,
+    so deleting a backup breaks the ones made after it until the next full
+    backup. Images are stored without recompression. Backups made before
+    manifests existed are restored without checksums.
+
+    SQLite databases may be written while a backup runs, so they are
+    archived from a snapshot taken with SQLite's backup API, which also
+    folds in their write-ahead log.
+    """
+
     @staticmethod
-    def create_backup(base_dir="data", backup_dir="backups"):
-        """Create a backup of all movie data and cache"""
+    def create_backup(base_dir="data", backup_dir="backups", full=False, progress=None, cancel=None):
+        """Back up all movie data and cache; returns the new archive's path.
+
+        Unless `full`, content already in the latest backup is referenced
+        instead of copied. progress(done, total) is called after each file,
+        on the calling thread. Setting the `cancel` threading.Event stops
+        the backup, removes the partial archive and raises BackupCancelled.
+        """
+        temp_file = None
         try:
-            # Create backups directory if it doesn't exist
             os.makedirs(backup_dir, exist_ok=True)
-            
-            # Generate backup filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = os.path.join(backup_dir, f"movie_tracker_backup_{timestamp}.zip")
-            
-            # Create zip file
-            with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add movies.json
-                if os.path.exists(os.path.join(base_dir, "movies.json")):
-                    zipf.write(os.path.join(base_dir, "movies.json"), "movies.json")
-                
-                # Add posters directory
-                posters_dir = os.path.join(base_dir, "posters")
-                if os.path.exists(posters_dir):
-                    for root, _, files in os.walk(posters_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arcname = os.path.relpath(file_path, base_dir)
-                            zipf.write(file_path, arcname)
-                
-                # Add cache directory
-                cache_dir = os.path.join(base_dir, "cache")
-                if os.path.exists(cache_dir):
-                    for root, _, files in os.walk(cache_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arcname = os.path.relpath(file_path, base_dir)
-                            zipf.write(file_path, arcname)
-            
-            logging.info(f"Backup created successfully: {backup_file}")
+            backup_file = BackupManager._new_backup_file(backup_dir)
+            archive = os.path.basename(backup_file)
+            parent = None if full else BackupManager.latest_backup(backup_dir)
+            previous = BackupManager.read_manifest(parent)["files"] if parent else {}
+            by_hash = {entry["sha1"]: entry for entry in previous.values()}
+
+            files = BackupManager._data_files(base_dir)
+            manifest = {
+                "version": 1,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "parent": os.path.basename(parent) if parent else None,
+                "files": {}
+            }
+            written = 0
+            temp_file = backup_file + ".tmp"
+            with zipfile.ZipFile(temp_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for done, arcname in enumerate(files, 1):
+                    if cancel is not None and cancel.is_set():
+                        raise BackupCancelled("Backup cancelled")
+                    entry = BackupManager._add_file(zipf, archive, base_dir, arcname,
+                                                    previous.get(arcname), by_hash, backup_dir)
+                    if entry is not None:
+                        manifest["files"][arcname] = entry
+                        written += entry["archive"] == archive
+                    if progress is not None:
+                        progress(done, len(files))
+                zipf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=1))
+            os.replace(temp_file, backup_file)
+
+            logging.info(f"Backup created successfully: {backup_file} "
+                         f"({written} of {len(manifest['files'])} files written, parent {manifest['parent']})")
             return backup_file
-            
+
+        except BackupCancelled:
+            BackupManager._remove_partial(temp_file)
+            logging.info("Backup cancelled")
+            raise
         except Exception as e:
+            BackupManager._remove_partial(temp_file)
             logging.error(f"Failed to create backup: {e}")
             raise
 
     @staticmethod
-    def restore_backup(backup_file, data_dir="data"):
-        """Restore from a backup file"""
+    def restore_backup(backup_file, data_dir="data", parts=None, dry_run=False, progress=None):
+        """Restore from a backup file; returns a summary {"files", "bytes", "archives"}.
+
+        Runs stage_restore() and then finish_restore(). `parts` restores
+        only some of RESTORE_PARTS and keeps the rest of the current data.
+        With `dry_run`, everything is read and verified but nothing is written.
+        """
+        summary = BackupManager.stage_restore(backup_file, data_dir, parts, dry_run, progress)
+        if not dry_run:
+            BackupManager.finish_restore(data_dir, parts)
+            BackupManager.recover(data_dir)
+            logging.info(f"Backup restored successfully from: {backup_file} ({summary['files']} files)")
+        return summary
+
+    @staticmethod
+    def stage_restore(backup_file, data_dir="data", parts=None, dry_run=False, progress=None):
+        """Unpack a backup into a staging directory next to `data_dir`; returns its summary.
+
+        Files are streamed from the archives and checked against the
+        manifest's sha1s, so a failed restore leaves the current data
+        untouched. This is the slow part of a restore and does not touch
+        `data_dir`, so it can run while the app keeps using its data.
+        """
+        data_dir = os.path.normpath(data_dir)
+        staging = data_dir + STAGING_SUFFIX
         try:
-            # First, ensure the data directory exists
-            os.makedirs(data_dir, exist_ok=True)
-            
-            # Create temporary extraction directory inside data dir
-            temp_dir = os.path.join(data_dir, "temp_restore")
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Extract backup
-            with zipfile.ZipFile(backup_file, 'r') as zipf:
-                zipf.extractall(temp_dir)
-            
-            # Remove existing data files but keep the directory
-            for item in os.listdir(data_dir):
-                item_path = os.path.join(data_dir, item)
-                if item != "temp_restore":  # Don't delete the temp directory
-                    if os.path.isfile(item_path):
-                        os.remove(item_path)
-                    elif os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-            
-            # Move restored data to proper location
-            for item in os.listdir(temp_dir):
-                src_path = os.path.join(temp_dir, item)
-                dst_path = os.path.join(data_dir, item)
-                if os.path.exists(dst_path):
-                    if os.path.isdir(dst_path):
-                        shutil.rmtree(dst_path)
-                    else:
-                        os.remove(dst_path)
-                shutil.move(src_path, dst_path)
-            
-            # Clean up temp directory
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-            
-            logging.info(f"Backup restored successfully from: {backup_file}")
-            return True
-            
+            if not dry_run:
+                # A verify only reads the backup, so it leaves the data directory alone
+                BackupManager.recover(data_dir)
+            entries = BackupManager._restore_entries(backup_file, parts)
+            if not dry_run:
+                BackupManager._remove_tree(staging)
+                os.makedirs(staging)
+                if parts is not None and os.path.isdir(data_dir):
+                    BackupManager._link_kept(data_dir, staging, parts)
+
+            summary = BackupManager._stream_entries(entries, None if dry_run else staging, progress)
+            if dry_run:
+                logging.info(f"Verified backup {backup_file}: {summary['files']} files, {summary['bytes']} bytes")
+                return summary
+
+            # From here recover() completes the restore instead of rolling it back
+            open(os.path.join(staging, COMPLETE_MARKER), "w").close()
+            return summary
+
         except Exception as e:
+            if not dry_run and os.path.isdir(data_dir):
+                BackupManager._remove_tree(staging)
             logging.error(f"Failed to restore backup: {e}")
             raise
+
+    @staticmethod
+    def finish_restore(data_dir="data", parts=None):
+        """Swap a staged restore into place with two renames (see recover() for a crash between them).
+
+        Nothing may have the data's files open meanwhile, which is why this
+        is kept short: the replaced data is left for recover() to delete.
+        Kept files that changed since stage_restore() are linked again first.
+        """
+        data_dir = os.path.normpath(data_dir)
+        staging = data_dir + STAGING_SUFFIX
+        if not os.path.exists(os.path.join(staging, COMPLETE_MARKER)):
+            raise FileNotFoundError("No staged restore to finish")
+        if parts is not None and os.path.isdir(data_dir):
+            BackupManager._link_kept(data_dir, staging, parts)
+        BackupManager._swap(data_dir, staging)
+
+    @staticmethod
+    def recover(data_dir="data"):
+        """Finish or roll back a restore interrupted between its renames, and remove its leftovers"""
+        data_dir = os.path.normpath(data_dir)
+        staging = data_dir + STAGING_SUFFIX
+        previous = data_dir + PREVIOUS_SUFFIX
+        if not os.path.exists(data_dir):
+            if os.path.exists(os.path.join(staging, COMPLETE_MARKER)):
+                logging.warning("Completing an interrupted restore")
+                os.rename(staging, data_dir)
+            elif os.path.isdir(previous):
+                logging.warning("Rolling back an interrupted restore")
+                os.rename(previous, data_dir)
+        marker = os.path.join(data_dir, COMPLETE_MARKER)
+        if os.path.exists(marker):
+            os.remove(marker)
+        BackupManager._remove_tree(staging)
+        BackupManager._remove_tree(previous)
+
+    @staticmethod
+    def read_manifest(backup_file):
+        """A backup's manifest, or None for a backup made before manifests existed"""
+        with zipfile.ZipFile(backup_file, 'r') as zipf:
+            try:
+                return json.loads(zipf.read(MANIFEST_NAME))
+            except KeyError:
+                return None
+
+    @staticmethod
+    def latest_backup(backup_dir="backups"):
+        """Newest backup with a manifest whose chain is complete, or None to start a full one"""
+        if not os.path.isdir(backup_dir):
+            return None
+        names = sorted((name for name in os.listdir(backup_dir)
+                        if name.startswith("movie_tracker_backup_") and name.endswith(".zip")), reverse=True)
+        for name in names:
+            path = os.path.join(backup_dir, name)
+            try:
+                manifest = BackupManager.read_manifest(path)
+            except (OSError, zipfile.BadZipFile, ValueError) as e:
+                logging.warning(f"Skipping unreadable backup {name}: {e}")
+                continue
+            if manifest is None:
+                continue
+            archives = {entry["archive"] for entry in manifest["files"].values()}
+            if all(os.path.exists(os.path.join(backup_dir, archive)) for archive in archives):
+                return path
+            logging.warning(f"Backup {name} refers to deleted archives; starting a full backup")
+            return None
+        return None
+
+    @staticmethod
+    def _new_backup_file(backup_dir):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_file = os.path.join(backup_dir, BACKUP_PATTERN.format(timestamp))
+        suffix = 1
+        while os.path.exists(backup_file):  # Incremental backups can be quicker than a second
+            suffix += 1
+            backup_file = os.path.join(backup_dir, BACKUP_PATTERN.format(f"{timestamp}_{suffix}"))
+        return backup_file
+
+    @staticmethod
+    def _data_files(base_dir):
+        """Archive names of the movie index for whichever backend is in use, posters, details and cache"""
+        files = [name for name in DATA_FILES if os.path.exists(os.path.join(base_dir, name))]
+        for sub_dir in DATA_DIRS:
+            for root, _, names in os.walk(os.path.join(base_dir, sub_dir)):
+                for name in names:
+                    # Half-written files, and SQLite logs that the database snapshots include
+                    if not name.endswith((".tmp",) + SQLITE_SIDE_FILES):
+                        files.append(os.path.relpath(os.path.join(root, name), base_dir).replace(os.sep, "/"))
+        return sorted(files)
+
+    @staticmethod
+    def _add_file(zipf, archive, base_dir, arcname, previous, by_hash, temp_dir):
+        """Manifest entry for one file, writing it to `zipf` only if no backup has its content yet"""
+        path = os.path.join(base_dir, arcname)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None  # Removed while the backup was running
+        if arcname.endswith(SQLITE_EXTENSIONS):
+            # Its mtime says nothing about changes still in the write-ahead log, so always snapshot
+            snapshot = BackupManager._snapshot_sqlite(path, temp_dir)
+            try:
+                return BackupManager._add_content(zipf, archive, snapshot, arcname, by_hash,
+                                                  os.path.getsize(snapshot), stat.st_mtime)
+            finally:
+                os.remove(snapshot)
+        if previous and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime:
+            return dict(previous)
+        return BackupManager._add_content(zipf, archive, path, arcname, by_hash, stat.st_size, stat.st_mtime)
+
+    @staticmethod
+    def _add_content(zipf, archive, path, arcname, by_hash, size, mtime):
+        known = by_hash.get(BackupManager._file_hash(path))
+        if known is not None:
+            entry = dict(known)
+        else:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            stored = arcname.lower().endswith(STORED_EXTENSIONS)
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            sha1 = hashlib.sha1()
+            # Hash what is actually written, in case the file changed since it was hashed
+            with open(path, "rb") as source, zipf.open(info, "w", force_zip64=True) as target:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    sha1.update(chunk)
+                    target.write(chunk)
+            entry = {"sha1": sha1.hexdigest(), "archive": archive, "member": arcname}
+            by_hash[entry["sha1"]] = entry
+        entry.update(size=size, mtime=mtime)
+        return entry
+
+    @staticmethod
+    def _snapshot_sqlite(path, temp_dir):
+        """Copy a live SQLite database into a temp file in `temp_dir` through the backup API"""
+        fd, snapshot = tempfile.mkstemp(suffix=".db.tmp", dir=temp_dir)
+        os.close(fd)
+        try:
+            with contextlib.closing(sqlite3.connect(path)) as source, \
+                    contextlib.closing(sqlite3.connect(snapshot)) as target:
+                source.backup(target)
+        except Exception:
+            os.remove(snapshot)
+            raise
+        return snapshot
+
+    @staticmethod
+    def _file_hash(path):
+        sha1 = hashlib.sha1()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                sha1.update(chunk)
+        return sha1.hexdigest()
+
+    @staticmethod
+    def _restore_entries(backup_file, parts):
+        """(arcname, archive path, member, sha1, mtime) for each file to restore; sha1 is None for old backups"""
+        if parts is not None:
+            unknown = set(parts) - set(RESTORE_PARTS)
+            if unknown:
+                raise ValueError(f"Unknown restore parts: {', '.join(sorted(unknown))}")
+        manifest = BackupManager.read_manifest(backup_file)
+        if manifest is None:
+            with zipfile.ZipFile(backup_file, 'r') as zipf:
+                entries = [(name, backup_file, name, None, None)
+                           for name in zipf.namelist() if not name.endswith("/")]
+        else:
+            backup_dir = os.path.dirname(backup_file)
+            entries = [(arcname, os.path.join(backup_dir, entry["archive"]), entry["member"],
+                        entry["sha1"], entry["mtime"])
+                       for arcname, entry in manifest["files"].items()]
+        entries = [entry for entry in entries if BackupManager._in_parts(entry[0], parts)]
+
+        for arcname, *_ in entries:
+            normalized = os.path.normpath(arcname)
+            if os.path.isabs(normalized) or normalized.startswith(".."):
+                raise ValueError(f"Unsafe path in backup: {arcname}")
+        for archive_path in {entry[1] for entry in entries}:
+            if not os.path.exists(archive_path):
+                raise FileNotFoundError(f"Backup {os.path.basename(archive_path)} is needed "
+                                        f"for this restore but is missing")
+        return entries
+
+    @staticmethod
+    def _in_parts(arcname, parts):
+        if parts is None:
+            return True
+        for suffix in SQLITE_SIDE_FILES:
+            if arcname.endswith(suffix):
+                arcname = arcname[:-len(suffix)]  # Goes wherever its database goes
+                break
+        return any(arcname == name or (name.endswith("/") and arcname.startswith(name))
+                   for part in parts for name in RESTORE_PARTS[part])
+
+    @staticmethod
+    def _link_kept(data_dir, staging, parts):
+        """Hard-link the current files a selective restore keeps into the staging directory.
+
+        Files already staged are only replaced if they changed since.
+        """
+        for root, _, names in os.walk(data_dir):
+            for name in names:
+                source = os.path.join(root, name)
+                arcname = os.path.relpath(source, data_dir).replace(os.sep, "/")
+                if BackupManager._in_parts(arcname, parts):
+                    continue  # Replaced by the backup's copy
+                target = os.path.join(staging, arcname)
+                if os.path.exists(target):
+                    if BackupManager._same_file(source, target):
+                        continue
+                    os.remove(target)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)  # No hard links on this filesystem
+
+    @staticmethod
+    def _same_file(source, target):
+        source_stat, target_stat = os.stat(source), os.stat(target)
+        if (source_stat.st_dev, source_stat.st_ino) == (target_stat.st_dev, target_stat.st_ino):
+            return True
+        # A copy2() copy keeps the mtime
+        return source_stat.st_size == target_stat.st_size and source_stat.st_mtime == target_stat.st_mtime
+
+    @staticmethod
+    def _stream_entries(entries, target_dir, progress):
+        """Read every entry once, verifying its sha1; written under `target_dir` unless it is None"""
+        by_archive = {}
+        for entry in entries:
+            by_archive.setdefault(entry[1], []).append(entry)
+        done = 0
+        size = 0
+        for archive_path, archive_entries in by_archive.items():
+            with zipfile.ZipFile(archive_path, 'r') as zipf:
+                for arcname, _, member, expected, mtime in archive_entries:
+                    target = os.path.join(target_dir, arcname) if target_dir is not None else None
+                    if target is not None:
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                    sha1 = hashlib.sha1()
+                    # zipfile also checks each member's CRC as it is read
+                    with zipf.open(member) as source, \
+                            (open(target, "wb") if target is not None else contextlib.nullcontext()) as file:
+                        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                            sha1.update(chunk)
+                            size += len(chunk)
+                            if file is not None:
+                                file.write(chunk)
+                    if expected is not None and sha1.hexdigest() != expected:
+                        raise ValueError(f"Checksum mismatch for {arcname} in {os.path.basename(archive_path)}")
+                    if target is not None and mtime is not None:
+                        # Keep the backed-up mtime so the next backup sees the file as unchanged
+                        os.utime(target, (mtime, mtime))
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(entries))
+        return {"files": done, "bytes": size, "archives": sorted(os.path.basename(p) for p in by_archive)}
+
+    @staticmethod
+    def _swap(data_dir, staging):
+        """Move the current data aside and the staging directory into its place; recover() deletes the old data"""
+        previous = data_dir + PREVIOUS_SUFFIX
+        BackupManager._remove_tree(previous)
+        if os.path.exists(data_dir):
+            os.rename(data_dir, previous)
+        os.rename(staging, data_dir)
+        os.remove(os.path.join(data_dir, COMPLETE_MARKER))
+
+    @staticmethod
+    def _remove_tree(path):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+    @staticmethod
+    def _remove_partial(temp_file):
+        if temp_file and os.path.exists(temp_file):
+            try:
+                os.remove(temp_file)
+            except OSError as e:
+                logging.error(f"Failed to remove partial backup {temp_file}: {e}")
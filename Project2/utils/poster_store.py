@@ -0,0 +1,300 @@
+# This file defines the PosterStore class. It keeps each distinct poster image once, named by its content hash.
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import Counter
+from PIL import Image
+
+from models.storage import atomic_write_json
+
+POSTER_DIR = "data/posters"
+GC_GRACE_SECONDS = 3600  # Files this new may belong to a download still being linked
+
+# Sizes rendered once when a poster is stored; viewers ask for the nearest one
+POSTER_VARIANTS = {
+    "list": (40, 60),      # ThumbnailListbox rows
+    "search": (92, 138),   # Search dialog results
+    "detail": (300, 450)   # Poster window
+}
+
+
+class PosterStore:
+    """Content-addressed poster files with an id -> hash index.
+
+    Images are saved as objects/<first two hex digits>/<sha1>.jpg under
+    `directory`, so identical posters are stored once and a retitled or
+    re-fetched movie never leaves a stale copy. index.json maps each TMDb
+    movie id to its image's sha1; the number of ids pointing at an image is
+    its reference count, and gc() deletes images nothing points to (once
+    they are an hour old, so a download in progress is never collected).
+    Next to each image, scaled copies for the sizes in POSTER_VARIANTS are
+    rendered from a single decode (<sha1>_<variant>.jpg), and path() with a
+    size returns the nearest one. Safe to use from several threads.
+    """
+
+    def __init__(self, directory=POSTER_DIR):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        self.index_file = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+        self._index = None      # str(movie id) -> sha1, loaded on first use
+        self._refcounts = None  # sha1 -> number of ids using it
+        self._rendered = set()  # sha1s whose variants are known to exist
+        self._dirty = False
+
+    def path(self, movie_id, size=None):
+        """File holding a movie's poster, or None if it has none stored.
+
+        With a (width, height) `size`, the smallest pre-rendered variant that
+        covers it is returned instead, or the original if there is none yet.
+        """
+        with self._lock:
+            digest = self._loaded().get(str(movie_id))
+        if not digest:
+            return None
+        if size is not None and self._has_variants(digest):
+            return self._object_path(digest, self.nearest_variant(size))
+        return self._object_path(digest)
+
+    @staticmethod
+    def nearest_variant(size):
+        """Name of the smallest variant at least `size`, else the largest one"""
+        by_area = sorted(POSTER_VARIANTS, key=lambda name: POSTER_VARIANTS[name][0] * POSTER_VARIANTS[name][1])
+        for name in by_area:
+            width, height = POSTER_VARIANTS[name]
+            if width >= size[0] and height >= size[1]:
+                return name
+        return by_area[-1]
+
+    def is_variant(self, path):
+        """True for a pre-rendered variant file, which needs no further scaling"""
+        return bool(path) and path.startswith(self.objects_dir) and "_" in os.path.basename(path)
+
+    def has(self, movie_id, variants=False):
+        """True if the movie's poster is indexed and its file exists (and, with `variants`, its scaled copies)"""
+        path = self.path(movie_id)
+        if path is None or not os.path.exists(path):
+            return False
+        return not variants or self._has_variants(os.path.basename(path)[:-len(".jpg")])
+
+    def put_stream(self, movie_id, chunks):
+        """Store an image given as an iterable of byte chunks; returns its sha1"""
+        os.makedirs(self.objects_dir, exist_ok=True)
+        sha1 = hashlib.sha1()
+        fd, temp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                for chunk in chunks:
+                    sha1.update(chunk)
+                    file.write(chunk)
+            digest = sha1.hexdigest()
+            object_path = self._object_path(digest)
+            if os.path.exists(object_path):
+                os.remove(temp_path)  # Already stored for another movie
+                os.utime(object_path)  # Restart the gc grace period
+            else:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                os.replace(temp_path, object_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        if not self._has_variants(digest):
+            self.render_variants(digest)
+        self._link(movie_id, digest)
+        return digest
+
+    def put_file(self, movie_id, source_path, move=False):
+        """Store an existing image file (e.g. a poster saved before the store existed)"""
+        with open(source_path, "rb") as file:
+            digest = self.put_stream(movie_id, iter(lambda: file.read(65536), b""))
+        if move:
+            os.remove(source_path)
+        return digest
+
+    def ensure_variants(self, movie_id):
+        """Render the variants of a movie's poster if they are missing (e.g. stored by an older version)"""
+        with self._lock:
+            digest = self._loaded().get(str(movie_id))
+        if digest and not self._has_variants(digest):
+            self.render_variants(digest)
+
+    def render_variants(self, digest):
+        """Scale an image to every size in POSTER_VARIANTS, decoding it once; returns True on success"""
+        largest = max(POSTER_VARIANTS.values(), key=lambda size: size[0] * size[1])
+        try:
+            with Image.open(self._object_path(digest)) as image:
+                # Let JPEG decode straight at a reduced scale that still covers the largest variant
+                image.draft("RGB", largest)
+                image = image.convert("RGB")
+            # Largest first, each scaled down from the one before
+            for name, size in sorted(POSTER_VARIANTS.items(), key=lambda item: -item[1][0] * item[1][1]):
+                image.thumbnail(size, Image.LANCZOS)
+                self._write_variant(image, self._object_path(digest, name))
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to render poster variants for {digest}: {e}")
+            return False
+        with self._lock:
+            self._rendered.add(digest)
+        return True
+
+    def release(self, movie_id):
+        """Drop a movie's reference; its image goes at the next gc() if nothing else uses it"""
+        with self._lock:
+            digest = self._loaded().pop(str(movie_id), None)
+            if digest is not None:
+                self._decrement(digest)
+                self._dirty = True
+
+    def refcount(self, digest):
+        with self._lock:
+            self._loaded()
+            return self._refcounts.get(digest, 0)
+
+    def gc(self, live_ids=None):
+        """Delete unreferenced images and leftover temp files; returns the number of files removed.
+
+        With `live_ids`, index entries for any other movie id are released first.
+        """
+        if live_ids is not None:
+            live = {str(movie_id) for movie_id in live_ids}
+            with self._lock:
+                for key in [key for key in self._loaded() if key not in live]:
+                    self._decrement(self._index.pop(key))
+                    self._dirty = True
+
+        with self._lock:
+            referenced = set(self._loaded().values())
+        cutoff = time.time() - GC_GRACE_SECONDS
+        removed = 0
+        if os.path.isdir(self.objects_dir):
+            for root, _, files in os.walk(self.objects_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    digest = name.split(".", 1)[0].split("_", 1)[0]  # Variants go with their image
+                    if (name.endswith(".tmp") or digest not in referenced) and os.path.getmtime(path) < cutoff:
+                        removed += self._remove_file(path)
+        with self._lock:
+            self._rendered &= referenced
+        self.save()
+        logging.info(f"Poster store gc removed {removed} files")
+        return removed
+
+    def stats(self):
+        with self._lock:
+            index = dict(self._loaded())
+        files = 0
+        size = 0
+        if os.path.isdir(self.objects_dir):
+            for root, _, names in os.walk(self.objects_dir):
+                for name in names:
+                    files += 1
+                    size += os.path.getsize(os.path.join(root, name))
+        return {"movies": len(index), "images": len(set(index.values())), "files": files, "bytes": size}
+
+    def reload(self):
+        """Forget the index (and unsaved changes to it), e.g. after posters were restored from a backup"""
+        with self._lock:
+            self._index = None
+            self._refcounts = None
+            self._rendered = set()
+            self._dirty = False
+
+    def save(self):
+        """Write the index if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            index = dict(self._index)
+            self._dirty = False
+        try:
+            atomic_write_json(self.index_file, index)
+        except OSError as e:
+            logging.error(f"Failed to save poster index: {e}")
+
+    def _loaded(self):
+        """The index, read from disk on first use (call with the lock held)"""
+        if self._index is None:
+            try:
+                with open(self.index_file, "r") as file:
+                    self._index = json.load(file)
+            except (OSError, ValueError):
+                self._index = {}
+            self._refcounts = Counter(self._index.values())
+        return self._index
+
+    def _link(self, movie_id, digest):
+        with self._lock:
+            index = self._loaded()
+            old = index.get(str(movie_id))
+            if old == digest:
+                return
+            if old is not None:
+                self._decrement(old)
+            index[str(movie_id)] = digest
+            self._refcounts[digest] += 1
+            self._dirty = True
+
+    def _decrement(self, digest):
+        self._refcounts[digest] -= 1
+        if self._refcounts[digest] <= 0:
+            del self._refcounts[digest]
+
+    def _object_path(self, digest, variant=None):
+        name = f"{digest}_{variant}.jpg" if variant else f"{digest}.jpg"
+        return os.path.join(self.objects_dir, digest[:2], name)
+
+    def _has_variants(self, digest):
+        with self._lock:
+            if digest in self._rendered:
+                return True
+        if all(os.path.exists(self._object_path(digest, name)) for name in POSTER_VARIANTS):
+            with self._lock:
+                self._rendered.add(digest)
+            return True
+        return False
+
+    def _write_variant(self, image, variant_path):
+        # Unique temp name: two threads may store the same image at once
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(variant_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                image.save(file, "JPEG", quality=85, optimize=True)
+            os.replace(temp_path, variant_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError as e:
+            logging.error(f"Failed to remove poster {path}: {e}")
+            return 0
+
+
+# Shared by Movie, the PosterManager and the poster window
+poster_store = PosterStore()
+
+
+if __name__ == "__main__":
+    # python -m utils.poster_store gc | stats
+    if len(sys.argv) < 2 or sys.argv[1] not in ("gc", "stats"):
+        print("usage: python -m utils.poster_store gc | stats")
+        sys.exit(1)
+    if sys.argv[1] == "gc":
+        print(f"Removed {poster_store.gc()} unreferenced posters")
+    print(poster_store.stats())
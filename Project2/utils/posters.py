@@ -0,0 +1,27 @@
+# This file defines the poster download helpers. They stream TMDb posters into the poster store without leaving partial files behind.
+
+import logging
+
+from api.tmdb_client import tmdb_client
+from api.request_scheduler import PRIORITY_INTERACTIVE
+from utils.poster_store import poster_store
+
+POSTER_URL = "https://image.tmdb.org/t/p/w500"
+CHUNK_SIZE = 64 * 1024  # Posters are 30-150 KB, so most arrive in one or two reads
+
+
+def download_poster(tmdb_path, movie_id, priority=PRIORITY_INTERACTIVE, store=poster_store):
+    """Stream a poster ("/abc.jpg") into the poster store under `movie_id`.
+
+    Returns True on success. The image is hashed as it arrives and only
+    renamed into place once complete, so a failed download leaves nothing.
+    """
+    response = tmdb_client.get(f"{POSTER_URL}{tmdb_path}", endpoint="image", stream=True, priority=priority)
+    try:
+        if response.status_code != 200:
+            logging.error(f"Failed to download poster {tmdb_path}: {response.status_code}")
+            return False
+        store.put_stream(movie_id, response.iter_content(CHUNK_SIZE))
+        return True
+    finally:
+        response.close()
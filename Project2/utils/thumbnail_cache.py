@@ -0,0 +1,200 @@
+# This file defines the ThumbnailCache class. It keeps pre-scaled poster images on disk between runs.
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from PIL import Image
+
+from models.storage import atomic_write_json
+from utils.poster_store import poster_store
+
+
+class ThumbnailCache:
+    """Pre-scaled poster images stored under data/cache/thumbs.
+
+    Each scaled image is saved as <poster sha1>_<width>x<height>.jpg, so
+    identical posters share their thumbnails and a replaced poster gets new
+    ones. Hashes are remembered in index.json together with the poster's
+    mtime and size; a poster is only re-hashed when either changes. Safe to
+    use from several threads.
+    """
+
+    def __init__(self, directory="data/cache/thumbs"):
+        self.directory = directory
+        self.index_file = os.path.join(directory, "index.json")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._index = self._load_index()  # poster path -> {"mtime", "size", "sha1"}
+
+    def get(self, poster_path, size):
+        """Return `poster_path` scaled to fit `size` as a PIL image, or None if it can't be read"""
+        if not poster_path or not os.path.exists(poster_path):
+            return None
+        if poster_store.is_variant(poster_path):
+            # Rendered near this size when the poster was stored; no need to cache another copy
+            self._count(hit=True)
+            return self.scale(poster_path, size)
+        digest = self._poster_hash(poster_path)
+        thumb_path = self._thumb_path(digest, size)
+        try:
+            with Image.open(thumb_path) as cached:
+                image = cached.copy()
+            self._count(hit=True)
+            return image
+        except (OSError, ValueError):
+            pass  # Not cached yet, or a damaged file we will overwrite
+
+        self._count(hit=False)
+        image = self.scale(poster_path, size)
+        self._write_thumb(image, thumb_path)
+        return image
+
+    @staticmethod
+    def scale(poster_path, size):
+        """Open a poster and scale it to fit `size`, letting JPEG decode at reduced resolution"""
+        with Image.open(poster_path) as image:
+            # Ask the decoder for the smallest scale (1/2, 1/4, 1/8) still at least `size`
+            image.draft("RGB", size)
+            image = image.convert("RGB")
+        image.thumbnail(size, Image.LANCZOS)
+        return image
+
+    def stats(self):
+        """Return hit/miss counters and the cache's size on disk"""
+        files = self._thumb_files()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "files": len(files),
+            "bytes": sum(os.path.getsize(os.path.join(self.directory, f)) for f in files)
+        }
+
+    def save(self):
+        """Write the hash index if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            index = dict(self._index)
+            self._dirty = False
+        try:
+            atomic_write_json(self.index_file, index)
+        except OSError as e:
+            logging.error(f"Failed to save thumbnail index: {e}")
+
+    def prune(self, max_bytes=None):
+        """Delete thumbnails of posters that no longer exist, then the oldest ones beyond `max_bytes`.
+
+        Returns the number of files removed.
+        """
+        with self._lock:
+            for poster_path in [p for p in self._index if not os.path.exists(p)]:
+                del self._index[poster_path]
+                self._dirty = True
+            live = {entry["sha1"] for entry in self._index.values()}
+
+        removed = 0
+        kept = []
+        if os.path.isdir(self.directory):
+            # Leftovers from writes interrupted by a crash
+            for name in os.listdir(self.directory):
+                if name.endswith(".tmp"):
+                    removed += self._remove_file(os.path.join(self.directory, name))
+        for name in self._thumb_files():
+            path = os.path.join(self.directory, name)
+            if name.split("_", 1)[0] not in live:
+                removed += self._remove_file(path)
+            else:
+                stat = os.stat(path)
+                kept.append((stat.st_atime, stat.st_size, path))
+
+        if max_bytes is not None:
+            total = sum(size for _, size, _ in kept)
+            for _, size, path in sorted(kept):  # Least recently read first
+                if total <= max_bytes:
+                    break
+                removed += self._remove_file(path)
+                total -= size
+
+        self.save()
+        logging.info(f"Pruned {removed} cached thumbnails")
+        return removed
+
+    def _poster_hash(self, poster_path):
+        """sha1 of the poster file, reusing the indexed one while mtime and size are unchanged"""
+        stat = os.stat(poster_path)
+        with self._lock:
+            entry = self._index.get(poster_path)
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return entry["sha1"]
+
+        sha1 = hashlib.sha1()
+        with open(poster_path, "rb") as file:
+            for chunk in iter(lambda: file.read(65536), b""):
+                sha1.update(chunk)
+        with self._lock:
+            self._index[poster_path] = {"mtime": stat.st_mtime, "size": stat.st_size,
+                                        "sha1": sha1.hexdigest()}
+            self._dirty = True
+        return sha1.hexdigest()
+
+    def _thumb_path(self, digest, size):
+        return os.path.join(self.directory, f"{digest}_{size[0]}x{size[1]}.jpg")
+
+    def _write_thumb(self, image, thumb_path):
+        # Unique temp name: two threads may scale the same poster at once
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                image.save(file, "JPEG", quality=90)
+            os.replace(temp_path, thumb_path)
+        except OSError as e:
+            logging.error(f"Failed to cache thumbnail {thumb_path}: {e}")
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _thumb_files(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [name for name in os.listdir(self.directory) if name.endswith(".jpg")]
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError as e:
+            logging.error(f"Failed to remove cached thumbnail {path}: {e}")
+            return 0
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+
+if __name__ == "__main__":
+    # python -m utils.thumbnail_cache prune [max_megabytes]
+    if len(sys.argv) < 2 or sys.argv[1] not in ("prune", "stats"):
+        print("usage: python -m utils.thumbnail_cache prune [max_megabytes] | stats")
+        sys.exit(1)
+    cache = ThumbnailCache()
+    if sys.argv[1] == "prune":
+        max_bytes = int(float(sys.argv[2]) * 1024 * 1024) if len(sys.argv) > 2 else None
+        start = time.perf_counter()
+        print(f"Removed {cache.prune(max_bytes)} thumbnails in {time.perf_counter() - start:.2f} s")
+    print(cache.stats())